@@ -0,0 +1,128 @@
+"""
+Mide el tiempo de arranque de cada servidor MCP: desde que se lanza el proceso hasta que
+responde a la petición `initialize`, que es lo que espera el agente antes de poder usarlo.
+
+Uso:
+    python scripts/bench_startup.py                       # todos los servidores, 5 arranques
+    python scripts/bench_startup.py accounts_server -n 10
+    python scripts/bench_startup.py --save baseline.json  # guarda las medianas
+    python scripts/bench_startup.py --baseline baseline.json --tolerance 0.2
+
+Con --baseline el script termina con código 1 si la mediana de algún servidor empeora más
+de la tolerancia indicada, para detectar regresiones en el arranque.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SERVERS = [
+    "accounts_server",
+    "push_server",
+    "financial_analysis_server",
+    "market_server",
+    "fetch_server",
+    "memory_server",
+    # Los servidores del trader en un solo proceso (MCP_GATEWAY=true)
+    "gateway_server",
+]
+
+INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2024-11-05",
+        "capabilities": {},
+        "clientInfo": {"name": "bench_startup", "version": "1.0"},
+    },
+}
+
+
+def measure(server: str, use_uv: bool, timeout: float) -> float:
+    """Lanza el servidor, envía `initialize` y devuelve los segundos hasta la respuesta."""
+    module = f"autonomous_traders.api.{server}"
+    command = ["uv", "run", "-m", module] if use_uv else [sys.executable, "-m", module]
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        process.stdin.write(json.dumps(INITIALIZE) + "\n")  # type: ignore
+        process.stdin.flush()  # type: ignore
+        deadline = start + timeout
+        while time.perf_counter() < deadline:
+            line = process.stdout.readline()  # type: ignore
+            if not line:
+                raise RuntimeError(f"{server} terminó sin responder (código {process.poll()})")
+            message = json.loads(line)
+            if message.get("id") == INITIALIZE["id"]:
+                if "error" in message:
+                    raise RuntimeError(f"{server} devolvió un error: {message['error']}")
+                return time.perf_counter() - start
+        raise TimeoutError(f"{server} no respondió en {timeout} segundos")
+    finally:
+        process.kill()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("servers", nargs="*", default=SERVERS)
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    parser.add_argument("--uv", action="store_true", help="Lanzar con `uv run -m` como los traders")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--save", help="Guardar las medianas en este fichero JSON")
+    parser.add_argument("--baseline", help="Comparar con las medianas de este fichero JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    # Los servidores se importan desde src/ aunque el paquete no esté instalado
+    src = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+    os.environ["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [os.path.abspath(src), os.environ.get("PYTHONPATH")])
+    )
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    medians = {}
+    regressions = []
+    print(f"{'servidor':<28}{'mín':>8}{'mediana':>10}{'máx':>8}")
+    for server in args.servers:
+        try:
+            times = [measure(server, args.uv, args.timeout) for _ in range(args.runs)]
+        except (RuntimeError, TimeoutError) as e:
+            print(f"{server:<28}  {e}")
+            regressions.append(server)
+            continue
+        median = statistics.median(times)
+        medians[server] = median
+        line = f"{server:<28}{min(times):>8.3f}{median:>10.3f}{max(times):>8.3f}"
+        if server in baseline:
+            change = median / baseline[server] - 1
+            line += f"  {change:+.0%} frente a la referencia"
+            if change > args.tolerance:
+                line += "  REGRESIÓN"
+                regressions.append(server)
+        print(line)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(medians, f, indent=2)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
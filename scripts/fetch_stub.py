@@ -0,0 +1,82 @@
+"""
+Servidor web local con páginas de noticias de prueba para el servidor MCP de fetch.
+
+    python3 scripts/fetch_stub.py --port 8766 --delay 0.5
+    FETCH_TTL_SECONDS=5 python3 -m src.autonomous_traders.api.fetch_server
+
+Cada página responde con ETag y Last-Modified y devuelve 304 a las peticiones condicionales
+que coinciden, así que se puede ver en la salida qué peticiones llegan al servidor y cuáles
+se resuelven desde la caché. Con --delay se simula un sitio lento para comprobar que las
+lecturas simultáneas de la misma URL comparten una única descarga.
+"""
+
+import argparse
+import hashlib
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head><title>Noticia {slug}</title><style>body {{ color: black; }}</style></head>
+<body>
+<nav><a href="/">Inicio</a> | <a href="/mercados">Mercados</a></nav>
+<article>
+<h1>Noticia {slug}</h1>
+<p>Las acciones de ACME suben un 3% tras superar las previsiones de beneficios.</p>
+<p>{filler}</p>
+</article>
+<footer>Copyright</footer>
+<script>console.log("tracking");</script>
+</body>
+</html>
+"""
+
+STARTED = formatdate(time.time(), usegmt=True)
+
+
+def make_handler(delay: float, size: int):
+    state = {"requests": 0}
+
+    class PageHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            state["requests"] += 1
+            slug = self.path.strip("/") or "inicio"
+            body = PAGE.format(slug=slug, filler="Texto de relleno. " * size).encode()
+            etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+            time.sleep(delay)
+            if self.headers.get("If-None-Match") == etag:
+                print(f"#{state['requests']} {self.path} 304", flush=True)
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            print(f"#{state['requests']} {self.path} 200", flush=True)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", STARTED)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return PageHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sitio web local para probar el servidor de fetch")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--delay", type=float, default=0.0, help="Segundos de espera por petición")
+    parser.add_argument("--size", type=int, default=50, help="Frases de relleno por página")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args.delay, args.size))
+    print(f"Fetch stub en http://127.0.0.1:{args.port}/")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
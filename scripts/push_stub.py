@@ -0,0 +1,60 @@
+"""
+Servidor local que imita el endpoint de Pushover para probar las notificaciones sin enviar nada.
+
+    python3 scripts/push_stub.py --port 8765 --fail-every 3 --delay 0.5
+    PUSHOVER_URL=http://127.0.0.1:8765/1/messages.json python3 -m src.autonomous_traders.ui.trading_floor
+
+Cada mensaje recibido se imprime por pantalla; con --fail-every N una de cada N peticiones
+responde 503 para ejercitar los reintentos, y con --delay se simula un endpoint lento.
+"""
+
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+def make_handler(fail_every: int, delay: float):
+    state = {"requests": 0}
+
+    class PushHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            state["requests"] += 1
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            fields = {key: values[0] for key, values in parse_qs(body.decode()).items()}
+            time.sleep(delay)
+            if fail_every and state["requests"] % fail_every == 0:
+                self._respond(503, {"status": 0, "errors": ["stub failure"]})
+                return
+            print(f"[{fields.get('user')}] {fields.get('message')}", flush=True)
+            self._respond(200, {"status": 1, "request": str(state["requests"])})
+
+        def _respond(self, status: int, payload: dict):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return PushHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Endpoint local de notificaciones push")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fail-every", type=int, default=0, help="Responder 503 a una de cada N peticiones")
+    parser.add_argument("--delay", type=float, default=0.0, help="Segundos de espera por petición")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args.fail_every, args.delay))
+    print(f"Push stub en http://127.0.0.1:{args.port}/1/messages.json")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
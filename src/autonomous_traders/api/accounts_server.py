@@ -1,9 +1,47 @@
+import asyncio
+
 from mcp.server.fastmcp import FastMCP
 
-from autonomous_traders.core.accounts import Account
+from autonomous_traders.core.accounts import Account, AccountCache, Order
+from autonomous_traders.core.analytics import risk_report
+from autonomous_traders.core import orderbook
+from autonomous_traders.core.market import get_share_prices
+from autonomous_traders.core.orderbook import RestingOrder
+from autonomous_traders.data.async_database import (
+    read_account_summaries,
+    run_read,
+    run_write,
+    write_log,
+)
 
 mcp = FastMCP("accounts_server")
 
+# Las llamadas seguidas de un mismo agente se sirven desde memoria. Las lecturas y escrituras
+# se hacen en los hilos de base de datos para no detener el bucle de eventos del servidor.
+accounts = AccountCache()
+# Las cuentas ya dadas de alta por este proceso
+opened: set[str] = set()
+
+
+async def open_account(name: str) -> None:
+    """
+    Da de alta la cuenta (o migra una antigua) en el hilo escritor la primera vez que se usa,
+    para que las lecturas desde los hilos lectores no escriban nunca.
+    """
+    if name.lower() not in opened:
+        await run_write(Account.open, name)
+        opened.add(name.lower())
+
+
+async def prices_for(name: str, symbols: list[str]) -> dict[str, float]:
+    """
+    Los precios de `symbols` y de las tenencias de la cuenta, consultados al proveedor antes
+    de encolar la operación para que el hilo escritor no espere a la red.
+    """
+    await open_account(name)
+    held = await run_read(lambda: list(accounts.get(name).holdings))
+    return await asyncio.to_thread(get_share_prices, sorted({*symbols, *held}))
+
 
 @mcp.tool()
 async def get_balance(name: str) -> float:
@@ -12,7 +50,8 @@ async def get_balance(name: str) -> float:
     Args:
         name: El nombre del titular de la cuenta
     """
-    return Account.get(name).balance
+    await open_account(name)
+    return await run_read(lambda: accounts.get(name).balance)
 
 
 @mcp.tool()
@@ -22,7 +61,44 @@ async def get_holdings(name: str) -> dict[str, int]:
     Args:
         name: El nombre del titular de la cuenta
     """
-    return Account.get(name).holdings
+    await open_account(name)
+    return await run_read(lambda: accounts.get(name).holdings)
+
+
+@mcp.tool()
+async def list_transactions(
+    name: str, offset: int = 0, limit: int = 20, symbol: str | None = None
+) -> list[dict]:
+    """Lista las transacciones de la cuenta indicada, de la más reciente a la más antigua.
+
+    Args:
+        name: El nombre del titular de la cuenta
+        offset: El número de transacciones recientes que se saltan
+        limit: El número máximo de transacciones a devolver
+        symbol: Filtrar por el símbolo de la acción (opcional)
+    """
+    await open_account(name)
+    return await run_read(lambda: accounts.get(name).list_transactions(offset, limit, symbol))
+
+
+@mcp.tool()
+async def get_risk_metrics(name: str, days: int = 365) -> dict:
+    """Obtiene las métricas de riesgo de la cuenta a partir de su valor diario: rentabilidad total,
+    volatilidad anualizada, ratios de Sharpe y Sortino, máximo drawdown, rotación (importe negociado
+    entre valor medio) y VaR histórico diario al 95%.
+
+    Args:
+        name: El nombre del titular de la cuenta
+        days: El número de días hacia atrás que se analizan
+    """
+    return (await run_read(risk_report, [name], days))[0]
+
+
+@mcp.tool()
+async def get_leaderboard() -> list[dict]:
+    """Obtiene la clasificación de todos los traders por ganancia/pérdida, con su efectivo, valor de
+    mercado, valor total, número de posiciones y la hora de su última operación."""
+    return await read_account_summaries()
 
 
 @mcp.tool()
@@ -35,7 +111,8 @@ async def buy_shares(name: str, symbol: str, quantity: int, rationale: str) -> f
         quantity: La cantidad de acciones a comprar
         rationale: La razón de la compra y su relación con la estrategia de la cuenta
     """
-    return Account.get(name).buy_shares(symbol, quantity, rationale)  # type: ignore
+    prices = await prices_for(name, [symbol])
+    return await run_write(lambda: accounts.get(name).buy_shares(symbol, quantity, rationale, prices))  # type: ignore
 
 
 @mcp.tool()
@@ -48,7 +125,57 @@ async def sell_shares(name: str, symbol: str, quantity: int, rationale: str) ->
         quantity: La cantidad de acciones a vender
         rationale: La razón de la venta y su relación con la estrategia de la cuenta
     """
-    return Account.get(name).sell_shares(symbol, quantity, rationale)  # type: ignore
+    prices = await prices_for(name, [symbol])
+    return await run_write(lambda: accounts.get(name).sell_shares(symbol, quantity, rationale, prices))  # type: ignore
+
+
+@mcp.tool()
+async def execute_orders(name: str, orders: list[Order]) -> str:
+    """Ejecuta un lote de compras y ventas en una sola operación atómica: o se ejecutan todas o ninguna.
+    Las ventas se aplican antes que las compras. Úsala para rebalancear o para varias operaciones a la vez.
+
+    Args:
+        name: El nombre del titular de la cuenta
+        orders: La lista de órdenes, cada una con symbol, quantity, side ('buy' o 'sell') y rationale
+    """
+    prices = await prices_for(name, [order.symbol for order in orders])
+    return await run_write(lambda: accounts.get(name).execute_orders(orders, prices))
+
+
+@mcp.tool()
+async def place_order(name: str, order: RestingOrder) -> str:
+    """Deja una orden pendiente (limit, stop o stop_limit) que se ejecuta automáticamente cuando el precio
+    alcanza el nivel indicado, sin tener que consultar el precio una y otra vez. Recibirás un aviso al ejecutarse.
+
+    Args:
+        name: El nombre del titular de la cuenta
+        order: La orden, con symbol, quantity, side ('buy' o 'sell'), type, limit_price/stop_price y rationale
+    """
+    id = await run_write(orderbook.place_order, name, order)
+    return f"Orden #{id} registrada"
+
+
+@mcp.tool()
+async def cancel_order(name: str, order_id: int) -> str:
+    """Cancela una orden pendiente abierta.
+
+    Args:
+        name: El nombre del titular de la cuenta
+        order_id: El identificador de la orden
+    """
+    return await run_write(orderbook.cancel_order, name, order_id)
+
+
+@mcp.tool()
+async def list_orders(name: str, status: str | None = "open", limit: int = 20) -> list[dict]:
+    """Lista las órdenes pendientes de la cuenta, de la más reciente a la más antigua.
+
+    Args:
+        name: El nombre del titular de la cuenta
+        status: 'open', 'filled', 'rejected' o 'cancelled'; vacío para todas
+        limit: El número máximo de órdenes a devolver
+    """
+    return await run_read(orderbook.list_orders, name, status, limit)
 
 
 @mcp.tool()
@@ -59,19 +186,22 @@ async def change_strategy(name: str, strategy: str) -> str:
         name: El nombre del titular de la cuenta
         strategy: La nueva estrategia para la cuenta
     """
-    return Account.get(name).change_strategy(strategy)
+    await open_account(name)
+    return await run_write(lambda: accounts.get(name).change_strategy(strategy))
 
 
 @mcp.resource("accounts://accounts_server/{name}")
 async def read_account_resource(name: str) -> str:
-    account = Account.get(name.lower())
-    return account.report()
+    await open_account(name)
+    return await run_read(lambda: accounts.get(name).snapshot())
 
 
 @mcp.resource("accounts://strategy/{name}")
 async def read_strategy_resource(name: str) -> str:
-    account = Account.get(name.lower())
-    return account.get_strategy()
+    await open_account(name)
+    strategy = await run_read(lambda: accounts.get(name).strategy)
+    await write_log(name, "account", "Estrategia recibida")
+    return strategy
 
 
 if __name__ == "__main__":
@@ -0,0 +1,42 @@
+from mcp.server.fastmcp import FastMCP
+
+from autonomous_traders.utils.fetcher import PageCache
+
+mcp = FastMCP("fetch_server")
+
+# Las páginas se guardan en una caché en disco compartida por todos los investigadores
+pages = PageCache()
+
+
+@mcp.tool()
+async def fetch(url: str, max_length: int = 5000, start_index: int = 0, raw: bool = False) -> str:
+    """Recupera una página web y devuelve su texto legible. Las páginas recientes se sirven desde
+    caché, así que volver a leer una página es rápido.
+
+    Args:
+        url: La URL de la página
+        max_length: El número máximo de caracteres a devolver
+        start_index: El carácter desde el que empezar, para seguir leyendo una página truncada
+        raw: True para obtener el contenido original (HTML) en lugar del texto legible
+    """
+    try:
+        page = await pages.get(url)
+    except Exception as e:
+        return f"No se pudo recuperar {url}: {e}"
+    if page["status"] >= 400:
+        return f"No se pudo recuperar {url}: el servidor respondió {page['status']}"
+    content = page["body"] if raw else page["text"]
+    if start_index >= len(content):
+        return "No hay más contenido."
+    chunk = content[start_index : start_index + max_length]
+    end = start_index + len(chunk)
+    if end < len(content):
+        chunk += (
+            f"\n\n<error>Contenido truncado. Llama a fetch con start_index={end} "
+            "para obtener más contenido.</error>"
+        )
+    return f"Contenido de {url}:\n{chunk}"
+
+
+if __name__ == "__main__":
+    mcp.run(transport="stdio")
@@ -1,36 +1,28 @@
-import yfinance as yf
-import pandas_ta as ta
 from mcp.server.fastmcp import FastMCP
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any
 
+from autonomous_traders.core.sentiment import default_scorer
+
 # --- Configuración del Servidor MCP ---
 mcp = FastMCP("financial_analysis_server")
 
-# --- Ayudante de Análisis de Sentimiento ---
-POSITIVE_WORDS = ["up", "gain", "surpass", "beat", "strong", "rise", "bullish", "optimistic", "growth", "expand", "profit", "success", "upgrade"]
-NEGATIVE_WORDS = ["down", "loss", "miss", "weak", "fall", "drop", "bearish", "pessimistic", "decline", "shrink", "slump", "downgrade", "risk"]
 
+# yfinance y pandas_ta tardan en importarse; se cargan con la primera herramienta que los usa
+# para que el servidor responda antes a la inicialización
+def _yfinance():
+    import yfinance
+
+    return yfinance
+
+
+# --- Ayudante de Análisis de Sentimiento ---
 def simple_sentiment_analysis(text: str) -> int:
     """
-    Realiza un análisis de sentimiento muy básico contando palabras clave positivas y negativas.
+    Realiza un análisis de sentimiento básico con el léxico ponderado de palabras clave.
     Devuelve +1 para positivo, -1 para negativo, 0 para neutral.
     """
-    score = 0
-    text_lower = text.lower()
-    for word in POSITIVE_WORDS:
-        if word in text_lower:
-            score += 1
-    for word in NEGATIVE_WORDS:
-        if word in text_lower:
-            score -= 1
-    
-    if score > 0:
-        return 1
-    elif score < 0:
-        return -1
-    else:
-        return 0
+    return default_scorer.classify(text)
 
 # --- Modelos Pydantic para Entradas de Herramientas ---
 class SymbolInput(BaseModel):
@@ -48,7 +40,7 @@ async def get_fundamental_data(args: SymbolInput) -> Dict[str, Any]:
     Obtiene datos fundamentales clave para una empresa, como su relación P/E, capitalización de mercado y más.
     """
     try:
-        ticker = yf.Ticker(args.symbol)
+        ticker = _yfinance().Ticker(args.symbol)
         info = ticker.info
 
         # Extraer una lista curada de puntos de datos fundamentales
@@ -76,13 +68,15 @@ async def get_technical_indicators(args: TechnicalIndicatorsInput) -> Dict[str,
     Ejemplos de indicadores: 'SMA_50' (Media Móvil Simple de 50 días), 'RSI_14' (Índice de Fuerza Relativa de 14 días), 'MACD_12_26_9'.
     """
     try:
-        ticker = yf.Ticker(args.symbol)
+        ticker = _yfinance().Ticker(args.symbol)
         hist = ticker.history(period="1y")
 
         if hist.empty:
             return {"error": f"No se encontraron datos históricos para el símbolo {args.symbol}"}
 
-        # Crear una estrategia personalizada para pandas-ta
+        # Crear una estrategia personalizada para pandas-ta (importarlo registra el accesor .ta)
+        import pandas_ta as ta
+
         strategy = ta.Strategy(
             name="Custom Indicators",
             ta=[{"kind": indicator.lower()} for indicator in args.indicators]
@@ -112,19 +106,16 @@ async def get_news_sentiment(args: SymbolInput) -> Dict[str, Any]:
     Analiza los titulares de noticias más recientes para un símbolo y devuelve un sentimiento general.
     """
     try:
-        ticker = yf.Ticker(args.symbol)
+        ticker = _yfinance().Ticker(args.symbol)
         news = ticker.news
 
         if not news:
             return {"symbol": args.symbol, "sentiment": "Neutral", "reason": "No se encontraron noticias recientes."}
 
-        total_score = 0
-        headlines = []
-        for item in news:
-            headline = item.get("title", "")
-            headlines.append(headline)
-            total_score += simple_sentiment_analysis(headline)
-        
+        headlines = [item.get("title", "") for item in news]
+        scores = default_scorer.score_many(headlines)
+        total_score = sum((score > 0) - (score < 0) for score in scores)
+
         if total_score > 0:
             sentiment = "Positive"
         elif total_score < 0:
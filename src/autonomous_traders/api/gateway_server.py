@@ -0,0 +1,55 @@
+import importlib
+import sys
+
+from mcp.server.fastmcp import FastMCP
+
+# Servidores locales que puede alojar la pasarela: espacio de nombres -> módulo
+NAMESPACES = {
+    "accounts": "autonomous_traders.api.accounts_server",
+    "push": "autonomous_traders.api.push_server",
+    "analysis": "autonomous_traders.api.financial_analysis_server",
+    "market": "autonomous_traders.api.market_server",
+}
+
+mcp = FastMCP("gateway_server")
+
+
+def prefixed(namespace: str, tool: str) -> str:
+    """El nombre de una herramienta montada en la pasarela."""
+    return f"{namespace}_{tool}"
+
+
+def mount(namespace: str) -> None:
+    """
+    Registra en la pasarela las herramientas y recursos de un servidor local, con el nombre de
+    cada herramienta precedido de su espacio de nombres (p. ej., accounts_get_balance).
+
+    Todos los servidores montados comparten proceso, así que comparten también la caché de
+    cuentas, la caché de precios, la cola de notificaciones y la inicialización de las bases
+    de datos.
+    """
+    server: FastMCP = importlib.import_module(NAMESPACES[namespace]).mcp
+    for tool in server._tool_manager.list_tools():
+        mcp.add_tool(
+            tool.fn,
+            name=prefixed(namespace, tool.name),
+            title=tool.title,
+            description=tool.description,
+            annotations=tool.annotations,
+        )
+    # Las URI de los recursos ya llevan su propio esquema (accounts://...)
+    for template in server._resource_manager.list_templates():
+        mcp._resource_manager.add_template(
+            template.fn,
+            template.uri_template,
+            name=template.name,
+            description=template.description,
+            mime_type=template.mime_type,
+        )
+
+
+if __name__ == "__main__":
+    # Los espacios de nombres a montar se pasan como argumentos; por defecto, todos
+    for namespace in sys.argv[1:] or NAMESPACES:
+        mount(namespace)
+    mcp.run(transport="stdio")
@@ -1,5 +1,7 @@
 from autonomous_traders.core.market import get_share_price
+from autonomous_traders.core.screener import screen
 
+from autonomous_traders.data.async_database import run_read
 from mcp.server.fastmcp import FastMCP
 
 mcp = FastMCP("market_server")
@@ -12,7 +14,52 @@ async def lookup_share_price(symbol: str) -> float:
     Argumentos:
         symbol: el símbolo de la acción
     """
-    return get_share_price(symbol)
+    return await run_read(get_share_price, symbol)
+
+
+@mcp.tool()
+async def screen_market(
+    sort_by: str = "change",
+    ascending: bool = False,
+    min_price: float | None = None,
+    max_price: float | None = None,
+    min_volume: float | None = None,
+    min_change: float | None = None,
+    min_momentum: float | None = None,
+    min_volume_spike: float | None = None,
+    momentum_days: int = 5,
+    limit: int = 20,
+) -> dict:
+    """Esta herramienta filtra y ordena todas las acciones del mercado en una sola llamada,
+    usando las instantáneas diarias de cierre. Úsala para encontrar los mayores ganadores o perdedores,
+    acciones en una banda de precios, con momentum de N días o con picos de volumen, en lugar de
+    consultar los precios símbolo a símbolo.
+
+    Argumentos:
+        sort_by: el criterio de orden: 'change' (variación diaria %), 'momentum' (variación en N días %), 'volume_spike' (volumen frente a su media), 'price' o 'volume'
+        ascending: True para ordenar de menor a mayor (p. ej., los mayores perdedores)
+        min_price: precio mínimo de cierre
+        max_price: precio máximo de cierre
+        min_volume: volumen mínimo del último día
+        min_change: variación diaria mínima en %
+        min_momentum: variación mínima en % durante los últimos momentum_days días
+        min_volume_spike: relación mínima entre el volumen del último día y su media
+        momentum_days: el número de días para el momentum y la media de volumen
+        limit: el número máximo de resultados
+    """
+    return await run_read(
+        screen,
+        sort_by=sort_by,
+        ascending=ascending,
+        min_price=min_price,
+        max_price=max_price,
+        min_volume=min_volume,
+        min_change=min_change,
+        min_momentum=min_momentum,
+        min_volume_spike=min_volume_spike,
+        momentum_days=momentum_days,
+        limit=limit,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,141 @@
+import os
+import sys
+
+from mcp.server.fastmcp import FastMCP
+from pydantic import BaseModel, Field
+
+from autonomous_traders.data import memory
+from autonomous_traders.data.async_database import run_read, run_write
+
+mcp = FastMCP("memory_server")
+
+# Cada trader trabaja en su propio espacio de nombres dentro del grafo compartido
+namespace = (sys.argv[1] if len(sys.argv) > 1 else os.getenv("MEMORY_NAMESPACE", "default")).lower()
+
+
+class Entity(BaseModel):
+    name: str = Field(description="El nombre único de la entidad (p. ej., 'Apple Inc.')")
+    entityType: str = Field(description="El tipo de la entidad (p. ej., 'empresa', 'sitio web')")
+    observations: list[str] = Field(
+        default_factory=list, description="Hechos o notas sobre la entidad"
+    )
+
+
+class Relation(BaseModel):
+    source: str = Field(description="El nombre de la entidad de origen")
+    target: str = Field(description="El nombre de la entidad de destino")
+    type: str = Field(description="El tipo de relación, en voz activa (p. ej., 'compite con')")
+
+
+@mcp.tool()
+async def create_entities(entities: list[Entity]) -> str:
+    """Crea entidades en el grafo de conocimiento. Si una entidad ya existe, se le añaden las observaciones.
+
+    Args:
+        entities: Las entidades, cada una con name, entityType y observations
+    """
+    await run_write(
+        memory.write_entities,
+        namespace,
+        [(entity.name, entity.entityType, entity.observations) for entity in entities],
+    )
+    return f"{len(entities)} entidades guardadas"
+
+
+@mcp.tool()
+async def add_observations(name: str, observations: list[str]) -> str:
+    """Añade observaciones a una entidad existente.
+
+    Args:
+        name: El nombre de la entidad
+        observations: Las nuevas observaciones
+    """
+    added = await run_write(memory.write_observations, namespace, name, observations)
+    return f"{len(added)} observaciones añadidas a {name}"
+
+
+@mcp.tool()
+async def create_relations(relations: list[Relation]) -> str:
+    """Crea relaciones entre entidades del grafo de conocimiento.
+
+    Args:
+        relations: Las relaciones, cada una con source, target y type
+    """
+    await run_write(
+        memory.write_relations,
+        namespace,
+        [(relation.source, relation.target, relation.type) for relation in relations],
+    )
+    return f"{len(relations)} relaciones guardadas"
+
+
+@mcp.tool()
+async def search_nodes(query: str, limit: int = memory.SEARCH_LIMIT) -> dict:
+    """Busca entidades por nombre, tipo u observaciones, de la más a la menos relevante, junto con
+    las relaciones entre ellas.
+
+    Args:
+        query: Las palabras a buscar
+        limit: El número máximo de entidades a devolver
+    """
+    return await run_read(memory.search_entities, namespace, query, limit)
+
+
+@mcp.tool()
+async def open_nodes(names: list[str]) -> dict:
+    """Obtiene las entidades con esos nombres exactos y las relaciones entre ellas.
+
+    Args:
+        names: Los nombres de las entidades
+    """
+    return await run_read(memory.read_entities, namespace, names)
+
+
+@mcp.tool()
+async def read_graph() -> dict:
+    """Obtiene el grafo de conocimiento completo: todas las entidades y relaciones."""
+    return await run_read(memory.read_graph, namespace)
+
+
+@mcp.tool()
+async def delete_entity(name: str) -> str:
+    """Borra una entidad con sus observaciones y relaciones.
+
+    Args:
+        name: El nombre de la entidad
+    """
+    if not await run_write(memory.delete_entity, namespace, name):
+        return f"No existe la entidad {name}"
+    return f"Entidad {name} borrada"
+
+
+@mcp.tool()
+async def delete_observations(name: str, observations: list[str]) -> str:
+    """Borra observaciones concretas de una entidad.
+
+    Args:
+        name: El nombre de la entidad
+        observations: Las observaciones a borrar, con su texto exacto
+    """
+    deleted = await run_write(memory.delete_observations, namespace, name, observations)
+    return f"{deleted} observaciones borradas de {name}"
+
+
+@mcp.tool()
+async def delete_relation(source: str, target: str, type: str) -> str:
+    """Borra una relación entre dos entidades.
+
+    Args:
+        source: El nombre de la entidad de origen
+        target: El nombre de la entidad de destino
+        type: El tipo de relación
+    """
+    if not await run_write(memory.delete_relation, namespace, source, target, type):
+        return "No existe esa relación"
+    return "Relación borrada"
+
+
+if __name__ == "__main__":
+    # El grafo que guardaba mcp-memory-libsql para este trader se trae la primera vez
+    memory.import_libsql_memory(namespace, os.path.join(memory.MEMORY_DIR, f"{namespace}.db"))
+    mcp.run(transport="stdio")
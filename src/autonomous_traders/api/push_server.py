@@ -1,17 +1,8 @@
-import os
-
-import requests
-from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 
 from mcp.server.fastmcp import FastMCP
 
-load_dotenv(override=True)
-
-pushover_user = os.getenv("PUSHOVER_USER")
-pushover_token = os.getenv("PUSHOVER_TOKEN")
-pushover_url = "https://api.pushover.net/1/messages.json"
-
+from autonomous_traders.utils import notifications
 
 mcp = FastMCP("push_server")
 
@@ -21,11 +12,10 @@ class PushModelArgs(BaseModel):
 
 
 @mcp.tool()
-def push(args: PushModelArgs):
+async def push(args: PushModelArgs):
     """Envía una notificación push con este breve mensaje"""
-    print(f"Push: {args.message}")
-    payload = {"user": pushover_user, "token": pushover_token, "message": args.message}
-    requests.post(pushover_url, data=payload)
+    # Se encola y se envía en segundo plano, agrupada con otros avisos cercanos
+    notifications.push(args.message)
     return "Notification push enviada"
 
 
@@ -1,17 +1,53 @@
 import json
-from datetime import datetime
+import sys
+import threading
+from collections.abc import Sequence
+from typing import Callable, Literal, TypeVar, overload
 
 from dotenv import load_dotenv
-from pydantic import BaseModel
-
-from autonomous_traders.data.database import read_account, write_account, write_log
-from autonomous_traders.core.market import get_share_price
+from pydantic import BaseModel, Field, PrivateAttr
+
+from autonomous_traders.data.database import (
+    UnknownAccountError,
+    apply_trades,
+    create_account,
+    read_account,
+    read_account_ledger,
+    read_account_version,
+    read_portfolio_values,
+    read_resting_orders,
+    read_transactions,
+    reset_account,
+    update_balance,
+    update_strategy,
+    write_account,
+    write_account_summary,
+    write_log,
+)
+from autonomous_traders.core import clock
+from autonomous_traders.core.market import get_price_epoch, get_share_prices
+from autonomous_traders.core.recorder import record_portfolio_value
 
 load_dotenv(override=True)
 
 INITIAL_BALANCE = 10_000.0
 SPREAD = 0.002
 
+# Reintentos de una escritura compare-and-swap cuando otro proceso ha cambiado la cuenta
+MAX_RETRIES = 3
+
+T = TypeVar("T")
+
+# Transacciones recientes incluidas en el informe de la cuenta
+RECENT_TRANSACTIONS = 20
+
+# Valoraciones en caché por cuenta: nombre -> (clave de validez, (valor, ganancia/pérdida))
+_valuations: dict[str, tuple[tuple, tuple[float, float]]] = {}
+
+
+class ConcurrentModificationError(Exception):
+    """La cuenta ha cambiado en la base de datos desde que se leyó."""
+
 
 class Transaction(BaseModel):
     symbol: str
@@ -29,131 +65,454 @@ class Transaction(BaseModel):
         )
 
 
+class TransactionLog(Sequence):
+    """
+    Historial de transacciones de una cuenta que se lee de la base de datos solo cuando
+    se accede a él. Las filas se guardan como tuplas compactas y se convierten en
+    Transaction únicamente al indexarlas o recorrerlas.
+    """
+
+    __slots__ = ("name", "_rows")
+
+    def __init__(self, name: str):
+        self.name = name
+        self._rows: list[tuple[str, int, float, str, str]] | None = None
+
+    def _load(self) -> list[tuple[str, int, float, str, str]]:
+        if self._rows is None:
+            self._rows = [
+                (sys.intern(symbol), quantity, price, timestamp, rationale)
+                for symbol, quantity, price, timestamp, rationale in read_transactions(
+                    self.name
+                )
+            ]
+        return self._rows
+
+    @staticmethod
+    def _transaction(row) -> Transaction:
+        symbol, quantity, price, timestamp, rationale = row
+        return Transaction(
+            symbol=symbol,
+            quantity=quantity,
+            price=price,
+            timestamp=timestamp,
+            rationale=rationale,
+        )
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    @overload
+    def __getitem__(self, index: int) -> Transaction: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Transaction]: ...
+
+    def __getitem__(self, index):
+        rows = self._load()
+        if isinstance(index, slice):
+            return [self._transaction(row) for row in rows[index]]
+        return self._transaction(rows[index])
+
+    def extend(self, transactions: list[Transaction]):
+        # Si todavía no se ha leído, la próxima lectura ya incluirá las nuevas transacciones
+        if self._rows is not None:
+            self._rows.extend(
+                (t.symbol, t.quantity, t.price, t.timestamp, t.rationale)
+                for t in transactions
+            )
+
+
+class Order(BaseModel):
+    symbol: str = Field(description="El símbolo de la acción")
+    quantity: int = Field(description="La cantidad de acciones")
+    side: Literal["buy", "sell"] = Field(description="'buy' para comprar, 'sell' para vender")
+    rationale: str = Field(
+        description="La razón de la orden y su relación con la estrategia de la cuenta"
+    )
+
+
+class Aggregates(BaseModel):
+    """Agregados de la cuenta mantenidos en O(1) por operación (método de coste medio)."""
+
+    net_invested: float = 0.0
+    realized_pnl: float = 0.0
+    average_cost: dict[str, float] = {}
+
+    def apply(self, symbol: str, quantity: int, price: float, held: int):
+        """Aplica una operación con cantidad con signo sobre una posición de `held` acciones."""
+        self.net_invested += quantity * price
+        if quantity > 0:
+            average = self.average_cost.get(symbol, 0.0)
+            self.average_cost[symbol] = (average * held + price * quantity) / (
+                held + quantity
+            )
+        else:
+            average = self.average_cost.get(symbol, price)
+            self.realized_pnl += -quantity * (price - average)
+            if held + quantity == 0:
+                self.average_cost.pop(symbol, None)
+
+    @classmethod
+    def from_transactions(cls, transactions: list[Transaction]) -> "Aggregates":
+        """Reconstruye los agregados recorriendo todo el historial de transacciones."""
+        aggregates = cls()
+        held: dict[str, int] = {}
+        for transaction in transactions:
+            position = held.get(transaction.symbol, 0)
+            aggregates.apply(
+                transaction.symbol, transaction.quantity, transaction.price, position
+            )
+            held[transaction.symbol] = position + transaction.quantity
+        return aggregates
+
+
 class Account(BaseModel):
     name: str
     balance: float
     strategy: str
     holdings: dict[str, int]
-    transactions: list[Transaction]
-    portfolio_value_time_series: list[tuple[str, float]]
+    aggregates: Aggregates = Field(default_factory=Aggregates)
+    version: int = 0
+    _transactions: TransactionLog | None = PrivateAttr(default=None)
+    _portfolio_value_time_series: list[tuple[str, float]] | None = PrivateAttr(
+        default=None
+    )
 
     @classmethod
     def get(cls, name: str):
-        fields = read_account(name.lower())
-        if not fields:
-            fields = {
-                "name": name.lower(),
-                "balance": INITIAL_BALANCE,
-                "strategy": "",
-                "holdings": {},
-                "transactions": [],
-                "portfolio_value_time_series": [],
-            }
-            write_account(name, fields)
-        return cls(**fields)
+        """
+        Reconstruye la cuenta a partir de su última instantánea y los eventos posteriores. Solo
+        lee, así que puede usarse desde cualquier hilo; la cuenta debe existir (Account.open).
+        """
+        snapshot, events = read_account_ledger(name)
+        if snapshot is None and not events:
+            raise UnknownAccountError(f"No existe la cuenta {name}")
+        account = cls.from_ledger(name, snapshot, events)
+        if account.aggregates is None:
+            # Cuentas guardadas antes de mantener los agregados, hasta que Account.open las migre
+            account.rebuild_aggregates()
+        return account
+
+    @classmethod
+    def open(cls, name: str):
+        """
+        Da de alta la cuenta si todavía no existe y guarda los agregados de las cuentas
+        anteriores a ellos. Escribe, así que en un servidor se llama desde el hilo escritor.
+        """
+        snapshot, events = read_account_ledger(name)
+        if snapshot is None and not events:
+            create_account(name, INITIAL_BALANCE, clock.timestamp())
+            snapshot, events = read_account_ledger(name)
+        account = cls.from_ledger(name, snapshot, events)
+        if account.aggregates is None:
+            account.rebuild_aggregates()
+            account.save()
+        return account
+
+    @classmethod
+    def as_of(cls, name: str, timestamp: str) -> "Account":
+        """
+        El estado de la cuenta (saldo, estrategia, tenencias y agregados) tal como estaba en
+        `timestamp`, reproduciendo el libro mayor hasta ese momento.
+        """
+        snapshot, events = read_account_ledger(name, until=timestamp)
+        if snapshot is None and not events:
+            raise ValueError(f"La cuenta {name} no existía en {timestamp}")
+        return cls.from_ledger(name, snapshot, events)
+
+    @classmethod
+    def from_ledger(
+        cls, name: str, snapshot: dict | None, events: list[tuple[str, dict, int]]
+    ) -> "Account":
+        account = cls(name=name.lower(), balance=0.0, strategy="", holdings={})
+        if snapshot is not None:
+            account._apply_event("state", snapshot)
+            account.version = snapshot["version"]
+        for type, payload, version in events:
+            account._apply_event(type, payload)
+            account.version = version
+        return account
+
+    def _apply_event(self, type: str, payload: dict):
+        """Aplica un evento del libro mayor al estado en memoria."""
+        if type in ("create", "reset"):
+            self.balance = payload["balance"]
+            self.strategy = payload.get("strategy", "")
+            self.holdings = {}
+            self.aggregates = Aggregates()
+        elif type in ("deposit", "withdraw"):
+            self.balance += payload["amount"]
+        elif type in ("buy", "sell"):
+            symbol, quantity, price = payload["symbol"], payload["quantity"], payload["price"]
+            held = self.holdings.get(symbol, 0)
+            self.balance -= quantity * price
+            self.aggregates.apply(symbol, quantity, price, held)
+            if held + quantity:
+                self.holdings[symbol] = held + quantity
+            else:
+                self.holdings.pop(symbol, None)
+        elif type == "strategy":
+            self.strategy = payload["strategy"]
+        elif type == "state":
+            self.balance = payload["balance"]
+            self.strategy = payload["strategy"]
+            self.holdings = dict(payload["holdings"])
+            aggregates = payload["aggregates"]
+            # Las cuentas anteriores a los agregados los reconstruyen Account.get y Account.open
+            self.aggregates = Aggregates(**aggregates) if aggregates else None  # type: ignore
+        else:
+            raise ValueError(f"Evento de cuenta no reconocido {type}")
+
+    @property
+    def transactions(self) -> TransactionLog:
+        """El historial de transacciones, que solo se lee al usarlo."""
+        if self._transactions is None:
+            self._transactions = TransactionLog(self.name)
+        return self._transactions
+
+    @property
+    def portfolio_value_time_series(self) -> list[tuple[str, float]]:
+        """
+        Los puntos sin agregar de la serie de valor (el último día), que solo se leen al usarlos.
+        Para intervalos más largos o gráficos, usa core.timeseries.portfolio_series.
+        """
+        if self._portfolio_value_time_series is None:
+            self._portfolio_value_time_series = read_portfolio_values(self.name)
+        return self._portfolio_value_time_series
+
+    def update(self, change: Callable[["Account"], T]) -> T:
+        """
+        Aplica `change`, que valida contra el estado en memoria y escribe con compare-and-swap
+        sobre la versión leída. Si otro proceso ha modificado la cuenta entretanto se vuelve a
+        leer y a aplicar el cambio, hasta MAX_RETRIES veces.
+        """
+        for attempt in range(MAX_RETRIES):
+            try:
+                return change(self)
+            except ConcurrentModificationError:
+                if attempt == MAX_RETRIES - 1:
+                    raise
+                self.reload()
+        raise AssertionError("unreachable")
 
     def save(self):
-        write_account(self.name.lower(), self.model_dump())
+        """Guarda saldo, estrategia, tenencias y agregados si nadie ha cambiado la versión leída."""
+        state = self.model_dump(include={"balance", "strategy", "holdings", "aggregates"})
+        self._written(
+            write_account(self.name.lower(), state, self.version, clock.timestamp())
+        )
+
+    def refresh(self):
+        """Vuelve a leer el estado actual de la cuenta, sin el historial, tras una escritura."""
+        state = read_account(self.name)
+        self.balance = state["balance"]  # type: ignore
+        self.strategy = state["strategy"]  # type: ignore
+        self.holdings = state["holdings"]  # type: ignore
+        self.aggregates = Aggregates(**state["aggregates"])  # type: ignore
+        self.version = state["version"]  # type: ignore
+
+    def reload(self):
+        """Vuelve a leer el estado y descarta el historial ya cargado, que puede estar desfasado."""
+        self.refresh()
+        self._transactions = None
+        self._portfolio_value_time_series = None
+
+    def _written(self, version: int | None):
+        """Anota la versión de una escritura compare-and-swap o avisa de que no se ha aplicado."""
+        if version is None:
+            raise ConcurrentModificationError(
+                f"La cuenta {self.name} ha sido modificada por otro proceso."
+            )
+        self.version = version
 
     def reset(self, strategy: str):
+        self.version = reset_account(
+            self.name, INITIAL_BALANCE, strategy, clock.timestamp()
+        )
         self.balance = INITIAL_BALANCE
         self.strategy = strategy
         self.holdings = {}
-        self.transactions = []
-        self.portfolio_value_time_series = []
-        self.save()
+        self._transactions = None
+        self._portfolio_value_time_series = None
+        self.aggregates = Aggregates()
+        self.publish_summary()
 
     def deposit(self, amount: float):
         """Depositar fondos en la cuenta."""
         if amount <= 0:
             raise ValueError("El depósito debe ser un número positivo.")
-        self.balance += amount
+        update_balance(self.name, amount, clock.timestamp())
+        self.refresh()
+        self.publish_summary()
         print(f"Depositados ${amount}. Nuevo balance: ${self.balance}")
-        self.save()
 
     def withdraw(self, amount: float):
         """Retirar fondos de la cuenta, asegurándose de que no queden en negativo."""
         if amount > self.balance:
             raise ValueError("No hay fondos suficientes para retirar.")
-        self.balance -= amount
+        # La sentencia SQL vuelve a comprobar el saldo por si otro proceso lo ha cambiado
+        update_balance(self.name, -amount, clock.timestamp())
+        self.refresh()
+        self.publish_summary()
         print(f"Reitrados ${amount}. Nuevo balance: ${self.balance}")
-        self.save()
 
-    def buy_shares(self, symbol: str, quantity: int, rationale: str) -> str:
+    def buy_shares(
+        self, symbol: str, quantity: int, rationale: str, prices: dict[str, float] | None = None
+    ) -> str:
         """Comprar acciones de una empresa si hay fondos suficientes disponibles."""
-        price = get_share_price(symbol)
-        buy_price = price * (1 + SPREAD)
-        total_cost = buy_price * quantity
-
-        if total_cost > self.balance:
-            raise ValueError("Fondos insuficientes para comprar acciones.")
-        elif price == 0:
-            raise ValueError(f"Símbolo no reconocido {symbol}")
-
-        # Actualizar existencias
-        self.holdings[symbol] = self.holdings.get(symbol, 0) + quantity
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        # Registrar transacción
-        transaction = Transaction(
-            symbol=symbol,
-            quantity=quantity,
-            price=buy_price,
-            timestamp=timestamp,
-            rationale=rationale,
+        return self.execute_orders(
+            [Order(symbol=symbol, quantity=quantity, side="buy", rationale=rationale)], prices
         )
-        self.transactions.append(transaction)
-
-        # Update balance
-        self.balance -= total_cost
-        self.save()
-        write_log(self.name, "account", f"Ha comprado {quantity} de {symbol}")
-        return "Completado. Últimos detalles:\n" + self.report()
 
-    def sell_shares(self, symbol: str, quantity: int, rationale: str) -> str:
+    def sell_shares(
+        self, symbol: str, quantity: int, rationale: str, prices: dict[str, float] | None = None
+    ) -> str:
         """Vender acciones de una acción si el usuario tiene suficientes acciones.."""
-        if self.holdings.get(symbol, 0) < quantity:
-            raise ValueError(
-                f"No pueden venderse {quantity} acciones de {symbol}. No hay suficientes acciones en posesión."
-            )
-
-        price = get_share_price(symbol)
-        sell_price = price * (1 - SPREAD)
-        total_proceeds = sell_price * quantity
-
-        # Actualizar existencias
-        self.holdings[symbol] -= quantity
+        return self.execute_orders(
+            [Order(symbol=symbol, quantity=quantity, side="sell", rationale=rationale)], prices
+        )
 
-        # Si las acciones se venden en su totalidad, retirarlas de las tenencias
-        if self.holdings[symbol] == 0:
-            del self.holdings[symbol]
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        # Registrar transacción
-        transaction = Transaction(
-            symbol=symbol,
-            quantity=-quantity,
-            price=sell_price,
-            timestamp=timestamp,
-            rationale=rationale,
-        )  # cantidad negativa para vender
-        self.transactions.append(transaction)
+    def execute_orders(
+        self, orders: list[Order], prices: dict[str, float] | None = None
+    ) -> str:
+        """
+        Ejecuta un lote de órdenes de forma atómica: se valoran todos los símbolos de una vez,
+        se valida el efectivo y las acciones de todo el lote y se guarda la cuenta una sola vez.
+        Si alguna orden no es válida no se aplica ninguna.
+
+        Args:
+            orders: Las órdenes del lote
+            prices: Los precios de mercado a los que se ejecutan y con los que se valora después
+                la cartera; los que falten se consultan ahora
+        """
+        if not orders:
+            raise ValueError("No hay órdenes que ejecutar.")
+
+        if prices is None:
+            prices = get_share_prices(sorted({order.symbol for order in orders}))
+        messages = self.update(lambda account: account._apply_orders(orders, prices))
+        self.publish_summary(prices)
+        write_log(self.name, "account", "; ".join(messages))
+        return "Completado. Últimos detalles:\n" + self.report(prices)
+
+    def _apply_orders(self, orders: list[Order], prices: dict[str, float]) -> list[str]:
+        """Valida el lote contra el estado en memoria y lo guarda si la versión no ha cambiado."""
+        balance = self.balance
+        holdings = dict(self.holdings)
+        transactions = []
+        messages = []
+        timestamp = clock.timestamp()
+
+        # Las ventas se aplican primero para que su efectivo financie las compras del lote
+        for order in sorted(orders, key=lambda order: order.side != "sell"):
+            symbol, quantity = order.symbol, order.quantity
+            price = prices[symbol]
+            if quantity <= 0:
+                raise ValueError("La cantidad debe ser un número positivo.")
+
+            if order.side == "sell":
+                if holdings.get(symbol, 0) < quantity:
+                    raise ValueError(
+                        f"No pueden venderse {quantity} acciones de {symbol}. No hay suficientes acciones en posesión."
+                    )
+                trade_price = price * (1 - SPREAD)
+                balance += trade_price * quantity
+                holdings[symbol] -= quantity
+                # cantidad negativa para vender
+                signed_quantity = -quantity
+                messages.append(f"Vendidas {quantity} de {symbol}")
+            else:
+                trade_price = price * (1 + SPREAD)
+                total_cost = trade_price * quantity
+                if total_cost > balance:
+                    raise ValueError("Fondos insuficientes para comprar acciones.")
+                elif price == 0:
+                    raise ValueError(f"Símbolo no reconocido {symbol}")
+                balance -= total_cost
+                holdings[symbol] = holdings.get(symbol, 0) + quantity
+                signed_quantity = quantity
+                messages.append(f"Ha comprado {quantity} de {symbol}")
+
+            transactions.append(
+                Transaction(
+                    symbol=symbol,
+                    quantity=signed_quantity,
+                    price=trade_price,
+                    timestamp=timestamp,
+                    rationale=order.rationale,
+                )
+            )
 
-        # Actualizar el balance
-        self.balance += total_proceeds
-        self.save()
-        write_log(self.name, "account", f"Vendidas {quantity} de {symbol}")
-        return "Completado. Últimos detalles:\n" + self.report()
+        # La validación anterior da errores claros; las sentencias condicionales de apply_trades
+        # garantizan además el saldo y las acciones, y la versión que no se ha colado otra escritura
+        self._written(
+            apply_trades(
+                self.name,
+                [
+                    (t.symbol, t.quantity, t.price, t.timestamp, t.rationale)
+                    for t in transactions
+                ],
+                self.version,
+            )
+        )
+        # Sin escrituras intermedias, el nuevo estado es el leído más las operaciones del lote
+        for t in transactions:
+            self._apply_event(
+                "sell" if t.quantity < 0 else "buy",
+                {"symbol": t.symbol, "quantity": t.quantity, "price": t.price},
+            )
+        self.transactions.extend(transactions)
+        return messages
 
-    def calculate_portfolio_value(self):
+    def calculate_portfolio_value(self, prices: dict[str, float] | None = None):
         """Calcular el valor total de la cartera del usuario."""
+        prices = prices or {}
+        missing = [symbol for symbol in self.holdings if symbol not in prices]
+        if missing:
+            prices = {**prices, **get_share_prices(missing)}
         total_value = self.balance
         for symbol, quantity in self.holdings.items():
-            total_value += get_share_price(symbol) * quantity
+            total_value += prices[symbol] * quantity
         return total_value
 
     def calculate_profit_loss(self, portfolio_value: float):
         """Calcular la ganancia o pérdida desde el gasto inicial."""
-        initial_spend = sum(transaction.total() for transaction in self.transactions)
-        return portfolio_value - initial_spend - self.balance
+        return portfolio_value - self.aggregates.net_invested - self.balance
+
+    def calculate_unrealized_profit_loss(
+        self, prices: dict[str, float] | None = None
+    ) -> dict[str, float]:
+        """Calcular la ganancia o pérdida no realizada de cada posición."""
+        prices = prices or {}
+        missing = [symbol for symbol in self.holdings if symbol not in prices]
+        if missing:
+            prices = {**get_share_prices(missing), **prices}
+        return {
+            symbol: (prices[symbol] - self.aggregates.average_cost.get(symbol, 0.0))
+            * quantity
+            for symbol, quantity in self.holdings.items()
+        }
+
+    def rebuild_aggregates(self) -> Aggregates:
+        """Reconstruye los agregados desde el historial de transacciones."""
+        self.aggregates = Aggregates.from_transactions(self.transactions)
+        return self.aggregates
+
+    def verify_aggregates(self, tolerance: float = 1e-6) -> bool:
+        """Comprueba que los agregados coinciden con los reconstruidos desde el historial."""
+        rebuilt = Aggregates.from_transactions(self.transactions)
+        current = self.aggregates
+        return (
+            abs(rebuilt.net_invested - current.net_invested) <= tolerance
+            and abs(rebuilt.realized_pnl - current.realized_pnl) <= tolerance
+            and rebuilt.average_cost.keys() == current.average_cost.keys()
+            and all(
+                abs(rebuilt.average_cost[symbol] - current.average_cost[symbol])
+                <= tolerance
+                for symbol in rebuilt.average_cost
+            )
+        )
 
     def get_holdings(self):
         """Reportar las tenencias actuales del usuario."""
@@ -163,24 +522,71 @@ class Account(BaseModel):
         """Reportar la ganancia o pérdida del usuario en cualquier momento."""
         return self.calculate_profit_loss()  # type: ignore
 
-    def list_transactions(self):
-        """Lista todas las transacciones hechas por el usuario."""
-        return [transaction.model_dump() for transaction in self.transactions]
-
-    def report(self) -> str:
-        """Devuelve un string de un json representando la cuenta."""
-        portfolio_value = self.calculate_portfolio_value()
-        self.portfolio_value_time_series.append(
-            (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), portfolio_value)
+    def list_transactions(
+        self, offset: int = 0, limit: int | None = None, symbol: str | None = None
+    ) -> list[dict]:
+        """Lista las transacciones hechas por el usuario, de la más reciente a la más antigua."""
+        return [
+            dict(zip(Transaction.model_fields, row))
+            for row in read_transactions(
+                self.name, offset, limit, symbol, newest_first=True
+            )
+        ]
+
+    def valuation(self, prices: dict[str, float] | None = None) -> tuple[float, float]:
+        """
+        Devuelve (valor de la cartera, ganancia/pérdida). El resultado se guarda en caché
+        hasta que cambian los precios del proveedor o las tenencias y el efectivo de la cuenta.
+        Con `prices` se valora con esos precios en lugar de consultarlos, y forman parte de la
+        clave de la caché.
+        """
+        given = prices or {}
+        key = (
+            get_price_epoch(),
+            tuple((symbol, given.get(symbol)) for symbol in sorted(self.holdings)),
+            self.balance,
+            tuple(sorted(self.holdings.items())),
+            self.aggregates.net_invested,
         )
-        self.save()
+        cached = _valuations.get(self.name)
+        if cached and cached[0] == key:
+            return cached[1]
+        portfolio_value = self.calculate_portfolio_value(prices)
         pnl = self.calculate_profit_loss(portfolio_value)
+        _valuations[self.name] = (key, (portfolio_value, pnl))
+        return portfolio_value, pnl
+
+    def publish_summary(self, prices: dict[str, float] | None = None):
+        """Actualiza la fila de la cuenta en la tabla resumen compartida que leen la UI y la clasificación."""
+        portfolio_value, pnl = self.valuation(prices)
+        last = read_transactions(self.name, limit=1, newest_first=True)
+        write_account_summary(
+            self.name,
+            self.balance,
+            portfolio_value,
+            pnl,
+            len(self.holdings),
+            last[0][3] if last else None,
+            clock.timestamp(),
+        )
+
+    def snapshot(self) -> str:
+        """Devuelve un string de un json representando la cuenta, sin escribir nada."""
+        portfolio_value, pnl = self.valuation()
         data = self.model_dump()
+        data["transactions"] = self.list_transactions(limit=RECENT_TRANSACTIONS)
+        data["open_orders"] = read_resting_orders(self.name, "open")
         data["total_portfolio_value"] = portfolio_value
         data["total_profit_loss"] = pnl
-        write_log(self.name, "account", f"Recuperados detalles de la cuenta")
         return json.dumps(data)
 
+    def report(self, prices: dict[str, float] | None = None) -> str:
+        """Registra el valor de la cartera tras una operación y devuelve la cuenta como json."""
+        portfolio_value, _ = self.valuation(prices)
+        record_portfolio_value(self, portfolio_value)
+        write_log(self.name, "account", f"Recuperados detalles de la cuenta")
+        return self.snapshot()
+
     def get_strategy(self) -> str:
         """Devuelve la estrategia de la cuenta"""
         write_log(self.name, "account", f"Estrategia recibida")
@@ -188,12 +594,65 @@ class Account(BaseModel):
 
     def change_strategy(self, strategy: str) -> str:
         """Si lo deseas, puedes llamar a este método para cambiar tu estrategia de inversión futura"""
-        self.strategy = strategy
-        self.save()
+
+        def change(account: "Account"):
+            account._written(
+                update_strategy(account.name, strategy, clock.timestamp(), account.version)
+            )
+            account.strategy = strategy
+
+        self.update(change)
         write_log(self.name, "account", f"Estrategia cambiada")
         return "Estrategia cambiada"
 
 
+class AccountCache:
+    """
+    Caché de cuentas en memoria para un proceso de larga duración (p. ej., el servidor MCP).
+
+    Cada hilo tiene sus propias copias: el hilo escritor modifica la suya (write-through)
+    mientras los lectores sirven las suyas sin ver estados a medias. Antes de servir una
+    cuenta se comprueba su contador de versión en SQLite, de modo que las escrituras de otros
+    hilos y procesos (la UI, otros servidores) la invalidan sin lecturas obsoletas.
+
+    La caché solo lee, también desde los hilos lectores: las cuentas se dan de alta antes con
+    Account.open en el hilo escritor.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        # Las cachés de todos los hilos, para poder invalidarlas desde cualquiera
+        self._lock = threading.Lock()
+        self._caches: list[dict[str, Account]] = []
+
+    def _accounts(self) -> dict[str, Account]:
+        """Las cuentas en caché del hilo actual."""
+        accounts = getattr(self._local, "accounts", None)
+        if accounts is None:
+            accounts = self._local.accounts = {}
+            with self._lock:
+                self._caches.append(accounts)
+        return accounts
+
+    def get(self, name: str) -> Account:
+        name = name.lower()
+        accounts = self._accounts()
+        account = accounts.get(name)
+        if account is not None and read_account_version(name) == account.version:
+            return account
+        account = Account.get(name)
+        accounts[name] = account
+        return account
+
+    def invalidate(self, name: str | None = None):
+        with self._lock:
+            for accounts in self._caches:
+                if name is None:
+                    accounts.clear()
+                else:
+                    accounts.pop(name.lower(), None)
+
+
 # Example of usage:
 if __name__ == "__main__":
     account = Account("John Doe")  # type: ignore
@@ -0,0 +1,138 @@
+import warnings
+from datetime import timedelta
+
+import numpy as np
+
+from autonomous_traders.core import clock
+from autonomous_traders.data.database import (
+    read_daily_portfolio_values,
+    read_traded_notional,
+)
+
+# Los valores se agregan por día natural, fines de semana incluidos, no por sesión
+PERIODS_PER_YEAR = 365
+RISK_FREE_RATE = 0.0
+VAR_CONFIDENCE = 0.95
+
+METRICS = (
+    "total_return",
+    "volatility",
+    "sharpe",
+    "sortino",
+    "max_drawdown",
+    "turnover",
+    "var",
+)
+
+
+def compute_risk_metrics(
+    values: np.ndarray,
+    traded: np.ndarray,
+    periods_per_year: int = PERIODS_PER_YEAR,
+    risk_free_rate: float = RISK_FREE_RATE,
+    confidence: float = VAR_CONFIDENCE,
+) -> dict[str, np.ndarray]:
+    """
+    Calcula las métricas de riesgo de todas las cuentas en una única pasada vectorizada.
+
+    Args:
+        values: Valores de cartera de forma (cuentas, periodos), con NaN donde no hay dato
+        traded: Importe negociado de cada cuenta en el periodo, de forma (cuentas,)
+
+    Returns:
+        dict: Un array por métrica, con NaN donde no hay datos suficientes. La volatilidad
+        y los ratios están anualizados; el drawdown y el VaR son pérdidas positivas.
+    """
+    if values.shape[1] == 0:
+        values = np.full((len(values), 1), np.nan)
+    # Las cuentas sin datos suficientes dan NaN en lugar de avisos de NumPy
+    with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        returns = values[:, 1:] / values[:, :-1] - 1
+        excess = returns - risk_free_rate / periods_per_year
+        observations = np.sum(np.isfinite(returns), axis=1)
+        enough = observations > 1
+
+        mean = np.nanmean(np.where(enough[:, None], excess, np.nan), axis=1)
+        std = np.nanstd(np.where(enough[:, None], returns, np.nan), axis=1, ddof=1)
+        downside = np.sqrt(np.nanmean(np.minimum(excess, 0) ** 2, axis=1))
+        annual = np.sqrt(periods_per_year)
+
+        valid = np.isfinite(values)
+        first = values[np.arange(len(values)), np.argmax(valid, axis=1)]
+        last = values[
+            np.arange(len(values)), values.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+        ]
+        peaks = np.fmax.accumulate(np.where(valid, values, -np.inf), axis=1)
+        drawdown = np.nanmax(np.where(valid, 1 - values / peaks, np.nan), axis=1)
+
+        var = -np.nanpercentile(
+            np.where(enough[:, None], returns, np.nan), (1 - confidence) * 100, axis=1
+        )
+        return {
+            "total_return": last / first - 1,
+            "volatility": std * annual,
+            "sharpe": mean / std * annual,
+            "sortino": mean / downside * annual,
+            "max_drawdown": drawdown,
+            "turnover": traded / np.nanmean(values, axis=1),
+            "var": var,
+        }
+
+
+def load_values(names: list[str], start: str | None = None) -> tuple[list[str], np.ndarray]:
+    """
+    Carga los valores diarios de cartera de varias cuentas como una matriz (cuentas, días)
+    alineada por fecha, con NaN en los días en los que una cuenta no tiene valor.
+    """
+    rows = read_daily_portfolio_values(names, start)
+    dates = sorted({day for _, day, _ in rows})
+    index = {day: i for i, day in enumerate(dates)}
+    accounts = {name.lower(): i for i, name in enumerate(names)}
+    values = np.full((len(names), len(dates)), np.nan)
+    if rows:
+        name_column, day_column, value_column = zip(*rows)
+        values[
+            [accounts[name] for name in name_column], [index[day] for day in day_column]
+        ] = value_column
+    return dates, values
+
+
+def risk_report(names: list[str], days: int = 365) -> list[dict]:
+    """Las métricas de riesgo de cada cuenta en los últimos `days` días."""
+    if not names:
+        return []
+    # Desde el inicio del primer día, con el mismo formato que la clave de los agregados diarios
+    start = (clock.now() - timedelta(days=days)).strftime("%Y-%m-%d 00:00:00")
+    dates, values = load_values(names, start)
+    notional = read_traded_notional(names, start)
+    traded = np.array([notional.get(name.lower(), 0.0) for name in names])
+    metrics = compute_risk_metrics(values, traded)
+
+    def value(array, i):
+        return round(float(array[i]), 4) if np.isfinite(array[i]) else None
+
+    return [
+        {
+            "name": name,
+            "days": int(np.sum(np.isfinite(values[i]))),
+            **{metric: value(metrics[metric], i) for metric in METRICS},
+        }
+        for i, name in enumerate(names)
+    ]
+
+
+def leaderboard(names: list[str], sort_by: str = "sharpe", days: int = 365) -> list[dict]:
+    """Las métricas de riesgo de las cuentas ordenadas de mejor a peor según `sort_by`."""
+    if sort_by not in METRICS:
+        raise ValueError(f"Métrica no reconocida {sort_by}; usa una de {METRICS}")
+    # En drawdown, volatilidad, rotación y VaR es mejor un valor menor
+    descending = sort_by in ("total_return", "sharpe", "sortino")
+    report = risk_report(names, days)
+    missing = [row for row in report if row[sort_by] is None]
+    ranked = sorted(
+        (row for row in report if row[sort_by] is not None),
+        key=lambda row: row[sort_by],
+        reverse=descending,
+    )
+    return ranked + missing
@@ -0,0 +1,57 @@
+import time
+from datetime import datetime
+
+from autonomous_traders.data.database import read_clock, write_clock
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# El reloj guardado se vuelve a leer como mucho una vez por este intervalo, en lugar de en
+# cada consulta de precio u operación; los cambios de otros procesos llegan con ese retraso
+REFRESH_SECONDS = 1.0
+
+_clock: tuple[str, str] | None = None
+_read_at: float | None = None
+
+
+def refresh() -> tuple[str, str] | None:
+    """Vuelve a leer el reloj guardado, p. ej. al empezar cada ciclo."""
+    global _clock, _read_at
+    _clock = read_clock()
+    _read_at = time.monotonic()
+    return _clock
+
+
+def simulated_now() -> datetime | None:
+    """
+    Devuelve la hora simulada si hay una reproducción en curso, o None en modo real.
+
+    La hora simulada avanza con el tiempo real desde el momento en que se fijó, de modo que
+    las operaciones de un mismo paso de la reproducción quedan ordenadas.
+    """
+    clock = _clock
+    if _read_at is None or time.monotonic() - _read_at >= REFRESH_SECONDS:
+        clock = refresh()
+    if not clock:
+        return None
+    simulated, anchored_at = clock
+    return datetime.fromisoformat(simulated) + (
+        datetime.now() - datetime.fromisoformat(anchored_at)
+    )
+
+
+def now() -> datetime:
+    """Devuelve la hora actual, simulada durante una reproducción histórica."""
+    return simulated_now() or datetime.now()
+
+
+def timestamp() -> str:
+    return now().strftime(TIMESTAMP_FORMAT)
+
+
+def set_simulated_time(moment: datetime | None) -> None:
+    """Fija la hora simulada para todos los procesos; None vuelve al reloj real."""
+    if moment is None:
+        write_clock(None)
+    else:
+        write_clock(moment.isoformat(), datetime.now().isoformat())
+    refresh()
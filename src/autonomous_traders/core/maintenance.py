@@ -0,0 +1,73 @@
+import argparse
+import os
+import time
+
+from dotenv import load_dotenv
+
+from autonomous_traders.data.database import (
+    archive_logs,
+    compact_database,
+    enable_incremental_vacuum,
+    shard_names,
+)
+
+load_dotenv(override=True)
+
+# Intervalo mínimo entre dos pasadas de mantenimiento de las bases de datos
+MAINTENANCE_INTERVAL_SECONDS = int(os.getenv("DB_MAINTENANCE_MINUTES", "60")) * 60
+
+_last_run: float | None = None
+
+
+def run_maintenance(force: bool = False) -> dict[str, int]:
+    """
+    Aplica la retención de registros a todos los traders y compacta sus bases de datos y la
+    compartida, si ha pasado el intervalo mínimo desde la última pasada.
+
+    Returns:
+        dict: nombre -> registros archivados; vacío si todavía no tocaba
+    """
+    global _last_run
+    now = time.monotonic()
+    if not force and _last_run is not None and now - _last_run < MAINTENANCE_INTERVAL_SECONDS:
+        return {}
+    _last_run = now
+    archived = {}
+    for name in shard_names():
+        try:
+            archived[name] = archive_logs(name)
+            compact_database(name)
+        except Exception as e:
+            print(f"Error maintaining the database of {name}: {e}")
+    try:
+        compact_database()
+    except Exception as e:
+        print(f"Error maintaining the shared database: {e}")
+    return archived
+
+
+def convert_databases() -> list[str]:
+    """
+    Pasa a auto_vacuum incremental las bases de datos creadas antes de que se usara, con un
+    VACUUM completo de cada una. Es una operación puntual que hay que lanzar sin traders en
+    marcha; devuelve las bases de datos convertidas.
+    """
+    converted = []
+    for name in [*shard_names(), None]:
+        if enable_incremental_vacuum(name):
+            converted.append(name or "shared")
+    return converted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mantenimiento de las bases de datos")
+    parser.add_argument(
+        "--vacuum",
+        action="store_true",
+        help="Activar antes auto_vacuum incremental en las bases de datos antiguas (con los traders parados)",
+    )
+    args = parser.parse_args()
+    if args.vacuum:
+        print(f"Convertidas: {', '.join(convert_databases()) or 'ninguna'}")
+    archived = run_maintenance(force=True)
+    print(f"Registros archivados: {sum(archived.values())}")
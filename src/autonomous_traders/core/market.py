@@ -1,31 +1,51 @@
 import os
-import random
+from abc import ABC, abstractmethod
 from datetime import datetime, timezone
 from functools import lru_cache
 
 from dotenv import load_dotenv
-from polygon import RESTClient
 
-from autonomous_traders.data.database import read_market, write_market
+from autonomous_traders.core import clock
+from autonomous_traders.core.synthetic import SyntheticMarket
+from autonomous_traders.data.database import (
+    read_market,
+    write_market,
+    write_market_bars,
+)
 
 load_dotenv(override=True)
 
 polygon_api_key = os.getenv("POLYGON_API_KEY")
 polygon_plan = os.getenv("POLYGON_PLAN")
+price_provider_name = os.getenv("PRICE_PROVIDER")
+synthetic_seed = int(os.getenv("SYNTHETIC_SEED", "42"))
 
 is_paid_polygon = polygon_plan == "paid"
 is_realtime_polygon = polygon_plan == "realtime"
 
 
+@lru_cache(maxsize=1)
+def polygon_client():
+    """El cliente de Polygon, importado al usarlo por primera vez para no retrasar el arranque."""
+    from polygon import RESTClient
+
+    return RESTClient(polygon_api_key)
+
+
 def is_market_open() -> bool:
-    client = RESTClient(polygon_api_key)
+    client = polygon_client()
     market_status = client.get_market_status()
     return market_status.market == "open"  # type: ignore
 
 
-def get_all_share_prices_polygon_eod() -> dict[str, float]:
-    """Con mucho agradecimiento a la estudiante Reema R. por arreglar el problema de la zona horaria en esto!"""
-    client = RESTClient(polygon_api_key)
+def get_last_session_bars_polygon_eod() -> tuple[str, dict[str, list[float]]]:
+    """
+    Las barras diarias de todo el mercado de la última sesión cerrada, con la fecha de esa
+    sesión (que en fines de semana y festivos no es la fecha de hoy).
+
+    Con mucho agradecimiento a la estudiante Reema R. por arreglar el problema de la zona horaria en esto!
+    """
+    client = polygon_client()
 
     probe = client.get_previous_close_agg("SPY")[0]  # type: ignore
     last_close = datetime.fromtimestamp(probe.timestamp / 1000, tz=timezone.utc).date()
@@ -33,43 +53,170 @@ def get_all_share_prices_polygon_eod() -> dict[str, float]:
     results = client.get_grouped_daily_aggs(
         last_close, adjusted=True, include_otc=False
     )
-    return {result.ticker: result.close for result in results}  # type: ignore
+    return last_close.strftime("%Y-%m-%d"), {
+        result.ticker: [result.open, result.high, result.low, result.close, result.volume]  # type: ignore
+        for result in results
+    }
+
+
+def get_all_bars_polygon_eod() -> dict[str, list[float]]:
+    return get_last_session_bars_polygon_eod()[1]
+
+
+def get_all_share_prices_polygon_eod() -> dict[str, float]:
+    bars = get_all_bars_polygon_eod()
+    return {ticker: bar[3] for ticker, bar in bars.items()}
 
 
 @lru_cache(maxsize=2)
 def get_market_for_prior_date(today):
     market_data = read_market(today)
     if not market_data:
-        market_data = get_all_share_prices_polygon_eod()
+        # Se guardan también las barras completas para el screener de mercado, con la fecha
+        # de la sesión y no la de hoy, para no guardar la misma sesión con varias fechas
+        session, bars = get_last_session_bars_polygon_eod()
+        market_data = {ticker: bar[3] for ticker, bar in bars.items()}
         write_market(today, market_data)
+        write_market_bars(session, bars)
     return market_data
 
 
-def get_share_price_polygon_eod(symbol) -> float:
-    today = datetime.now().date().strftime("%Y-%m-%d")
-    market_data = get_market_for_prior_date(today)
-    return market_data.get(symbol, 0.0)
+@lru_cache(maxsize=8)
+def get_market_for_replay_date(date) -> dict[str, float]:
+    return read_market(date) or {}
+
+
+class PriceProvider(ABC):
+    """Fuente de precios de acciones. Se elige con la variable de entorno PRICE_PROVIDER."""
+
+    name: str
+
+    @abstractmethod
+    def get_price(self, symbol: str) -> float: ...
+
+    def get_prices(self, symbols: list[str]) -> dict[str, float]:
+        return {symbol: self.get_price(symbol) for symbol in symbols}
+
+    def epoch(self) -> str:
+        """Identifica el periodo durante el cual los precios no cambian (por defecto, el minuto)."""
+        return clock.now().strftime("%Y-%m-%d %H:%M")
+
+
+class PolygonEODProvider(PriceProvider):
+    name = "polygon_eod"
+
+    def get_price(self, symbol: str) -> float:
+        return self.get_prices([symbol])[symbol]
+
+    def get_prices(self, symbols: list[str]) -> dict[str, float]:
+        today = datetime.now().date().strftime("%Y-%m-%d")
+        market_data = get_market_for_prior_date(today)
+        return {symbol: market_data.get(symbol, 0.0) for symbol in symbols}
+
+    def epoch(self) -> str:
+        return datetime.now().date().strftime("%Y-%m-%d")
+
+
+class PolygonSnapshotProvider(PriceProvider):
+    name = "polygon_snapshot"
 
+    def get_price(self, symbol: str) -> float:
+        client = polygon_client()
+        result = client.get_snapshot_ticker("stocks", symbol)
+        return result.min.close or result.prev_day.close  # type: ignore
 
-def get_share_price_polygon_min(symbol) -> float:
-    client = RESTClient(polygon_api_key)
-    result = client.get_snapshot_ticker("stocks", symbol)
-    return result.min.close or result.prev_day.close  # type: ignore
 
+class ReplayProvider(PriceProvider):
+    """Precios de cierre guardados para la fecha del reloj (simulado durante una reproducción)."""
 
-def get_share_price_polygon(symbol) -> float:
+    name = "replay"
+
+    def get_price(self, symbol: str) -> float:
+        return self.get_prices([symbol])[symbol]
+
+    def get_prices(self, symbols: list[str]) -> dict[str, float]:
+        market_data = get_market_for_replay_date(clock.now().strftime("%Y-%m-%d"))
+        return {symbol: market_data.get(symbol, 0.0) for symbol in symbols}
+
+    def epoch(self) -> str:
+        return clock.now().strftime("%Y-%m-%d")
+
+
+class SyntheticProvider(PriceProvider):
+    """Caminos de precios sintéticos coherentes y reproducibles, sin conexión."""
+
+    name = "synthetic"
+
+    def __init__(self, seed: int = synthetic_seed):
+        self.market = SyntheticMarket(seed)
+
+    def get_price(self, symbol: str) -> float:
+        return self.market.price(symbol, clock.now())
+
+    def get_prices(self, symbols: list[str]) -> dict[str, float]:
+        prices = self.market.prices(symbols, clock.now())
+        return {symbol: float(price) for symbol, price in zip(symbols, prices)}
+
+
+PROVIDERS: dict[str, type[PriceProvider]] = {
+    provider.name: provider
+    for provider in (
+        PolygonEODProvider,
+        PolygonSnapshotProvider,
+        ReplayProvider,
+        SyntheticProvider,
+    )
+}
+
+
+def default_provider_name() -> str:
+    if not polygon_api_key:
+        return SyntheticProvider.name
     if is_paid_polygon:
-        return get_share_price_polygon_min(symbol)
-    else:
-        return get_share_price_polygon_eod(symbol)
+        return PolygonSnapshotProvider.name
+    return PolygonEODProvider.name
+
+
+@lru_cache(maxsize=None)
+def create_price_provider(name: str) -> PriceProvider:
+    if name not in PROVIDERS:
+        raise ValueError(
+            f"Proveedor de precios no reconocido {name}; usa uno de {list(PROVIDERS)}"
+        )
+    return PROVIDERS[name]()
+
+
+def get_price_provider() -> PriceProvider:
+    # Durante una reproducción histórica los precios salen siempre de los días guardados
+    if clock.simulated_now():
+        return create_price_provider(ReplayProvider.name)
+    return create_price_provider(price_provider_name or default_provider_name())
+
+
+def get_price_epoch() -> str:
+    """Cambia cada vez que los precios del proveedor activo pueden haber cambiado."""
+    provider = get_price_provider()
+    return f"{provider.name}:{provider.epoch()}"
+
+
+def get_share_prices(symbols: list[str]) -> dict[str, float]:
+    """Obtiene los precios de varios símbolos con una sola consulta al proveedor."""
+    provider = get_price_provider()
+    try:
+        return provider.get_prices(symbols)
+    except Exception as e:
+        print(
+            f"No se pudo usar el proveedor de precios {provider.name} debido a {e}; usando precios sintéticos"
+        )
+        return create_price_provider(SyntheticProvider.name).get_prices(symbols)
 
 
 def get_share_price(symbol) -> float:
-    if polygon_api_key:
-        try:
-            return get_share_price_polygon(symbol)
-        except Exception as e:
-            print(
-                f"No se pudo usar la API de Polygon debido a {e}; usando un número aleatorio"
-            )
-    return float(random.randint(1, 100))
+    provider = get_price_provider()
+    try:
+        return provider.get_price(symbol)
+    except Exception as e:
+        print(
+            f"No se pudo usar el proveedor de precios {provider.name} debido a {e}; usando precios sintéticos"
+        )
+        return create_price_provider(SyntheticProvider.name).get_price(symbol)
@@ -0,0 +1,223 @@
+from collections import defaultdict
+from typing import Literal
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from autonomous_traders.core import clock
+from autonomous_traders.core.accounts import SPREAD, Account, Order
+from autonomous_traders.core.market import get_share_prices
+from autonomous_traders.data.database import (
+    cancel_resting_order,
+    claim_resting_orders,
+    read_resting_orders,
+    recover_resting_orders,
+    shard_names,
+    update_resting_orders,
+    write_log,
+    write_resting_order,
+)
+from autonomous_traders.utils import notifications
+
+
+class RestingOrder(BaseModel):
+    symbol: str = Field(description="El símbolo de la acción")
+    quantity: int = Field(description="La cantidad de acciones")
+    side: Literal["buy", "sell"] = Field(description="'buy' para comprar o 'sell' para vender")
+    type: Literal["limit", "stop", "stop_limit"] = Field(
+        description="'limit' se ejecuta al precio límite o mejor; 'stop' lanza una orden a mercado al "
+        "alcanzar el precio de activación; 'stop_limit' lanza una orden límite al alcanzarlo"
+    )
+    limit_price: float | None = Field(
+        default=None, description="El precio límite, para órdenes 'limit' y 'stop_limit'"
+    )
+    stop_price: float | None = Field(
+        default=None, description="El precio de activación, para órdenes 'stop' y 'stop_limit'"
+    )
+    rationale: str = Field(
+        description="La razón de la orden y su relación con la estrategia de la cuenta"
+    )
+
+
+def place_order(name: str, order: RestingOrder) -> int:
+    """Valida y guarda una orden pendiente; devuelve su identificador."""
+    if order.quantity <= 0:
+        raise ValueError("La cantidad debe ser un número positivo.")
+    if order.type in ("limit", "stop_limit") and not order.limit_price:
+        raise ValueError(f"Las órdenes {order.type} necesitan un precio límite.")
+    if order.type in ("stop", "stop_limit") and not order.stop_price:
+        raise ValueError(f"Las órdenes {order.type} necesitan un precio de activación.")
+    id = write_resting_order(
+        name,
+        order.symbol.upper(),
+        order.side,
+        order.type,
+        order.quantity,
+        order.limit_price if order.type != "stop" else None,
+        order.stop_price if order.type != "limit" else None,
+        order.rationale,
+        clock.timestamp(),
+    )
+    write_log(
+        name,
+        "account",
+        f"Orden {order.type} #{id}: {order.side} {order.quantity} de {order.symbol.upper()}",
+    )
+    return id
+
+
+def cancel_order(name: str, id: int) -> str:
+    if not cancel_resting_order(name, id, clock.timestamp()):
+        raise ValueError(f"No hay ninguna orden abierta #{id} en la cuenta {name}")
+    write_log(name, "account", f"Orden #{id} cancelada")
+    return f"Orden #{id} cancelada"
+
+
+def list_orders(name: str, status: str | None = "open", limit: int = 20) -> list[dict]:
+    return read_resting_orders(name, status, limit)
+
+
+def _notify(name: str, message: str):
+    write_log(name, "account", message)
+    try:
+        notifications.push(f"{name}: {message}")
+    except Exception as e:
+        print(f"Error sending push notification for {name}: {e}")
+
+
+def evaluate_orders(prices: dict[str, float] | None = None) -> list[dict]:
+    """
+    Evalúa todas las órdenes abiertas de todas las cuentas contra los precios actuales en una
+    única pasada vectorizada. Las órdenes stop alcanzadas quedan activadas; las que se pueden
+    ejecutar se ejecutan a esos mismos precios con el modelo de SPREAD de la cuenta, de modo
+    que el límite se compara con el precio final de la operación, y se avisa al titular.
+
+    Returns:
+        list: Las órdenes activadas, ejecutadas o rechazadas en esta pasada
+    """
+    orders = read_resting_orders(status="open")
+    if not orders:
+        return []
+    if prices is None:
+        prices = get_share_prices(sorted({order["symbol"] for order in orders}))
+
+    def column(key, dtype=float):
+        return np.array(
+            [np.nan if order[key] is None else order[key] for order in orders], dtype=dtype
+        )
+
+    price = np.array([prices.get(order["symbol"], 0.0) for order in orders])
+    buy = np.array([order["side"] == "buy" for order in orders])
+    type = np.array([order["type"] for order in orders])
+    limit_price, stop_price = column("limit_price"), column("stop_price")
+    triggered = column("triggered", dtype=bool)
+
+    quoted = price > 0
+    # Las comparaciones con NaN son falsas, así que los precios que faltan no activan nada
+    reached_stop = np.where(buy, price >= stop_price, price <= stop_price)
+    # El límite se respeta sobre el precio con SPREAD al que se ejecutaría la orden
+    within_limit = np.where(
+        buy, price * (1 + SPREAD) <= limit_price, price * (1 - SPREAD) >= limit_price
+    )
+    triggered_now = quoted & (type != "limit") & ~triggered & reached_stop
+    armed = triggered | triggered_now
+    fill = quoted & np.select(
+        [type == "limit", type == "stop"], [within_limit, armed], armed & within_limit
+    )
+
+    timestamp = clock.timestamp()
+    results = []
+    activated = np.flatnonzero(triggered_now & ~fill)
+    for i in activated:
+        order = orders[i]
+        update_resting_orders(
+            order["name"],
+            [(order["id"], "open", True, f"Activada a ${price[i]:.2f}")],
+            timestamp,
+        )
+        _notify(
+            order["name"],
+            f"Orden stop #{order['id']} de {order['symbol']} activada a ${price[i]:.2f}",
+        )
+        results.append({"id": order["id"], "name": order["name"], "status": "triggered"})
+
+    by_account: dict[str, list[dict]] = defaultdict(list)
+    for i in np.flatnonzero(fill):
+        by_account[orders[i]["name"]].append(orders[i])
+
+    for name, account_orders in by_account.items():
+        claimed = claim_resting_orders(
+            name, [order["id"] for order in account_orders], timestamp
+        )
+        account_orders = [order for order in account_orders if order["id"] in claimed]
+        if account_orders:
+            results.extend(_fill(name, account_orders, prices, timestamp))
+    return results
+
+
+def recover_orders() -> list[dict]:
+    """
+    Al arrancar, resuelve las órdenes que quedaron reservadas por una evaluación interrumpida:
+    vuelven a quedar abiertas salvo que la cuenta ya registre su operación.
+    """
+    timestamp = clock.timestamp()
+    results = []
+    for name in shard_names():
+        for id, status in recover_resting_orders(name, timestamp):
+            write_log(name, "account", f"Orden #{id} recuperada como {status}")
+            results.append({"id": id, "name": name, "status": status})
+    return results
+
+
+def _fill(
+    name: str, orders: list[dict], prices: dict[str, float], timestamp: str
+) -> list[dict]:
+    """
+    Ejecuta las órdenes reservadas de una cuenta a los precios evaluados: en un lote y, si
+    falla, una a una. Las que no llegan a resolverse por un error inesperado vuelven a quedar
+    abiertas para la siguiente pasada.
+    """
+    market_orders = [
+        Order(
+            symbol=order["symbol"],
+            quantity=order["quantity"],
+            side=order["side"],
+            rationale=order["rationale"],
+        )
+        for order in orders
+    ]
+    outcomes: dict[int, tuple[str, str | None]] = {}
+    try:
+        account = Account.get(name)
+        try:
+            account.execute_orders(market_orders, prices)
+            outcomes = {order["id"]: ("filled", None) for order in orders}
+        except ValueError:
+            for order, market_order in zip(orders, market_orders):
+                try:
+                    account.execute_orders([market_order], prices)
+                    outcomes[order["id"]] = ("filled", None)
+                except ValueError as e:
+                    outcomes[order["id"]] = ("rejected", str(e))
+    except Exception as e:
+        print(f"Error filling the orders of {name}: {e}")
+    finally:
+        # Las órdenes sin resultado se liberan en lugar de quedarse reservadas para siempre
+        updates = []
+        for order in orders:
+            status, message = outcomes.get(order["id"], ("open", None))
+            updates.append((order["id"], status, True, message))
+        update_resting_orders(name, updates, timestamp, current="filling")
+
+    results = []
+    for order in orders:
+        if order["id"] not in outcomes:
+            continue
+        status, message = outcomes[order["id"]]
+        verb = "ejecutada" if status == "filled" else f"rechazada: {message}"
+        _notify(
+            name,
+            f"Orden {order['type']} #{order['id']} ({order['side']} {order['quantity']} de {order['symbol']}) {verb}",
+        )
+        results.append({"id": order["id"], "name": name, "status": status, "message": message})
+    return results
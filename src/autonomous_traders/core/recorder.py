@@ -0,0 +1,55 @@
+import os
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from autonomous_traders.core import clock
+from autonomous_traders.data.database import (
+    read_last_portfolio_value,
+    write_portfolio_value,
+)
+
+load_dotenv(override=True)
+
+# Intervalo mínimo entre dos puntos de la serie de valor de la cartera
+SAMPLE_INTERVAL_SECONDS = int(os.getenv("PORTFOLIO_SAMPLE_SECONDS", "60"))
+
+
+def record_portfolio_value(
+    account, portfolio_value: float | None = None, force: bool = False
+) -> bool:
+    """
+    Añade un punto a la serie de valor de la cartera si ha pasado el intervalo mínimo
+    desde el último. Solo se escribe en la base de datos cuando realmente se añade un punto.
+
+    Returns:
+        bool: True si se ha registrado un punto
+    """
+    now = clock.now()
+    last = read_last_portfolio_value(account.name)
+    if last and not force:
+        last_timestamp = datetime.strptime(last[0], clock.TIMESTAMP_FORMAT)
+        if (now - last_timestamp).total_seconds() < SAMPLE_INTERVAL_SECONDS:
+            return False
+
+    if portfolio_value is None:
+        portfolio_value, _ = account.valuation()
+    timestamp = now.strftime(clock.TIMESTAMP_FORMAT)
+    write_portfolio_value(account.name, timestamp, portfolio_value)
+    # La serie solo se actualiza en memoria si ya se había leído
+    if account._portfolio_value_time_series is not None:
+        account._portfolio_value_time_series.append((timestamp, portfolio_value))
+    return True
+
+
+def record_portfolio_values(names: list[str]) -> None:
+    """
+    Registra el valor de la cartera de varias cuentas, respetando el intervalo mínimo, y
+    actualiza su fila del resumen con los precios actuales.
+    """
+    from autonomous_traders.core.accounts import Account
+
+    for name in names:
+        account = Account.get(name)
+        record_portfolio_value(account)
+        account.publish_summary()
@@ -0,0 +1,165 @@
+import argparse
+import asyncio
+from datetime import date, datetime, time
+
+from autonomous_traders.core import clock
+from autonomous_traders.core.accounts import Account
+from autonomous_traders.core.market import get_market_for_replay_date
+from autonomous_traders.core.orderbook import evaluate_orders, recover_orders
+from autonomous_traders.core.recorder import record_portfolio_value
+from autonomous_traders.data.database import read_market_dates, use_data_dir, write_log
+
+# Hora simulada de cada día reproducido: la apertura, operando con el cierre anterior
+MARKET_TIME = time(9, 30)
+
+# Carpeta con las cuentas, registros y reloj de las reproducciones, separada de la de los
+# traders reales para que una reproducción no los toque aunque estén en marcha
+REPLAY_DATA_DIR = "replay"
+
+OFFLINE_UNIVERSE = ["SPY", "QQQ", "AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META"]
+
+
+class OfflineTrader:
+    """
+    Sustituto local de un Trader que no necesita ningún modelo de lenguaje ni red.
+    Aplica una regla de momentum determinista directamente sobre la cuenta, de modo que
+    una reproducción completa se puede ejecutar sin conexión.
+    """
+
+    def __init__(self, name: str, universe: list[str] | None = None, allocation=0.25):
+        self.name = name
+        self.universe = universe or OFFLINE_UNIVERSE
+        self.allocation = allocation
+        self.last_prices: dict[str, float] = {}
+
+    def prices(self) -> dict[str, float]:
+        market = get_market_for_replay_date(clock.now().strftime("%Y-%m-%d"))
+        return {symbol: market[symbol] for symbol in self.universe if market.get(symbol)}
+
+    async def run(self):
+        try:
+            prices = self.prices()
+            changes = {
+                symbol: price / self.last_prices[symbol] - 1
+                for symbol, price in prices.items()
+                if symbol in self.last_prices
+            }
+            self.last_prices = prices
+            if not changes:
+                return
+
+            account = Account.get(self.name)
+            for symbol, quantity in list(account.holdings.items()):
+                if changes.get(symbol, 0) < 0:
+                    account.sell_shares(symbol, quantity, "Momentum negativo")
+
+            best = max(changes, key=changes.get)  # type: ignore
+            if changes[best] > 0:
+                quantity = int(account.balance * self.allocation // prices[best])
+                if quantity > 0:
+                    account.buy_shares(best, quantity, "Mayor momentum del universo")
+        except Exception as e:
+            print(f"Error running offline trader {self.name}: {e}")
+
+
+class ReplayEngine:
+    """
+    Reproduce los días de mercado guardados con un reloj simulado. Cada día fija la hora
+    simulada, ejecuta todos los traders y avanza en cuanto han respondido, sin esperas.
+    """
+
+    def __init__(self, traders, start: str | None = None, end: str | None = None):
+        self.traders = traders
+        self.start = start
+        self.end = end
+
+    async def run(self) -> dict[str, list[tuple[str, float]]]:
+        dates = read_market_dates(self.start, self.end)
+        if not dates:
+            raise ValueError("No hay datos de mercado guardados en el rango indicado.")
+
+        results: dict[str, list[tuple[str, float]]] = {
+            trader.name: [] for trader in self.traders
+        }
+        # Las cuentas se dan de alta antes de escribir en sus registros
+        for trader in self.traders:
+            Account.open(trader.name)
+        recover_orders()
+        try:
+            for day in dates:
+                clock.set_simulated_time(
+                    datetime.combine(date.fromisoformat(day), MARKET_TIME)
+                )
+                for trader in self.traders:
+                    write_log(trader.name, "replay", f"Día simulado {day}")
+                evaluate_orders()
+                await asyncio.gather(*[trader.run() for trader in self.traders])
+                for trader in self.traders:
+                    account = Account.get(trader.name)
+                    value, _ = account.valuation()
+                    record_portfolio_value(account, value)
+                    account.publish_summary()
+                    results[trader.name].append((day, value))
+        finally:
+            clock.set_simulated_time(None)
+        return results
+
+
+def summarize(results: dict[str, list[tuple[str, float]]]) -> str:
+    lines = []
+    for name, series in results.items():
+        first, last = series[0][1], series[-1][1]
+        lines.append(
+            f"{name}: {series[0][0]} ${first:,.2f} -> {series[-1][0]} ${last:,.2f} ({(last / first - 1) * 100:+.2f}%)"
+        )
+    return "\n".join(lines)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Reproducción histórica de los traders")
+    parser.add_argument("--start", help="Primera fecha (AAAA-MM-DD)")
+    parser.add_argument("--end", help="Última fecha (AAAA-MM-DD)")
+    parser.add_argument(
+        "--llm", action="store_true", help="Usar los traders con modelos de lenguaje"
+    )
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="Resetear las cuentas de la reproducción antes de empezar",
+    )
+    parser.add_argument(
+        "--data-dir",
+        default=REPLAY_DATA_DIR,
+        help="Carpeta de las cuentas y el reloj de la reproducción",
+    )
+    parser.add_argument(
+        "--traders",
+        default="Warren,George,Ray,Cathie",
+        help="Nombres de los traders sin conexión, separados por comas",
+    )
+    args = parser.parse_args()
+    # Antes de crear los traders, para que sus servidores MCP usen también esta carpeta
+    use_data_dir(args.data_dir)
+
+    if args.llm:
+        from agents import add_trace_processor
+
+        from autonomous_traders.ui.trading_floor import create_traders
+        from autonomous_traders.utils.tracers import LogTracer
+
+        add_trace_processor(LogTracer())
+        traders = create_traders()
+    else:
+        traders = [OfflineTrader(name) for name in args.traders.split(",")]
+
+    if args.reset:
+        for trader in traders:
+            account = Account.open(trader.name)
+            account.reset(account.strategy)
+
+    results = await ReplayEngine(traders, args.start, args.end).run()
+    print(summarize(results))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
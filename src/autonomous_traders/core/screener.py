@@ -0,0 +1,134 @@
+from functools import lru_cache
+
+import numpy as np
+
+from autonomous_traders.core import clock
+from autonomous_traders.data.database import (
+    market_data_version,
+    read_market_bar_dates,
+    read_market_bars,
+)
+
+OPEN, HIGH, LOW, CLOSE, VOLUME = range(5)
+
+SORT_KEYS = ("change", "momentum", "volume_spike", "price", "volume")
+
+
+# Las cachés llevan en la clave la versión de la base de datos compartida, de modo que volver
+# a escribir o completar las barras de un día se ve en la siguiente consulta
+@lru_cache(maxsize=64)
+def _load_day(date: str, version: tuple) -> tuple[np.ndarray, np.ndarray]:
+    """Convierte la instantánea de un día en (símbolos ordenados, barras de forma (n, 5))."""
+    data = read_market_bars(date) or {}
+    symbols = np.array(sorted(data), dtype=str)
+    bars = np.array([data[symbol] for symbol in symbols], dtype=float).reshape(-1, 5)
+    return symbols, bars
+
+
+@lru_cache(maxsize=4)
+def _load_window(dates: tuple[str, ...], version: tuple) -> tuple[np.ndarray, np.ndarray]:
+    days = [_load_day(date, version) for date in dates]
+    symbols = np.unique(np.concatenate([day_symbols for day_symbols, _ in days]))
+    # Matriz (días, símbolos, OHLCV) con NaN donde un símbolo no cotizó ese día
+    bars = np.full((len(dates), len(symbols), 5), np.nan)
+    for i, (day_symbols, day_bars) in enumerate(days):
+        bars[i, np.searchsorted(symbols, day_symbols)] = day_bars
+    return symbols, bars
+
+
+def load_snapshots(days: int) -> tuple[list[str], np.ndarray, np.ndarray]:
+    """
+    Carga las últimas instantáneas diarias guardadas como arrays de NumPy.
+
+    Returns:
+        tuple: (fechas, símbolos, barras) con barras de forma (días, símbolos, 5)
+    """
+    # Durante una reproducción histórica no se ven los días posteriores a la fecha simulada
+    simulated = clock.simulated_now()
+    end = simulated.date().strftime("%Y-%m-%d") if simulated else None
+    dates = tuple(read_market_bar_dates(days, end))
+    if not dates:
+        return [], np.array([], dtype=str), np.empty((0, 0, 5))
+    symbols, bars = _load_window(dates, market_data_version())
+    return list(dates), symbols, bars
+
+
+def screen(
+    sort_by: str = "change",
+    ascending: bool = False,
+    min_price: float | None = None,
+    max_price: float | None = None,
+    min_volume: float | None = None,
+    min_change: float | None = None,
+    min_momentum: float | None = None,
+    min_volume_spike: float | None = None,
+    momentum_days: int = 5,
+    limit: int = 20,
+) -> dict:
+    """
+    Filtra y ordena todo el mercado en una única pasada vectorizada.
+
+    Los cambios y el momentum se expresan en porcentaje; el pico de volumen es el volumen
+    del último día dividido entre el volumen medio de los días anteriores de la ventana.
+    """
+    if sort_by not in SORT_KEYS:
+        raise ValueError(f"Criterio de orden no reconocido {sort_by}; usa uno de {SORT_KEYS}")
+
+    dates, symbols, bars = load_snapshots(max(momentum_days, 1) + 1)
+    if not dates:
+        return {"date": None, "days": 0, "results": []}
+
+    close = bars[:, :, CLOSE]
+    volume = bars[:, :, VOLUME]
+    last = close[-1]
+    previous_volume = volume[:-1]
+    volume_days = np.sum(np.isfinite(previous_volume), axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = (last / close[-2] - 1) * 100 if len(dates) > 1 else np.full_like(last, np.nan)
+        momentum = (last / close[0] - 1) * 100
+        average_volume = np.nansum(previous_volume, axis=0) / volume_days
+        volume_spike = volume[-1] / average_volume
+
+    metrics = {
+        "change": change,
+        "momentum": momentum,
+        "volume_spike": volume_spike,
+        "price": last,
+        "volume": volume[-1],
+    }
+
+    mask = np.isfinite(last) & np.isfinite(metrics[sort_by])
+    if min_price is not None:
+        mask &= last >= min_price
+    if max_price is not None:
+        mask &= last <= max_price
+    if min_volume is not None:
+        mask &= volume[-1] >= min_volume
+    if min_change is not None:
+        mask &= change >= min_change
+    if min_momentum is not None:
+        mask &= momentum >= min_momentum
+    if min_volume_spike is not None:
+        mask &= volume_spike >= min_volume_spike
+
+    candidates = np.flatnonzero(mask)
+    key = metrics[sort_by][candidates]
+    order = np.argsort(key if ascending else -key, kind="stable")[:limit]
+    selected = candidates[order]
+
+    def value(array, i):
+        return round(float(array[i]), 2) if np.isfinite(array[i]) else None
+
+    results = [
+        {
+            "symbol": str(symbols[i]),
+            "price": value(last, i),
+            "change_pct": value(change, i),
+            "momentum_pct": value(momentum, i),
+            "volume": value(volume[-1], i),
+            "volume_spike": value(volume_spike, i),
+        }
+        for i in selected
+    ]
+    return {"date": dates[-1], "days": len(dates), "results": results}
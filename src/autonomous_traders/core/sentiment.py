@@ -0,0 +1,143 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Iterable
+
+# Léxico por defecto: palabra base -> peso. Los pesos positivos suman y los negativos restan.
+POSITIVE_WORDS = ["up", "gain", "surpass", "beat", "strong", "rise", "bullish", "optimistic", "growth", "expand", "profit", "success", "upgrade"]
+NEGATIVE_WORDS = ["down", "loss", "miss", "weak", "fall", "drop", "bearish", "pessimistic", "decline", "shrink", "slump", "downgrade", "risk"]
+
+DEFAULT_LEXICON: dict[str, float] = {
+    **{word: 1.0 for word in POSITIVE_WORDS},
+    **{word: -1.0 for word in NEGATIVE_WORDS},
+}
+
+# Palabras que invierten el sentido de los términos que las siguen dentro de la ventana
+DEFAULT_NEGATIONS = ["not", "no", "never", "without", "neither", "nor", "hardly", "barely"]
+NEGATION_WINDOW = 3
+
+# Sufijos flexivos admitidos tras una palabra base ("gains", "rises", "beating"...)
+INFLECTIONS = r"(?:s|es|ed|d|ing)?"
+
+# Formas irregulares que los sufijos no cubren: forma -> palabra base
+IRREGULAR_FORMS = {
+    "fell": "fall",
+    "fallen": "fall",
+    "rose": "rise",
+    "risen": "rise",
+    "shrank": "shrink",
+    "shrunk": "shrink",
+    "grew": "growth",
+    "grown": "growth",
+    "beaten": "beat",
+    "lost": "loss",
+}
+
+CACHE_SIZE = 4096
+
+
+class SentimentScorer:
+    """
+    Puntuador de sentimiento compilado. Todo el léxico y las negaciones se buscan en una
+    única pasada con una sola expresión regular con límites de palabra, de modo que
+    "up" ya no coincide con "support" ni "risk" con "asterisk".
+    """
+
+    def __init__(
+        self,
+        lexicon: dict[str, float] | None = None,
+        negations: Iterable[str] | None = None,
+        negation_window: int = NEGATION_WINDOW,
+        cache_size: int = CACHE_SIZE,
+    ):
+        self.lexicon = {
+            word.lower(): weight for word, weight in (lexicon or DEFAULT_LEXICON).items()
+        }
+        self.negations = [word.lower() for word in (negations or DEFAULT_NEGATIONS)]
+        self.negation_window = negation_window
+        self.cache_size = cache_size
+        self._cache: OrderedDict[bytes, float] = OrderedDict()
+        # La caché se comparte entre los hilos lectores de la base de datos
+        self._lock = threading.Lock()
+        self._forms = self._inflected_forms()
+        self._pattern = self._compile()
+
+    def _inflected_forms(self) -> dict[str, str]:
+        """
+        Raíces a las que se pueden añadir los sufijos, con su palabra base: la propia palabra,
+        la consonante final doblada ("dropped", "upped") y sin la "e" final ("rising"),
+        además de las formas irregulares de las palabras del léxico.
+        """
+        forms = {}
+        for word in self.lexicon:
+            forms[word] = word
+            if re.search(r"(?:^|[^aeiou])[aeiou][b-df-hj-np-tv-z]$", word):
+                forms[word + word[-1]] = word
+            if word.endswith("e") and len(word) > 3:
+                forms[word[:-1]] = word
+        for form, word in IRREGULAR_FORMS.items():
+            if word in self.lexicon:
+                forms.setdefault(form, word)
+        return forms
+
+    def _compile(self) -> re.Pattern:
+        # Las alternativas más largas primero para que la alternancia prefiera "upgrade" a "up"
+        def alternation(words):
+            return "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+        negation = rf"\b(?:{alternation(self.negations)})\b|\b\w+n't\b"
+        term = rf"\b(?P<term>{alternation(self._forms)}){INFLECTIONS}\b"
+        return re.compile(rf"(?P<neg>{negation})|{term}")
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def _score_uncached(self, text: str) -> float:
+        score = 0.0
+        negation_end = None
+        for match in self._pattern.finditer(text):
+            if match.group("neg"):
+                negation_end = match.end()
+                continue
+            weight = self.lexicon[self._forms[match.group("term")]]
+            if (
+                negation_end is not None
+                and len(text[negation_end : match.start()].split()) < self.negation_window
+            ):
+                weight = -weight
+            score += weight
+        return score
+
+    def score(self, text: str) -> float:
+        """Devuelve la puntuación ponderada de un texto (positiva, negativa o 0)."""
+        text = text.lower().strip()
+        key = self._key(text)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        score = self._score_uncached(text)
+        with self._lock:
+            self._cache[key] = score
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return score
+
+    def score_many(self, headlines: Iterable[str]) -> list[float]:
+        """
+        Puntúa un lote de titulares. Los titulares repetidos, en el lote o en llamadas
+        anteriores, se resuelven desde la caché por su hash sin volver a analizarse.
+        """
+        return [self.score(headline) for headline in headlines]
+
+    def classify(self, text: str) -> int:
+        """Devuelve +1 para positivo, -1 para negativo, 0 para neutral."""
+        score = self.score(text)
+        return (score > 0) - (score < 0)
+
+
+default_scorer = SentimentScorer()
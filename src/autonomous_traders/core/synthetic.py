@@ -0,0 +1,122 @@
+import hashlib
+from datetime import datetime
+
+import numpy as np
+
+EPOCH = datetime(2020, 1, 1)
+HORIZON_BITS = 15  # 2**15 días desde EPOCH, unos 89 años
+DAYS_PER_YEAR = 365.0
+N_SECTORS = 11
+SECTOR_CORRELATION = 0.6
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_SECTOR_SALT = np.uint64(0x5EC7025EC7025EC7)
+_NORMAL_SALT = np.uint64(0xD1B54A32D192ED03)
+
+
+def _splitmix64(x: np.ndarray) -> np.ndarray:
+    with np.errstate(over="ignore"):
+        x = x + _GOLDEN
+        z = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _uniform(x: np.ndarray) -> np.ndarray:
+    """Uniforme en (0, 1) a partir de claves de 64 bits."""
+    return ((_splitmix64(x) >> np.uint64(11)).astype(np.float64) + 0.5) * 2.0**-53
+
+
+def _normal(x: np.ndarray) -> np.ndarray:
+    """Normal estándar determinista por clave (Box-Muller)."""
+    u1 = _uniform(x)
+    u2 = _uniform(x ^ _NORMAL_SALT)
+    return np.sqrt(-2.0 * np.log(u1)) * np.cos(2.0 * np.pi * u2)
+
+
+def _brownian(keys: np.ndarray, step: int) -> np.ndarray:
+    """
+    Valor de un movimiento browniano en el día `step` para cada clave, construido con
+    un puente browniano diádico (construcción de Lévy). Cada nodo del árbol se deriva
+    del hash de (clave, nodo), así que el camino es el mismo en todos los procesos y
+    evaluarlo cuesta O(HORIZON_BITS) por fecha sin generar el historial completo.
+    """
+    with np.errstate(over="ignore"):
+        lo, hi = 0, 1 << HORIZON_BITS
+        w_lo = np.zeros(len(keys))
+        w_hi = np.sqrt(hi) * _normal(keys ^ (np.uint64(hi) * _GOLDEN))
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            w_mid = (w_lo + w_hi) / 2 + np.sqrt((hi - lo) / 4) * _normal(
+                keys ^ (np.uint64(mid) * _GOLDEN)
+            )
+            if step < mid:
+                hi, w_hi = mid, w_mid
+            else:
+                lo, w_lo = mid, w_mid
+    return w_lo if step == lo else w_hi
+
+
+class SyntheticMarket:
+    """
+    Generador de precios sintéticos reproducible a partir de una semilla.
+
+    Cada símbolo sigue un movimiento browniano geométrico con deriva y volatilidad propias,
+    y comparte un factor común con los demás símbolos de su sector. El precio depende solo de
+    (semilla, símbolo, instante), por lo que es coherente entre llamadas y entre procesos.
+    """
+
+    def __init__(
+        self,
+        seed: int = 42,
+        sectors: int = N_SECTORS,
+        correlation: float = SECTOR_CORRELATION,
+    ):
+        self.seed = seed
+        self.sectors = sectors
+        self.correlation = correlation
+        self._keys: dict[str, int] = {}
+
+    def _key(self, symbol: str) -> int:
+        key = self._keys.get(symbol)
+        if key is None:
+            digest = hashlib.blake2b(
+                f"{self.seed}:{symbol.upper()}".encode(), digest_size=8
+            ).digest()
+            key = self._keys[symbol] = int.from_bytes(digest, "little")
+        return key
+
+    def _paths(self, keys: np.ndarray, days: float) -> np.ndarray:
+        """Browniano de cada clave en un instante fraccionario, interpolando dentro del día."""
+        step = min(max(int(days), 0), (1 << HORIZON_BITS) - 1)
+        fraction = min(max(days - step, 0.0), 1.0)
+        return (1 - fraction) * _brownian(keys, step) + fraction * _brownian(keys, step + 1)
+
+    def prices(self, symbols: list[str], moment: datetime | None = None) -> np.ndarray:
+        """Devuelve los precios de todos los símbolos en el instante dado con una sola pasada vectorizada."""
+        moment = moment or datetime.now()
+        days = (moment - EPOCH).total_seconds() / 86400
+        keys = np.array([self._key(symbol) for symbol in symbols], dtype=np.uint64)
+
+        initial = np.exp(np.log(5.0) + np.log(100.0) * _uniform(keys ^ np.uint64(1)))
+        sigma = 0.15 + 0.45 * _uniform(keys ^ np.uint64(2))
+        mu = -0.05 + 0.20 * _uniform(keys ^ np.uint64(3))
+        sector = keys % np.uint64(self.sectors)
+
+        sector_keys = _splitmix64(
+            np.arange(self.sectors, dtype=np.uint64) ^ _SECTOR_SALT ^ np.uint64(self.seed)
+        )
+        market_factor = self._paths(sector_keys, days)[sector.astype(np.int64)]
+        own_factor = self._paths(keys, days)
+        noise = self.correlation * market_factor + np.sqrt(1 - self.correlation**2) * own_factor
+
+        years = days / DAYS_PER_YEAR
+        log_price = (
+            np.log(initial)
+            + (mu - sigma**2 / 2) * years
+            + sigma * noise / np.sqrt(DAYS_PER_YEAR)
+        )
+        return np.round(np.exp(log_price), 2)
+
+    def price(self, symbol: str, moment: datetime | None = None) -> float:
+        return float(self.prices([symbol], moment)[0])
@@ -0,0 +1,146 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from autonomous_traders.data.database import (
+    ROLLUP_PREFIX,
+    read_portfolio_coverage,
+    read_portfolio_range,
+    read_portfolio_rollups,
+)
+
+# Del nivel más detallado al más agregado
+RESOLUTIONS = ("raw", "minute", "hour", "day")
+
+# Duración de los agregados de cada nivel
+BUCKET_LENGTH = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+# Puntos por defecto de una serie pensada para un gráfico
+MAX_POINTS = 500
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: elige `threshold` índices de la serie conservando su forma
+    visual. Se mantienen el primer y el último punto y, de cada intervalo intermedio, el punto
+    que forma el triángulo de mayor área con el punto elegido antes y la media del siguiente.
+
+    Returns:
+        np.ndarray: Los índices elegidos, en orden
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = x[hi : edges[i + 2]].mean(), y[hi : edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs(
+            (x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def choose_resolution(name: str, start: str | None = None) -> str | None:
+    """
+    El nivel más detallado que tiene puntos y que todavía los conserva desde `start`. Sin
+    `start`, el más detallado que llega hasta el primer punto de la cuenta; si ninguno llega
+    tan atrás, el más agregado.
+    """
+    coverage = read_portfolio_coverage(name)
+    available = [resolution for resolution in RESOLUTIONS if resolution in coverage]
+    if not available:
+        return None
+    if start is None:
+        return _covering_first_point(coverage, available)
+    for resolution in available:
+        if coverage[resolution] <= start:
+            return resolution
+    return available[-1]
+
+
+def _covering_first_point(coverage: dict[str, str], available: list[str]) -> str:
+    """
+    Los días se conservan siempre, así que el primer agregado diario contiene el primer punto.
+    Cada nivel más detallado llega hasta él mientras empiece en el mismo agregado que el nivel
+    inmediatamente más agregado, es decir, mientras la retención no lo haya recortado.
+    """
+    chosen = available[-1]
+    for resolution in reversed(available[:-1]):
+        coarser = RESOLUTIONS[RESOLUTIONS.index(resolution) + 1]
+        prefix = ROLLUP_PREFIX[coarser]
+        if coverage[resolution][:prefix] != coverage[chosen][:prefix]:
+            break
+        chosen = resolution
+    return chosen
+
+
+def portfolio_series(
+    name: str,
+    start: str | None = None,
+    end: str | None = None,
+    max_points: int = MAX_POINTS,
+) -> list[tuple[str, float]]:
+    """
+    Devuelve la serie de valor de la cartera entre `start` y `end` (sin `start`, desde el
+    primer punto de la cuenta) con a lo sumo `max_points` puntos.
+
+    Cada nivel conserva un periodo distinto, así que la serie se compone de todos: los puntos
+    sin agregar donde los hay y, antes de ellos, el cierre de los agregados por minuto, hora y
+    día que terminan antes de lo ya leído. Si sigue habiendo demasiados puntos, se reduce con LTTB.
+    """
+    coverage = read_portfolio_coverage(name)
+    series: list[tuple[str, float]] = []
+    for resolution in RESOLUTIONS:
+        if resolution not in coverage:
+            continue
+        # Los niveles más detallados ya leídos cubren desde su primer punto
+        until = series[0][0] if series else end
+        if resolution == "raw":
+            part = read_portfolio_range(name, start, until)
+        else:
+            part = [
+                (bucket, close)
+                for bucket, _, _, _, close in read_portfolio_rollups(name, resolution, start, until)
+                if not series or _bucket_end(bucket, resolution) <= until
+            ]
+        series = part + series
+        if start is not None and coverage[resolution] <= start:
+            # Este nivel cubre todo el intervalo pedido
+            break
+    if len(series) <= max_points:
+        return series
+
+    timestamps = np.array([timestamp for timestamp, _ in series], dtype="datetime64[s]")
+    x = timestamps.astype(np.int64).astype(float)
+    y = np.array([value for _, value in series])
+    return [series[i] for i in lttb(x, y, max_points)]
+
+
+def _bucket_end(bucket: str, resolution: str) -> str:
+    end = datetime.strptime(bucket, TIMESTAMP_FORMAT) + BUCKET_LENGTH[resolution]
+    return end.strftime(TIMESTAMP_FORMAT)
+
+
+def portfolio_ohlc(
+    name: str, resolution: str, start: str | None = None, end: str | None = None
+) -> list[tuple[str, float, float, float, float]]:
+    """Los agregados OHLC de la serie de valor en la resolución indicada."""
+    if resolution not in RESOLUTIONS[1:]:
+        raise ValueError(f"Resolución no reconocida {resolution}; usa una de {RESOLUTIONS[1:]}")
+    return read_portfolio_rollups(name, resolution, start, end)
@@ -0,0 +1,81 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from autonomous_traders.data import database
+
+load_dotenv(override=True)
+
+# Acceso a SQLite desde código asíncrono sin detener el bucle de eventos. Las funciones de
+# data/database.py siguen siendo la implementación; aquí solo se deciden el hilo y el orden
+# en que se ejecutan:
+# - un único hilo escritor con su cola, de modo que las escrituras del proceso se aplican de
+#   una en una y en orden de llegada, sin competir entre sí por el bloqueo de SQLite
+# - un grupo pequeño de hilos lectores, que en modo WAL leen a la vez que se escribe
+DB_READERS = int(os.getenv("DB_READERS", "4"))
+
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+_readers = ThreadPoolExecutor(max_workers=DB_READERS, thread_name_prefix="db-reader")
+
+
+def _report_error(future: Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        print(f"Error in background database write: {future.exception()}")
+
+
+def submit_write(fn, *args, **kwargs) -> Future:
+    """
+    Encola una escritura en el hilo escritor y vuelve sin esperarla, para llamadas síncronas
+    dentro del bucle de eventos (p. ej., el tracer). Las escrituras pendientes se completan
+    antes de que termine el proceso.
+    """
+    future = _writer.submit(fn, *args, **kwargs)
+    future.add_done_callback(_report_error)
+    return future
+
+
+async def run_write(fn, *args, **kwargs):
+    """Ejecuta `fn` en el hilo escritor y espera su resultado sin bloquear el bucle de eventos."""
+    return await asyncio.wrap_future(_writer.submit(fn, *args, **kwargs))
+
+
+async def run_read(fn, *args, **kwargs):
+    """Ejecuta `fn` en uno de los hilos lectores y espera su resultado."""
+    return await asyncio.wrap_future(_readers.submit(fn, *args, **kwargs))
+
+
+def _reader(fn):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await run_read(fn, *args, **kwargs)
+
+    return wrapper
+
+
+def _writer_of(fn):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await run_write(fn, *args, **kwargs)
+
+    return wrapper
+
+
+# Versiones asíncronas de las funciones que se usan desde el bucle de eventos
+read_account = _reader(database.read_account)
+read_account_version = _reader(database.read_account_version)
+read_transactions = _reader(database.read_transactions)
+read_portfolio_values = _reader(database.read_portfolio_values)
+read_resting_orders = _reader(database.read_resting_orders)
+read_log = _reader(database.read_log)
+read_logs = _reader(database.read_logs)
+read_account_summary = _reader(database.read_account_summary)
+read_account_summaries = _reader(database.read_account_summaries)
+read_market = _reader(database.read_market)
+
+write_log = _writer_of(database.write_log)
+write_portfolio_value = _writer_of(database.write_portfolio_value)
+write_account_summary = _writer_of(database.write_account_summary)
+write_market = _writer_of(database.write_market)
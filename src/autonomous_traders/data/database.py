@@ -1,28 +1,385 @@
+import functools
+import gzip
 import json
+import os
+import re
 import sqlite3
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
 
 from dotenv import load_dotenv
 
 load_dotenv(override=True)
 
+# Base de datos compartida y de lectura mayoritaria: datos de mercado y reloj simulado.
+# Las versiones anteriores guardaban aquí también las cuentas y los registros; cada trader
+# los traslada a su propia base de datos la primera vez que se abre.
 DB = "accounts.db"
 
+# Carpeta con el estado de los traders: sus bases de datos, el resumen de las cuentas y el
+# reloj simulado. Las reproducciones históricas usan una propia para no tocar las cuentas
+# reales ni el reloj de un trading floor que esté en marcha; los datos de mercado se leen
+# siempre de la base de datos compartida.
+DATA_DIR = os.getenv("TRADERS_DATA_DIR", "")
 
-def get_db_connection():
-    """Crea una conexión a la base de datos con el modo WAL activado."""
+# Una base de datos por trader con su cuenta, su historial y sus registros, de modo que
+# las escrituras de un trader no bloquean las de los demás
+SHARD_DIR = os.path.join(DATA_DIR, "accounts")
+
+# Base de datos con el resumen de las cuentas y el reloj; fuera de una carpeta propia es la
+# compartida
+STATE_DB = os.path.join(DATA_DIR, DB) if DATA_DIR else DB
+
+SHARD_TABLES = (
+    "accounts",
+    "holdings",
+    "transactions",
+    "account_events",
+    "account_snapshots",
+    "portfolio_values",
+    "portfolio_rollups",
+    "resting_orders",
+    "logs",
+)
+
+# Cada cuántos eventos de una cuenta se guarda una instantánea de su estado
+SNAPSHOT_EVERY = 100
+
+# Niveles de la serie de valor de la cartera: puntos sin agregar y agregados OHLC por
+# minuto, hora y día, con el tiempo que se conserva cada uno (None: indefinidamente)
+PORTFOLIO_RETENTION = {
+    "raw": timedelta(days=1),
+    "minute": timedelta(days=7),
+    "hour": timedelta(days=365),
+    "day": None,
+}
+# Longitud del prefijo de la marca de tiempo que identifica cada intervalo agregado
+ROLLUP_PREFIX = {"minute": 16, "hour": 13, "day": 10}
+
+# Retención de los registros de cada trader: se conservan como mucho LOG_MAX_ROWS filas y
+# ninguna más antigua que LOG_RETENTION; lo que sobra se archiva comprimido por días en
+# LOG_ARCHIVE_DIR y se borra por lotes de LOG_DELETE_BATCH filas
+LOG_RETENTION = timedelta(days=float(os.getenv("LOG_RETENTION_DAYS", "7")))
+LOG_MAX_ROWS = int(os.getenv("LOG_MAX_ROWS", "20000"))
+LOG_DELETE_BATCH = 2000
+LOG_ARCHIVE_DIR = "logs_archive"
+# Páginas libres que devuelve al sistema cada vacuum incremental
+VACUUM_PAGES = 2000
+
+
+def use_data_dir(path: str) -> None:
+    """
+    Cambia la carpeta del estado de los traders para este proceso y para los servidores MCP
+    que lance (se transmite con la variable de entorno TRADERS_DATA_DIR).
+    """
+    global DATA_DIR, SHARD_DIR, STATE_DB
+    DATA_DIR = path
+    SHARD_DIR = os.path.join(path, "accounts")
+    STATE_DB = os.path.join(path, DB) if path else DB
+    os.makedirs(path or ".", exist_ok=True)
+    os.environ["TRADERS_DATA_DIR"] = path
+
+
+def data_dir() -> str:
+    """La carpeta del estado de los traders de este proceso ("" para la carpeta de trabajo)."""
+    return DATA_DIR
+
+
+def shard_path(name: str) -> str:
+    """La ruta de la base de datos del trader `name`."""
+    return os.path.join(SHARD_DIR, re.sub(r"[^a-z0-9_-]", "_", name.lower()) + ".db")
+
+
+def shard_exists(name: str) -> bool:
+    """Si el trader `name` ya tiene base de datos propia."""
+    return os.path.exists(shard_path(name))
+
+
+def shard_names() -> list[str]:
+    """Los traders que tienen base de datos propia."""
+    if not os.path.isdir(SHARD_DIR):
+        return []
+    return sorted(
+        file[:-3] for file in os.listdir(SHARD_DIR) if file.endswith(".db")
+    )
+
+
+# Versión del esquema guardada en PRAGMA user_version de cada base de datos. Las bases de datos
+# que ya la tienen no repiten la creación de tablas ni las migraciones al abrirse desde un
+# proceso nuevo; hay que aumentarla al cambiar el esquema o añadir una migración.
+SCHEMA_VERSION = 2
+
+# Bases de datos ya comprobadas en este proceso; varios hilos pueden abrirlas a la vez
+_initialized: set[str] = set()
+_initialized_lock = threading.RLock()
+
+# Conexiones reutilizadas por cada hilo, por ruta de la base de datos
+_local = threading.local()
+
+
+class UnknownAccountError(ValueError):
+    """La cuenta no tiene base de datos; solo se crea al dar de alta la cuenta."""
+
+
+def get_db_connection(name: str | None = None, state: bool = False, create: bool = False):
+    """
+    Crea una conexión con el modo WAL activado a la base de datos del trader `name` o, si no se
+    indica ningún nombre, a la base de datos compartida (con `state`, a la del resumen de las
+    cuentas y el reloj de la carpeta de datos actual).
+
+    La base de datos de un trader solo se crea con `create`; si no existe todavía se lanza
+    UnknownAccountError, para que ni las lecturas ni los nombres erróneos dejen ficheros vacíos.
+    """
     # Se ha aumentado el tiempo de espera y se ha activado el modo WAL para evitar los errores "database is locked" (la base de datos está bloqueada)
     # durante las lecturas simultáneas de la aplicación Gradio y las escrituras de los traders.
-    conn = sqlite3.connect(DB, timeout=10)
-    conn.execute("PRAGMA journal_mode=WAL")
+    if name is None:
+        path = STATE_DB if state else DB
+    else:
+        path = shard_path(name)
+        if not create and not os.path.exists(path):
+            raise UnknownAccountError(f"No existe la cuenta {name}")
+        os.makedirs(SHARD_DIR, exist_ok=True)
+    new = not os.path.exists(path)
+    conn = sqlite3.connect(path, timeout=10)
+    if new:
+        # Solo surte efecto antes de escribir la cabecera del fichero, incluso antes del modo
+        # WAL; las bases de datos anteriores se convierten aparte con enable_incremental_vacuum
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    _enable_wal(conn)
+    with _initialized_lock:
+        if path not in _initialized:
+            # El esquema se crea al abrir cada base de datos por primera vez, no al importar el módulo
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                if name is None:
+                    _initialize_shared(conn)
+                else:
+                    _initialize_shard(conn, name.lower())
+            _initialized.add(path)
     return conn
 
 
-# Creación de la tabla inicial
-with get_db_connection() as conn:
+def _enable_wal(conn, attempts: int = 10):
+    """
+    Activa el modo WAL. Cuando varias conexiones convierten a la vez un fichero recién creado,
+    SQLite devuelve "database is locked" sin esperar al tiempo de espera, así que se reintenta.
+    """
+    for attempt in range(attempts):
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            return
+        except sqlite3.OperationalError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(0.01 * (attempt + 1))
+
+
+def _reads_account(empty: Callable[[], Any]):
+    """
+    Las lecturas de una cuenta que todavía no tiene base de datos devuelven `empty()` sin
+    abrirla, en lugar de crear un fichero vacío para ese nombre.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(name: str, *args, **kwargs):
+            if not shard_exists(name):
+                return empty()
+            return fn(name, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _initialize_shared(conn):
+    """Crea las tablas de la base de datos compartida, de una en una entre procesos."""
     cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        # Otro proceso puede haberla preparado mientras se esperaba el bloqueo
+        if cursor.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            _create_shared_schema(cursor)
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def _create_shared_schema(cursor):
+    """Crea las tablas de la base de datos compartida."""
     cursor.execute(
-        "CREATE TABLE IF NOT EXISTS accounts (name TEXT PRIMARY KEY, account TEXT)"
+        "CREATE TABLE IF NOT EXISTS market (date TEXT PRIMARY KEY, data TEXT)"
+    )
+    cursor.execute(
+        "CREATE TABLE IF NOT EXISTS market_bars (date TEXT PRIMARY KEY, data TEXT)"
+    )
+    # Resumen de cada cuenta mantenido por quien escribe, para leer la clasificación completa
+    # con una sola consulta sin abrir la base de datos de cada trader
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS account_summary (
+            name TEXT PRIMARY KEY,
+            cash REAL,
+            market_value REAL,
+            portfolio_value REAL,
+            pnl REAL,
+            positions INTEGER,
+            last_trade TEXT,
+            updated TEXT
+        )
+    """
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_account_summary_pnl ON account_summary (pnl)"
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS clock (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            simulated TEXT,
+            anchored_at TEXT
+        )
+    """
+    )
+
+
+def _create_account_schema(cursor):
+    """Crea las tablas de la base de datos de un trader."""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS accounts (
+            name TEXT PRIMARY KEY,
+            account TEXT,
+            balance REAL,
+            strategy TEXT,
+            net_invested REAL,
+            realized_pnl REAL,
+            version INTEGER
+        )
+    """
+    )
+    # Columnas del estado de la cuenta; las bases de datos anteriores solo tenían el blob json
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(accounts)")}
+    for column, definition in [
+        ("balance", "REAL"),
+        ("strategy", "TEXT"),
+        ("net_invested", "REAL"),
+        ("realized_pnl", "REAL"),
+        ("version", "INTEGER"),
+    ]:
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE accounts ADD COLUMN {column} {definition}")
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS holdings (
+            name TEXT,
+            symbol TEXT,
+            quantity INTEGER,
+            average_cost REAL,
+            PRIMARY KEY (name, symbol)
+        )
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            symbol TEXT,
+            quantity INTEGER,
+            price REAL,
+            timestamp TEXT,
+            rationale TEXT
+        )
+    """
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_transactions_name ON transactions (name, id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_transactions_symbol ON transactions (name, symbol, id)"
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS account_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            type TEXT,
+            payload TEXT,
+            version INTEGER,
+            timestamp TEXT
+        )
+    """
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_account_events_name ON account_events (name, id)"
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS account_snapshots (
+            name TEXT,
+            event_id INTEGER,
+            state TEXT,
+            PRIMARY KEY (name, event_id)
+        )
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS portfolio_values (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            timestamp TEXT,
+            value REAL
+        )
+    """
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_portfolio_values_name ON portfolio_values (name, id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_portfolio_values_time ON portfolio_values (name, timestamp)"
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS portfolio_rollups (
+            name TEXT,
+            resolution TEXT,
+            bucket TEXT,
+            open REAL,
+            high REAL,
+            low REAL,
+            close REAL,
+            count INTEGER,
+            PRIMARY KEY (name, resolution, bucket)
+        )
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS resting_orders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            symbol TEXT,
+            side TEXT,
+            type TEXT,
+            quantity INTEGER,
+            limit_price REAL,
+            stop_price REAL,
+            triggered INTEGER DEFAULT 0,
+            status TEXT DEFAULT 'open',
+            rationale TEXT,
+            message TEXT,
+            created TEXT,
+            updated TEXT
+        )
+    """
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_resting_orders_status ON resting_orders (status, name, id)"
     )
     cursor.execute(
         """
@@ -36,32 +393,930 @@ with get_db_connection() as conn:
     """
     )
     cursor.execute(
-        "CREATE TABLE IF NOT EXISTS market (date TEXT PRIMARY KEY, data TEXT)"
+        "CREATE INDEX IF NOT EXISTS idx_logs_name ON logs (name, datetime)"
     )
-    conn.commit()
 
 
-def write_account(name, account_dict):
-    json_data = json.dumps(account_dict)
-    with get_db_connection() as conn:
+def _read_account_state(cursor, name: str) -> dict | None:
+    cursor.execute(
+        "SELECT balance, strategy, net_invested, realized_pnl, version FROM accounts WHERE name = ?",
+        (name,),
+    )
+    row = cursor.fetchone()
+    if not row:
+        return None
+    balance, strategy, net_invested, realized_pnl, version = row
+    cursor.execute(
+        "SELECT symbol, quantity, average_cost FROM holdings WHERE name = ? ORDER BY symbol",
+        (name,),
+    )
+    holdings = cursor.fetchall()
+    return {
+        "name": name,
+        "balance": balance,
+        "strategy": strategy,
+        "holdings": {symbol: quantity for symbol, quantity, _ in holdings},
+        "aggregates": None
+        if net_invested is None
+        else {
+            "net_invested": net_invested,
+            "realized_pnl": realized_pnl,
+            "average_cost": {symbol: cost for symbol, _, cost in holdings},
+        },
+        "version": version,
+    }
+
+
+def _append_event(cursor, name: str, type: str, payload: dict, timestamp: str) -> None:
+    """
+    Añade un evento al libro mayor de la cuenta, dentro de la transacción de la escritura
+    que lo produce y después de actualizar el estado. Cada SNAPSHOT_EVERY eventos de la
+    cuenta se guarda además una instantánea del estado resultante.
+    """
+    version = cursor.execute(
+        "SELECT version FROM accounts WHERE name = ?", (name,)
+    ).fetchone()[0]
+    cursor.execute(
+        "INSERT INTO account_events (name, type, payload, version, timestamp) VALUES (?, ?, ?, ?, ?)",
+        (name, type, json.dumps(payload), version, timestamp),
+    )
+    event_id = cursor.lastrowid
+    last_snapshot = cursor.execute(
+        "SELECT COALESCE(MAX(event_id), 0) FROM account_snapshots WHERE name = ?",
+        (name,),
+    ).fetchone()[0]
+    pending = cursor.execute(
+        "SELECT COUNT(*) FROM account_events WHERE name = ? AND id > ?",
+        (name, last_snapshot),
+    ).fetchone()[0]
+    if pending >= SNAPSHOT_EVERY:
+        state = _read_account_state(cursor, name)
+        cursor.execute(
+            "INSERT INTO account_snapshots (name, event_id, state) VALUES (?, ?, ?)",
+            (name, event_id, json.dumps(state)),
+        )
+
+
+def _migrate_legacy_accounts(conn):
+    """Reparte las cuentas guardadas como un único blob json en las tablas normalizadas."""
+    cursor = conn.cursor()
+    legacy = cursor.execute(
+        "SELECT name, account FROM accounts WHERE version IS NULL AND account IS NOT NULL"
+    ).fetchall()
+    for name, account_json in legacy:
+        account = json.loads(account_json)
+        aggregates = account.get("aggregates")
+        average_cost = (aggregates or {}).get("average_cost", {})
+        cursor.executemany(
+            "INSERT OR REPLACE INTO holdings (name, symbol, quantity, average_cost) VALUES (?, ?, ?, ?)",
+            [
+                (name, symbol, quantity, average_cost.get(symbol, 0.0))
+                for symbol, quantity in account["holdings"].items()
+            ],
+        )
+        cursor.executemany(
+            "INSERT INTO transactions (name, symbol, quantity, price, timestamp, rationale) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (name, t["symbol"], t["quantity"], t["price"], t["timestamp"], t["rationale"])
+                for t in account["transactions"]
+            ],
+        )
+        cursor.executemany(
+            "INSERT INTO portfolio_values (name, timestamp, value) VALUES (?, ?, ?)",
+            [(name, timestamp, value) for timestamp, value in account["portfolio_value_time_series"]],
+        )
+        # Sin agregados guardados se dejan a NULL para que la cuenta los reconstruya al cargarse
+        cursor.execute(
+            """
+            UPDATE accounts
+            SET account = NULL, balance = ?, strategy = ?, net_invested = ?, realized_pnl = ?, version = 1
+            WHERE name = ?
+        """,
+            (
+                account["balance"],
+                account["strategy"],
+                aggregates["net_invested"] if aggregates else None,
+                aggregates["realized_pnl"] if aggregates else None,
+                name,
+            ),
+        )
+
+
+def _migrate_accounts_without_events(conn):
+    """Las cuentas anteriores al libro mayor empiezan con un evento con su estado actual."""
+    cursor = conn.cursor()
+    names = cursor.execute(
+        """
+        SELECT name FROM accounts
+        WHERE NOT EXISTS (SELECT 1 FROM account_events e WHERE e.name = accounts.name)
+    """
+    ).fetchall()
+    for (name,) in names:
+        state = _read_account_state(cursor, name)
+        _append_event(
+            cursor,
+            name,
+            "state",
+            {key: state[key] for key in ("balance", "strategy", "holdings", "aggregates")},  # type: ignore
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        )
+
+
+def _write_rollups(cursor, name: str, timestamp: str, value: float) -> None:
+    """Incorpora un punto a los agregados OHLC de cada resolución sin releer la serie."""
+    cursor.executemany(
+        """
+        INSERT INTO portfolio_rollups (name, resolution, bucket, open, high, low, close, count)
+        VALUES (?, ?, ?, ?, ?, ?, ?, 1)
+        ON CONFLICT (name, resolution, bucket) DO UPDATE SET
+            high = max(high, excluded.high),
+            low = min(low, excluded.low),
+            close = excluded.close,
+            count = count + 1
+    """,
+        [
+            (
+                name,
+                resolution,
+                # Inicio del intervalo con el mismo formato que el resto de marcas de tiempo
+                timestamp[:prefix] + "0000-01-01 00:00:00"[prefix:],
+                value,
+                value,
+                value,
+                value,
+            )
+            for resolution, prefix in ROLLUP_PREFIX.items()
+        ],
+    )
+
+
+def _migrate_portfolio_rollups(conn):
+    """Calcula los agregados de las series guardadas antes de que existieran."""
+    cursor = conn.cursor()
+    names = cursor.execute(
+        """
+        SELECT DISTINCT name FROM portfolio_values
+        WHERE NOT EXISTS (SELECT 1 FROM portfolio_rollups r WHERE r.name = portfolio_values.name)
+    """
+    ).fetchall()
+    for (name,) in names:
+        for timestamp, value in cursor.execute(
+            "SELECT timestamp, value FROM portfolio_values WHERE name = ? ORDER BY id",
+            (name,),
+        ).fetchall():
+            _write_rollups(cursor, name, timestamp, value)
+
+
+def _move_from_shared(cursor, name: str):
+    """Traslada las filas del trader desde la base de datos compartida de versiones anteriores."""
+    for table in SHARD_TABLES:
+        shared_columns = [
+            row[1] for row in cursor.execute(f"PRAGMA shared.table_info({table})")
+        ]
+        if not shared_columns:
+            continue
+        own_columns = {row[1] for row in cursor.execute(f"PRAGMA main.table_info({table})")}
+        columns = ", ".join(column for column in shared_columns if column in own_columns)
+        cursor.execute(
+            f"INSERT OR IGNORE INTO main.{table} ({columns}) SELECT {columns} FROM shared.{table} WHERE name = ?",
+            (name,),
+        )
+        cursor.execute(f"DELETE FROM shared.{table} WHERE name = ?", (name,))
+
+
+def _initialize_shard(conn, name: str):
+    """
+    Crea las tablas de la base de datos del trader y aplica las migraciones pendientes en una
+    sola transacción, de modo que dos procesos que la abren a la vez no las repiten.
+    """
+    cursor = conn.cursor()
+    # Las filas anteriores al reparto están junto al resumen y el reloj de la misma carpeta;
+    # se prepara antes para que ATTACH no la cree sin su configuración, y ATTACH no puede
+    # ejecutarse dentro de una transacción
+    get_db_connection(state=True).close()
+    cursor.execute("ATTACH DATABASE ? AS shared", (STATE_DB,))
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            # Otro proceso puede haberla preparado mientras se esperaba el bloqueo
+            if cursor.execute("PRAGMA main.user_version").fetchone()[0] < SCHEMA_VERSION:
+                _create_account_schema(cursor)
+                _move_from_shared(cursor, name)
+                _migrate_legacy_accounts(conn)
+                _migrate_accounts_without_events(conn)
+                _migrate_portfolio_rollups(conn)
+                cursor.execute(f"PRAGMA main.user_version = {SCHEMA_VERSION}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    finally:
+        cursor.execute("DETACH DATABASE shared")
+
+
+def create_account(name: str, balance: float, timestamp: str) -> None:
+    """Crea la cuenta con el saldo inicial si todavía no existe."""
+    name = name.lower()
+    with get_db_connection(name, create=True) as conn:
         cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
         cursor.execute(
             """
-            INSERT INTO accounts (name, account)
-            VALUES (?, ?)
-            ON CONFLICT(name) DO UPDATE SET account=excluded.account
+            INSERT OR IGNORE INTO accounts (name, balance, strategy, net_invested, realized_pnl, version)
+            VALUES (?, ?, '', 0, 0, 1)
         """,
-            (name.lower(), json_data),
+            (name, balance),
         )
+        if cursor.rowcount:
+            _append_event(cursor, name, "create", {"balance": balance}, timestamp)
         conn.commit()
 
 
+@_reads_account(lambda: None)
 def read_account(name):
-    with get_db_connection() as conn:
+    """
+    Lee el estado actual de la cuenta (saldo, estrategia, tenencias, agregados y versión)
+    sin tocar el historial de transacciones ni la serie de valor de la cartera.
+    """
+    with get_db_connection(name) as conn:
+        return _read_account_state(conn.cursor(), name.lower())
+
+
+@_reads_account(lambda: (None, []))
+def read_account_ledger(
+    name: str, until: str | None = None
+) -> tuple[dict | None, list[tuple[str, dict, int]]]:
+    """
+    Lee la última instantánea de la cuenta y los eventos posteriores a ella.
+
+    Args:
+        name (str): El nombre de la cuenta
+        until (str): Si se indica, solo se tienen en cuenta los eventos hasta esa hora
+
+    Returns:
+        tuple: (estado de la instantánea o None, lista de (type, payload, version))
+    """
+    name = name.lower()
+    until = until or "9999-12-31"
+    with get_db_connection(name) as conn:
+        cursor = conn.cursor()
+        snapshot = cursor.execute(
+            """
+            SELECT s.event_id, s.state FROM account_snapshots s
+            JOIN account_events e ON e.id = s.event_id
+            WHERE s.name = ? AND e.timestamp <= ?
+            ORDER BY s.event_id DESC LIMIT 1
+        """,
+            (name, until),
+        ).fetchone()
+        event_id, state = snapshot if snapshot else (0, None)
+        events = cursor.execute(
+            """
+            SELECT type, payload, version FROM account_events
+            WHERE name = ? AND id > ? AND timestamp <= ?
+            ORDER BY id
+        """,
+            (name, event_id, until),
+        ).fetchall()
+    return (
+        json.loads(state) if state else None,
+        [(type, json.loads(payload), version) for type, payload, version in events],
+    )
+
+
+def _thread_connection(name: str):
+    """
+    Una conexión a la base de datos de `name` propia del hilo que la pide, que se reutiliza
+    entre llamadas para las lecturas cortas y frecuentes.
+    """
+    connections = _local.__dict__.setdefault("connections", {})
+    path = os.path.abspath(shard_path(name))
+    conn = connections.get(path)
+    if conn is None:
+        conn = connections[path] = get_db_connection(name)
+    return conn
+
+
+@_reads_account(lambda: None)
+def read_account_version(name: str) -> int | None:
+    """Lee solo el contador de versión de la cuenta, que cambia con cada escritura."""
+    row = _thread_connection(name).execute(
+        "SELECT version FROM accounts WHERE name = ?", (name.lower(),)
+    ).fetchone()
+    return row[0] if row else None
+
+
+@_reads_account(list)
+def read_transactions(
+    name: str,
+    offset: int = 0,
+    limit: int | None = None,
+    symbol: str | None = None,
+    newest_first: bool = False,
+) -> list[tuple[str, int, float, str, str]]:
+    """
+    Lee una página de transacciones usando los índices por (name, id) y (name, symbol, id).
+
+    Args:
+        name (str): El nombre de la cuenta
+        offset (int): El número de transacciones que se saltan
+        limit (int): El número máximo de transacciones, o None para todas
+        symbol (str): Filtrar por símbolo, o None para todos
+        newest_first (bool): Empezar por las más recientes
+
+    Returns:
+        list: Tuplas (symbol, quantity, price, timestamp, rationale)
+    """
+    query = "SELECT symbol, quantity, price, timestamp, rationale FROM transactions WHERE name = ?"
+    params: list = [name.lower()]
+    if symbol is not None:
+        query += " AND symbol = ?"
+        params.append(symbol)
+    query += " ORDER BY id DESC" if newest_first else " ORDER BY id"
+    query += " LIMIT ? OFFSET ?"
+    params += [-1 if limit is None else limit, offset]
+    with get_db_connection(name) as conn:
+        return conn.execute(query, params).fetchall()
+
+
+@_reads_account(lambda: (0, []))
+def read_transactions_since(
+    name: str, after_id: int, limit: int
+) -> tuple[int, list[tuple[int, str, int, float, str, str]]]:
+    """
+    Lee las transacciones posteriores a `after_id`, de la más reciente a la más antigua, junto
+    con el número total de transacciones de la cuenta para detectar si se ha reseteado.
+
+    Returns:
+        tuple: (total, lista de tuplas (id, symbol, quantity, price, timestamp, rationale))
+    """
+    with get_db_connection(name) as conn:
+        total = conn.execute(
+            "SELECT COUNT(*) FROM transactions WHERE name = ?", (name.lower(),)
+        ).fetchone()[0]
+        rows = conn.execute(
+            """
+            SELECT id, symbol, quantity, price, timestamp, rationale FROM transactions
+            WHERE name = ? AND id > ?
+            ORDER BY id DESC LIMIT ?
+        """,
+            (name.lower(), after_id, limit),
+        ).fetchall()
+    return total, rows
+
+
+@_reads_account(list)
+def read_portfolio_values(name: str) -> list[tuple[str, float]]:
+    with get_db_connection(name) as conn:
+        return conn.execute(
+            "SELECT timestamp, value FROM portfolio_values WHERE name = ? ORDER BY id",
+            (name.lower(),),
+        ).fetchall()
+
+
+@_reads_account(lambda: None)
+def read_last_portfolio_value(name: str) -> tuple[str, float] | None:
+    with get_db_connection(name) as conn:
+        return conn.execute(
+            "SELECT timestamp, value FROM portfolio_values WHERE name = ? ORDER BY id DESC LIMIT 1",
+            (name.lower(),),
+        ).fetchone()
+
+
+def write_account(
+    name, account_dict, expected_version: int, timestamp: str
+) -> int | None:
+    """
+    Guarda el estado completo de la cuenta con compare-and-swap sobre la versión.
+
+    Args:
+        name (str): El nombre de la cuenta
+        account_dict (dict): El estado con balance, strategy, holdings y aggregates
+        expected_version (int): La versión leída; si otra escritura la ha cambiado no se guarda nada
+        timestamp (str): La hora del evento en el libro mayor
+
+    Returns:
+        int: La nueva versión, o None si la versión ya no coincide
+    """
+    name = name.lower()
+    aggregates = account_dict["aggregates"]
+    with get_db_connection(name) as conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute(
+            """
+            UPDATE accounts
+            SET balance = ?, strategy = ?, net_invested = ?, realized_pnl = ?, version = version + 1
+            WHERE name = ? AND version = ?
+        """,
+            (
+                account_dict["balance"],
+                account_dict["strategy"],
+                aggregates["net_invested"],
+                aggregates["realized_pnl"],
+                name,
+                expected_version,
+            ),
+        )
+        if cursor.rowcount == 0:
+            conn.rollback()
+            return None
+        cursor.execute("DELETE FROM holdings WHERE name = ?", (name,))
+        cursor.executemany(
+            "INSERT INTO holdings (name, symbol, quantity, average_cost) VALUES (?, ?, ?, ?)",
+            [
+                (name, symbol, quantity, aggregates["average_cost"].get(symbol, 0.0))
+                for symbol, quantity in account_dict["holdings"].items()
+            ],
+        )
+        _append_event(cursor, name, "state", account_dict, timestamp)
+        conn.commit()
+        return expected_version + 1
+
+
+def _version_matches(cursor, name: str, expected_version: int | None) -> bool:
+    """Dentro de una transacción, comprueba que la cuenta sigue en la versión leída."""
+    if expected_version is None:
+        return True
+    row = cursor.execute("SELECT version FROM accounts WHERE name = ?", (name,)).fetchone()
+    return row is not None and row[0] == expected_version
+
+
+def apply_trades(
+    name: str,
+    trades: list[tuple[str, int, float, str, str]],
+    expected_version: int | None = None,
+) -> int | None:
+    """
+    Aplica un lote de operaciones en una única transacción con sentencias condicionales,
+    sin leer ni reescribir la cuenta completa. Si alguna condición falla (saldo o acciones
+    insuficientes) se deshace el lote entero.
+
+    Args:
+        name (str): El nombre de la cuenta
+        trades (list): Tuplas (symbol, quantity, price, timestamp, rationale) con cantidad negativa para vender
+        expected_version (int): La versión con la que se validó el lote; si otra escritura la ha cambiado no se aplica nada
+
+    Returns:
+        int: La nueva versión de la cuenta, o None si la versión ya no coincide
+    """
+    name = name.lower()
+    with get_db_connection(name) as conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        if not _version_matches(cursor, name, expected_version):
+            conn.rollback()
+            return None
+        for symbol, quantity, price, timestamp, rationale in trades:
+            if quantity < 0:
+                # Ganancia realizada con el coste medio previo a la venta
+                cursor.execute(
+                    """
+                    UPDATE accounts SET
+                        balance = balance + ?,
+                        net_invested = net_invested + ?,
+                        realized_pnl = realized_pnl + ? * (? - (
+                            SELECT average_cost FROM holdings WHERE name = ? AND symbol = ?
+                        ))
+                    WHERE name = ?
+                """,
+                    (-quantity * price, quantity * price, -quantity, price, name, symbol, name),
+                )
+                cursor.execute(
+                    """
+                    UPDATE holdings SET quantity = quantity + ?
+                    WHERE name = ? AND symbol = ? AND quantity >= ?
+                """,
+                    (quantity, name, symbol, -quantity),
+                )
+                if cursor.rowcount == 0:
+                    conn.rollback()
+                    raise ValueError(
+                        f"No pueden venderse {-quantity} acciones de {symbol}. No hay suficientes acciones en posesión."
+                    )
+                cursor.execute(
+                    "DELETE FROM holdings WHERE name = ? AND symbol = ? AND quantity = 0",
+                    (name, symbol),
+                )
+            else:
+                cursor.execute(
+                    """
+                    UPDATE accounts SET balance = balance - ?, net_invested = net_invested + ?
+                    WHERE name = ? AND balance >= ?
+                """,
+                    (quantity * price, quantity * price, name, quantity * price),
+                )
+                if cursor.rowcount == 0:
+                    conn.rollback()
+                    raise ValueError("Fondos insuficientes para comprar acciones.")
+                cursor.execute(
+                    """
+                    INSERT INTO holdings (name, symbol, quantity, average_cost)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(name, symbol) DO UPDATE SET
+                        average_cost = (average_cost * quantity + excluded.average_cost * excluded.quantity)
+                            / (quantity + excluded.quantity),
+                        quantity = quantity + excluded.quantity
+                """,
+                    (name, symbol, quantity, price),
+                )
+            cursor.execute(
+                "INSERT INTO transactions (name, symbol, quantity, price, timestamp, rationale) VALUES (?, ?, ?, ?, ?, ?)",
+                (name, symbol, quantity, price, timestamp, rationale),
+            )
+        cursor.execute(
+            "UPDATE accounts SET version = version + 1 WHERE name = ? RETURNING version",
+            (name,),
+        )
+        version = cursor.fetchone()[0]
+        for symbol, quantity, price, timestamp, rationale in trades:
+            _append_event(
+                cursor,
+                name,
+                "sell" if quantity < 0 else "buy",
+                {"symbol": symbol, "quantity": quantity, "price": price, "rationale": rationale},
+                timestamp,
+            )
+        conn.commit()
+        return version
+
+
+def update_balance(name: str, amount: float, timestamp: str) -> int:
+    """
+    Suma `amount` al saldo con una única sentencia que impide dejarlo en negativo.
+
+    Returns:
+        int: La nueva versión de la cuenta
+    """
+    name = name.lower()
+    with get_db_connection(name) as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT account FROM accounts WHERE name = ?", (name.lower(),))
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute(
+            """
+            UPDATE accounts SET balance = balance + ?, version = version + 1
+            WHERE name = ? AND balance + ? >= 0
+            RETURNING version
+        """,
+            (amount, name, amount),
+        )
         row = cursor.fetchone()
-        return json.loads(row[0]) if row else None
+        if not row:
+            conn.rollback()
+            raise ValueError("No hay fondos suficientes para retirar.")
+        _append_event(
+            cursor,
+            name,
+            "deposit" if amount > 0 else "withdraw",
+            {"amount": amount},
+            timestamp,
+        )
+        conn.commit()
+        return row[0]
+
+
+def update_strategy(
+    name: str, strategy: str, timestamp: str, expected_version: int | None = None
+) -> int | None:
+    """
+    Cambia la estrategia de la cuenta.
+
+    Returns:
+        int: La nueva versión de la cuenta, o None si no coincide con `expected_version`
+    """
+    name = name.lower()
+    with get_db_connection(name) as conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        if not _version_matches(cursor, name, expected_version):
+            conn.rollback()
+            return None
+        cursor.execute(
+            "UPDATE accounts SET strategy = ?, version = version + 1 WHERE name = ? RETURNING version",
+            (strategy, name),
+        )
+        version = cursor.fetchone()[0]
+        _append_event(cursor, name, "strategy", {"strategy": strategy}, timestamp)
+        conn.commit()
+        return version
+
+
+def reset_account(name: str, balance: float, strategy: str, timestamp: str) -> int:
+    """Vacía tenencias, transacciones y serie de valor y restablece saldo y estrategia."""
+    name = name.lower()
+    with get_db_connection(name) as conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("DELETE FROM holdings WHERE name = ?", (name,))
+        cursor.execute("DELETE FROM transactions WHERE name = ?", (name,))
+        cursor.execute("DELETE FROM portfolio_values WHERE name = ?", (name,))
+        cursor.execute("DELETE FROM portfolio_rollups WHERE name = ?", (name,))
+        cursor.execute(
+            """
+            UPDATE accounts
+            SET balance = ?, strategy = ?, net_invested = 0, realized_pnl = 0, version = version + 1
+            WHERE name = ?
+            RETURNING version
+        """,
+            (balance, strategy, name),
+        )
+        version = cursor.fetchone()[0]
+        _append_event(
+            cursor, name, "reset", {"balance": balance, "strategy": strategy}, timestamp
+        )
+        conn.commit()
+        return version
+
+
+def write_portfolio_value(name: str, timestamp: str, value: float) -> None:
+    """
+    Añade un punto a la serie de valor de la cartera, lo incorpora a los agregados por
+    minuto, hora y día y elimina lo que ha quedado fuera del periodo de retención de cada nivel.
+    """
+    name = name.lower()
+    moment = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
+    with get_db_connection(name) as conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute(
+            "INSERT INTO portfolio_values (name, timestamp, value) VALUES (?, ?, ?)",
+            (name, timestamp, value),
+        )
+        _write_rollups(cursor, name, timestamp, value)
+        cursor.execute(
+            "DELETE FROM portfolio_values WHERE name = ? AND timestamp < ?",
+            (name, (moment - PORTFOLIO_RETENTION["raw"]).strftime("%Y-%m-%d %H:%M:%S")),
+        )
+        for resolution in ROLLUP_PREFIX:
+            retention = PORTFOLIO_RETENTION[resolution]
+            if retention is not None:
+                cursor.execute(
+                    "DELETE FROM portfolio_rollups WHERE name = ? AND resolution = ? AND bucket < ?",
+                    (name, resolution, (moment - retention).strftime("%Y-%m-%d %H:%M:%S")),
+                )
+        conn.commit()
+
+
+@_reads_account(dict)
+def read_portfolio_coverage(name: str) -> dict[str, str]:
+    """Devuelve la primera marca de tiempo disponible en cada nivel de la serie de valor."""
+    with get_db_connection(name) as conn:
+        rows = conn.execute(
+            """
+            SELECT 'raw', MIN(timestamp) FROM portfolio_values WHERE name = ?
+            UNION ALL
+            SELECT resolution, MIN(bucket) FROM portfolio_rollups WHERE name = ? GROUP BY resolution
+        """,
+            (name.lower(), name.lower()),
+        ).fetchall()
+    return {resolution: start for resolution, start in rows if start}
+
+
+@_reads_account(list)
+def read_portfolio_rollups(
+    name: str, resolution: str, start: str | None = None, end: str | None = None
+) -> list[tuple[str, float, float, float, float]]:
+    """Devuelve los agregados (inicio, apertura, máximo, mínimo, cierre) de una resolución."""
+    with get_db_connection(name) as conn:
+        return conn.execute(
+            """
+            SELECT bucket, open, high, low, close FROM portfolio_rollups
+            WHERE name = ? AND resolution = ? AND bucket >= ? AND bucket <= ?
+            ORDER BY bucket
+        """,
+            (name.lower(), resolution, start or "", end or "9999-12-31"),
+        ).fetchall()
+
+
+def read_daily_portfolio_values(
+    names: list[str], start: str | None = None
+) -> list[tuple[str, str, float]]:
+    """Devuelve (nombre, día, valor de cierre) de varias cuentas, leyendo la base de datos de cada una."""
+    rows = []
+    for name in filter(shard_exists, names):
+        with get_db_connection(name) as conn:
+            rows.extend(
+                conn.execute(
+                    """
+                    SELECT name, bucket, close FROM portfolio_rollups
+                    WHERE resolution = 'day' AND name = ? AND bucket >= ?
+                    ORDER BY bucket
+                """,
+                    (name.lower(), start or ""),
+                ).fetchall()
+            )
+    return rows
+
+
+def read_traded_notional(names: list[str], start: str | None = None) -> dict[str, float]:
+    """Devuelve el importe negociado (compras más ventas) de cada cuenta desde `start`."""
+    notional = {name.lower(): 0.0 for name in names}
+    for name in filter(shard_exists, names):
+        with get_db_connection(name) as conn:
+            notional[name.lower()] = conn.execute(
+                """
+                SELECT COALESCE(SUM(ABS(quantity * price)), 0) FROM transactions
+                WHERE name = ? AND timestamp >= ?
+            """,
+                (name.lower(), start or ""),
+            ).fetchone()[0]
+    return notional
+
+
+@_reads_account(list)
+def read_portfolio_range(
+    name: str, start: str | None = None, end: str | None = None
+) -> list[tuple[str, float]]:
+    """Devuelve los puntos sin agregar de la serie de valor en un intervalo de tiempo."""
+    with get_db_connection(name) as conn:
+        return conn.execute(
+            """
+            SELECT timestamp, value FROM portfolio_values
+            WHERE name = ? AND timestamp >= ? AND timestamp <= ?
+            ORDER BY timestamp, id
+        """,
+            (name.lower(), start or "", end or "9999-12-31"),
+        ).fetchall()
+
+
+RESTING_ORDER_COLUMNS = (
+    "id",
+    "name",
+    "symbol",
+    "side",
+    "type",
+    "quantity",
+    "limit_price",
+    "stop_price",
+    "triggered",
+    "status",
+    "rationale",
+    "message",
+    "created",
+    "updated",
+)
+
+
+def write_resting_order(
+    name: str,
+    symbol: str,
+    side: str,
+    type: str,
+    quantity: int,
+    limit_price: float | None,
+    stop_price: float | None,
+    rationale: str,
+    timestamp: str,
+) -> int:
+    """Guarda una orden pendiente abierta y devuelve su identificador."""
+    with get_db_connection(name) as conn:
+        cursor = conn.execute(
+            """
+            INSERT INTO resting_orders
+                (name, symbol, side, type, quantity, limit_price, stop_price, rationale, created, updated)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+            (
+                name.lower(),
+                symbol,
+                side,
+                type,
+                quantity,
+                limit_price,
+                stop_price,
+                rationale,
+                timestamp,
+                timestamp,
+            ),
+        )
+        conn.commit()
+        return cursor.lastrowid  # type: ignore
+
+
+def read_resting_orders(
+    name: str | None = None, status: str | None = "open", limit: int | None = None
+) -> list[dict]:
+    """
+    Lee las órdenes pendientes, de la más reciente a la más antigua.
+
+    Args:
+        name (str): Solo las de esta cuenta; None para las de todos los traders
+        status (str): Solo las que están en este estado; None para todas
+        limit (int): El número máximo de órdenes por cuenta
+    """
+    query = f"SELECT {', '.join(RESTING_ORDER_COLUMNS)} FROM resting_orders WHERE 1 = 1"
+    params: list = []
+    if status is not None:
+        query += " AND status = ?"
+        params.append(status)
+    query += " ORDER BY id DESC"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    orders = []
+    shards = shard_names() if name is None else [name] if shard_exists(name) else []
+    for shard in shards:
+        with get_db_connection(shard) as conn:
+            rows = conn.execute(query, params).fetchall()
+        orders.extend(dict(zip(RESTING_ORDER_COLUMNS, row)) for row in rows)
+    return orders
+
+
+def update_resting_orders(
+    name: str,
+    updates: list[tuple[int, str, bool, str | None]],
+    timestamp: str,
+    current: str = "open",
+) -> None:
+    """
+    Actualiza el estado de varias órdenes de la cuenta en una transacción.
+
+    Args:
+        name (str): El nombre de la cuenta
+        updates (list): Tuplas (id, estado, activada, mensaje)
+        timestamp (str): La hora de la actualización
+        current (str): Solo se actualizan las órdenes que siguen en este estado
+    """
+    with get_db_connection(name) as conn:
+        conn.executemany(
+            """
+            UPDATE resting_orders SET status = ?, triggered = ?, message = COALESCE(?, message), updated = ?
+            WHERE id = ? AND status = ?
+        """,
+            [
+                (status, int(triggered), message, timestamp, id, current)
+                for id, status, triggered, message in updates
+            ],
+        )
+        conn.commit()
+
+
+def claim_resting_orders(name: str, ids: list[int], timestamp: str) -> set[int]:
+    """
+    Pasa a 'filling' las órdenes de la cuenta que siguen abiertas y devuelve las que se han
+    reservado, de modo que dos procesos que evalúan el libro a la vez no ejecutan la misma
+    orden dos veces.
+    """
+    if not ids:
+        return set()
+    placeholders = ", ".join("?" for _ in ids)
+    with get_db_connection(name) as conn:
+        rows = conn.execute(
+            f"""
+            UPDATE resting_orders SET status = 'filling', updated = ?
+            WHERE id IN ({placeholders}) AND status = 'open'
+            RETURNING id
+        """,
+            (timestamp, *ids),
+        ).fetchall()
+        conn.commit()
+    return {id for (id,) in rows}
+
+
+def recover_resting_orders(name: str, timestamp: str) -> list[tuple[int, str]]:
+    """
+    Resuelve las órdenes de la cuenta que quedaron reservadas ('filling') porque el proceso
+    que las ejecutaba se interrumpió: si desde la reserva hay una transacción que coincide con
+    la orden se da por ejecutada y, si no, vuelve a quedar abierta.
+
+    Returns:
+        list: (id, nuevo estado) de cada orden resuelta
+    """
+    with get_db_connection(name) as conn:
+        rows = conn.execute(
+            """
+            UPDATE resting_orders SET
+                status = CASE WHEN EXISTS (
+                    SELECT 1 FROM transactions AS t
+                    WHERE t.name = resting_orders.name
+                        AND t.symbol = resting_orders.symbol
+                        AND t.quantity = CASE resting_orders.side
+                            WHEN 'buy' THEN resting_orders.quantity ELSE -resting_orders.quantity END
+                        AND t.rationale = resting_orders.rationale
+                        AND t.timestamp >= resting_orders.updated
+                ) THEN 'filled' ELSE 'open' END,
+                updated = ?
+            WHERE status = 'filling'
+            RETURNING id, status
+        """,
+            (timestamp,),
+        ).fetchall()
+        conn.commit()
+    return rows
+
+
+def cancel_resting_order(name: str, id: int, timestamp: str) -> bool:
+    """Cancela una orden abierta de la cuenta; devuelve False si no existe o ya no está abierta."""
+    with get_db_connection(name) as conn:
+        cursor = conn.execute(
+            """
+            UPDATE resting_orders SET status = 'cancelled', updated = ?
+            WHERE id = ? AND name = ? AND status = 'open'
+        """,
+            (timestamp, id, name.lower()),
+        )
+        conn.commit()
+        return cursor.rowcount > 0
 
 
 def write_log(name: str, type: str, message: str):
@@ -75,7 +1330,7 @@ def write_log(name: str, type: str, message: str):
     """
     now = datetime.now().isoformat()
 
-    with get_db_connection() as conn:
+    with get_db_connection(name) as conn:
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -87,6 +1342,7 @@ def write_log(name: str, type: str, message: str):
         conn.commit()
 
 
+@_reads_account(list)
 def read_log(name: str, last_n=10):
     """
     Lee las entradas de registro más recientes para un nombre determinado.
@@ -98,7 +1354,7 @@ def read_log(name: str, last_n=10):
     Returns:
         list: Una lista de tuplas que contienen (datetime, type, message)
     """
-    with get_db_connection() as conn:
+    with get_db_connection(name) as conn:
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -113,6 +1369,178 @@ def read_log(name: str, last_n=10):
         return reversed(cursor.fetchall())
 
 
+def read_logs(names: list[str], last_n=10) -> dict[str, list[tuple[str, str, str]]]:
+    """
+    Lee los registros más recientes de varios traders, cada uno de su base de datos.
+
+    Returns:
+        dict: nombre -> lista de tuplas (datetime, type, message), de la más antigua a la más reciente
+    """
+    return {name: list(read_log(name, last_n)) for name in names}
+
+
+def archive_logs(
+    name: str,
+    retention: timedelta = LOG_RETENTION,
+    max_rows: int = LOG_MAX_ROWS,
+    batch: int = LOG_DELETE_BATCH,
+) -> int:
+    """
+    Archiva y borra los registros del trader que superan la retención por antigüedad o por
+    número de filas. Cada lote se añade a los ficheros diarios comprimidos
+    LOG_ARCHIVE_DIR/<nombre>/<fecha>.jsonl.gz y se borra en su propia transacción corta, de
+    modo que quien escribe registros mientras tanto solo espera a un lote.
+
+    Returns:
+        int: El número de registros archivados
+    """
+    name = name.lower()
+    with get_db_connection(name) as conn:
+        cursor = conn.cursor()
+        # Los identificadores crecen con la fecha, así que basta con el último que caduca
+        cutoff = datetime.now(timezone.utc) - retention
+        by_age = cursor.execute(
+            "SELECT MAX(id) FROM logs WHERE name = ? AND datetime < ?",
+            (name, cutoff.strftime("%Y-%m-%d %H:%M:%S")),
+        ).fetchone()[0]
+        by_count = cursor.execute(
+            "SELECT id FROM logs WHERE name = ? ORDER BY id DESC LIMIT 1 OFFSET ?",
+            (name, max_rows),
+        ).fetchone()
+        last_id = max(by_age or 0, by_count[0] if by_count else 0)
+
+        archived = 0
+        while True:
+            rows = cursor.execute(
+                "SELECT id, datetime, type, message FROM logs WHERE name = ? AND id <= ? ORDER BY id LIMIT ?",
+                (name, last_id, batch),
+            ).fetchall()
+            if not rows:
+                return archived
+            # Se archiva antes de borrar: si algo falla entre medias, como mucho se repite
+            # una fila en el archivo, pero nunca se pierde
+            _append_log_archive(name, rows)
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(
+                "DELETE FROM logs WHERE name = ? AND id BETWEEN ? AND ?",
+                (name, rows[0][0], rows[-1][0]),
+            )
+            conn.commit()
+            archived += len(rows)
+
+
+def _append_log_archive(name: str, rows: list[tuple]) -> None:
+    by_day: dict[str, list[tuple]] = {}
+    for row in rows:
+        by_day.setdefault(str(row[1])[:10], []).append(row)
+    directory = os.path.join(LOG_ARCHIVE_DIR, os.path.basename(shard_path(name))[:-3])
+    os.makedirs(directory, exist_ok=True)
+    for day, day_rows in by_day.items():
+        # gzip admite añadir miembros al final; al leerlo se ven como un único fichero
+        with gzip.open(os.path.join(directory, f"{day}.jsonl.gz"), "at", encoding="utf-8") as f:
+            for id, timestamp, type, message in day_rows:
+                f.write(
+                    json.dumps({"id": id, "datetime": timestamp, "type": type, "message": message})
+                    + "\n"
+                )
+
+
+def compact_database(name: str | None = None, pages: int = VACUUM_PAGES) -> None:
+    """
+    Vacía el WAL en la base de datos con wal_checkpoint(TRUNCATE) y devuelve al sistema parte
+    de las páginas libres con un vacuum incremental. Ninguno de los dos reescribe la base de
+    datos entera, así que se puede llamar con los traders en marcha; en las bases de datos sin
+    auto_vacuum incremental el vacuum no hace nada.
+    """
+    conn = get_db_connection(name)
+    try:
+        conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    finally:
+        conn.close()
+
+
+def enable_incremental_vacuum(name: str | None = None) -> bool:
+    """
+    Activa auto_vacuum incremental en una base de datos creada antes de que se usara. Exige un
+    VACUUM completo, que reescribe el fichero y bloquea la base de datos mientras dura, así que
+    debe ejecutarse sin traders en marcha, no desde el mantenimiento periódico.
+
+    Returns:
+        bool: True si se ha convertido; False si ya lo tenía
+    """
+    conn = get_db_connection(name)
+    try:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            return False
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        return True
+    finally:
+        conn.close()
+
+
+SUMMARY_COLUMNS = (
+    "name",
+    "cash",
+    "market_value",
+    "portfolio_value",
+    "pnl",
+    "positions",
+    "last_trade",
+    "updated",
+)
+
+
+def write_account_summary(
+    name: str,
+    cash: float,
+    portfolio_value: float,
+    pnl: float,
+    positions: int,
+    last_trade: str | None,
+    timestamp: str,
+) -> None:
+    with get_db_connection(state=True) as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO account_summary
+                (name, cash, market_value, portfolio_value, pnl, positions, last_trade, updated)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+            (
+                name.lower(),
+                cash,
+                portfolio_value - cash,
+                portfolio_value,
+                pnl,
+                positions,
+                last_trade,
+                timestamp,
+            ),
+        )
+        conn.commit()
+
+
+def read_account_summary(name: str) -> dict | None:
+    with get_db_connection(state=True) as conn:
+        row = conn.execute(
+            f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM account_summary WHERE name = ?",
+            (name.lower(),),
+        ).fetchone()
+    return dict(zip(SUMMARY_COLUMNS, row)) if row else None
+
+
+def read_account_summaries(limit: int | None = None) -> list[dict]:
+    """Devuelve la clasificación de todas las cuentas por ganancia/pérdida con una sola consulta."""
+    with get_db_connection(state=True) as conn:
+        rows = conn.execute(
+            f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM account_summary ORDER BY pnl DESC LIMIT ?",
+            (-1 if limit is None else limit,),
+        ).fetchall()
+    return [dict(zip(SUMMARY_COLUMNS, row)) for row in rows]
+
+
 def write_market(date: str, data: dict) -> None:
     data_json = json.dumps(data)
     with get_db_connection() as conn:
@@ -133,4 +1561,128 @@ def read_market(date: str) -> dict | None:
         cursor = conn.cursor()
         cursor.execute("SELECT data FROM market WHERE date = ?", (date,))
         row = cursor.fetchone()
-        return json.loads(row[0]) if row else None
\ No newline at end of file
+        return json.loads(row[0]) if row else None
+
+
+def read_market_dates(start: str | None = None, end: str | None = None) -> list[str]:
+    """
+    Lee las fechas con datos de mercado guardados dentro de un rango.
+
+    Args:
+        start (str): La primera fecha incluida (AAAA-MM-DD) o None
+        end (str): La última fecha incluida (AAAA-MM-DD) o None
+
+    Returns:
+        list: Las fechas en orden cronológico
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT date FROM market
+            WHERE date >= ? AND date <= ?
+            ORDER BY date
+        """,
+            (start or "", end or "9999-12-31"),
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def write_market_bars(date: str, data: dict) -> None:
+    """
+    Guarda las barras diarias de todo el mercado para una fecha.
+
+    Args:
+        date (str): La fecha de la instantánea (AAAA-MM-DD)
+        data (dict): Diccionario símbolo -> [open, high, low, close, volume]
+    """
+    data_json = json.dumps(data)
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            INSERT INTO market_bars (date, data)
+            VALUES (?, ?)
+            ON CONFLICT(date) DO UPDATE SET data=excluded.data
+        """,
+            (date, data_json),
+        )
+        conn.commit()
+
+
+def market_data_version() -> tuple:
+    """
+    Cambia con cada escritura en la base de datos compartida, de este o de otro proceso, sin
+    abrirla: el tamaño y la hora de modificación del fichero y de su WAL. Sirve de clave para
+    las cachés de datos de mercado.
+    """
+    version = []
+    for path in (DB, DB + "-wal"):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            version.append(None)
+        else:
+            version.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(version)
+
+
+def read_market_bars(date: str) -> dict | None:
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT data FROM market_bars WHERE date = ?", (date,))
+        row = cursor.fetchone()
+        return json.loads(row[0]) if row else None
+
+
+def read_market_bar_dates(last_n: int = 30, end: str | None = None) -> list[str]:
+    """
+    Lee las fechas de las instantáneas de barras más recientes.
+
+    Args:
+        last_n (int): El número de días más recientes que se van a recuperar
+        end (str): La última fecha incluida (AAAA-MM-DD) o None para la más reciente
+
+    Returns:
+        list: Las fechas en orden cronológico
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT date FROM market_bars WHERE date <= ? ORDER BY date DESC LIMIT ?",
+            (end or "9999-12-31", last_n),
+        )
+        return [row[0] for row in reversed(cursor.fetchall())]
+
+
+def write_clock(simulated: str | None, anchored_at: str | None = None) -> None:
+    """
+    Guarda el reloj simulado compartido por todos los procesos (None lo desactiva).
+
+    Args:
+        simulated (str): La hora simulada en formato ISO
+        anchored_at (str): La hora real en la que se fijó la hora simulada
+    """
+    with get_db_connection(state=True) as conn:
+        cursor = conn.cursor()
+        if simulated is None:
+            cursor.execute("DELETE FROM clock")
+        else:
+            cursor.execute(
+                """
+                INSERT INTO clock (id, simulated, anchored_at)
+                VALUES (0, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    simulated=excluded.simulated, anchored_at=excluded.anchored_at
+            """,
+                (simulated, anchored_at),
+            )
+        conn.commit()
+
+
+def read_clock() -> tuple[str, str] | None:
+    with get_db_connection(state=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT simulated, anchored_at FROM clock WHERE id = 0")
+        row = cursor.fetchone()
+        return (row[0], row[1]) if row else None
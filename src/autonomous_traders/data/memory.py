@@ -0,0 +1,317 @@
+import os
+import re
+import sqlite3
+
+from dotenv import load_dotenv
+
+load_dotenv(override=True)
+
+# Grafo de conocimiento de los investigadores: una sola base de datos para todos, con las
+# entidades, observaciones y relaciones de cada trader separadas por espacio de nombres
+MEMORY_DIR = "memory"
+MEMORY_DB = os.getenv("MEMORY_DB", os.path.join(MEMORY_DIR, "knowledge.db"))
+
+SEARCH_LIMIT = 20
+
+_initialized: set[str] = set()
+
+
+def get_memory_connection():
+    if MEMORY_DB not in _initialized:
+        os.makedirs(os.path.dirname(MEMORY_DB) or ".", exist_ok=True)
+    conn = sqlite3.connect(MEMORY_DB, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    if MEMORY_DB not in _initialized:
+        _create_memory_schema(conn.cursor())
+        conn.commit()
+        _initialized.add(MEMORY_DB)
+    return conn
+
+
+def _create_memory_schema(cursor):
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS entities (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            namespace TEXT NOT NULL,
+            name TEXT NOT NULL,
+            entity_type TEXT NOT NULL,
+            UNIQUE (namespace, name)
+        )
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS observations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            entity_id INTEGER NOT NULL REFERENCES entities (id) ON DELETE CASCADE,
+            content TEXT NOT NULL,
+            UNIQUE (entity_id, content)
+        )
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS relations (
+            namespace TEXT NOT NULL,
+            source TEXT NOT NULL,
+            target TEXT NOT NULL,
+            type TEXT NOT NULL,
+            PRIMARY KEY (namespace, source, target, type)
+        )
+    """
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_relations_target ON relations (namespace, target)"
+    )
+    # Índice de texto completo con una fila por entidad (nombre, tipo y sus observaciones),
+    # con el mismo rowid que la entidad; se rehace para cada entidad que cambia
+    cursor.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS entity_search USING fts5(
+            namespace UNINDEXED, name, entity_type, observations,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    """
+    )
+
+
+def _entity_id(cursor, namespace: str, name: str) -> int | None:
+    row = cursor.execute(
+        "SELECT id FROM entities WHERE namespace = ? AND name = ?", (namespace, name)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def _reindex(cursor, namespace: str, ids: set[int]) -> None:
+    """Rehace la fila del índice de búsqueda de cada entidad indicada."""
+    for id in ids:
+        cursor.execute("DELETE FROM entity_search WHERE rowid = ?", (id,))
+        row = cursor.execute("SELECT name, entity_type FROM entities WHERE id = ?", (id,)).fetchone()
+        if row is None:
+            continue
+        observations = [
+            content
+            for (content,) in cursor.execute(
+                "SELECT content FROM observations WHERE entity_id = ? ORDER BY id", (id,)
+            )
+        ]
+        cursor.execute(
+            "INSERT INTO entity_search (rowid, namespace, name, entity_type, observations) VALUES (?, ?, ?, ?, ?)",
+            (id, namespace, row[0], row[1], "\n".join(observations)),
+        )
+
+
+def write_entities(namespace: str, entities: list[tuple[str, str, list[str]]]) -> None:
+    """Crea las entidades (nombre, tipo, observaciones); si ya existen, añade las observaciones."""
+    with get_memory_connection() as conn:
+        cursor = conn.cursor()
+        changed = set()
+        for name, entity_type, observations in entities:
+            cursor.execute(
+                """
+                INSERT INTO entities (namespace, name, entity_type) VALUES (?, ?, ?)
+                ON CONFLICT (namespace, name) DO UPDATE SET entity_type = excluded.entity_type
+            """,
+                (namespace, name, entity_type),
+            )
+            id = _entity_id(cursor, namespace, name)
+            cursor.executemany(
+                "INSERT OR IGNORE INTO observations (entity_id, content) VALUES (?, ?)",
+                [(id, content) for content in observations],
+            )
+            changed.add(id)
+        _reindex(cursor, namespace, changed)
+        conn.commit()
+
+
+def write_observations(namespace: str, name: str, observations: list[str]) -> list[str]:
+    """Añade observaciones a una entidad existente; devuelve las que no estaban ya."""
+    with get_memory_connection() as conn:
+        cursor = conn.cursor()
+        id = _entity_id(cursor, namespace, name)
+        if id is None:
+            raise ValueError(f"No existe la entidad {name}")
+        added = []
+        for content in observations:
+            cursor.execute(
+                "INSERT OR IGNORE INTO observations (entity_id, content) VALUES (?, ?)",
+                (id, content),
+            )
+            if cursor.rowcount:
+                added.append(content)
+        _reindex(cursor, namespace, {id})
+        conn.commit()
+        return added
+
+
+def write_relations(namespace: str, relations: list[tuple[str, str, str]]) -> None:
+    """Crea las relaciones (origen, destino, tipo) que no existan ya."""
+    with get_memory_connection() as conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO relations (namespace, source, target, type) VALUES (?, ?, ?, ?)",
+            [(namespace, *relation) for relation in relations],
+        )
+        conn.commit()
+
+
+def delete_entity(namespace: str, name: str) -> bool:
+    """Borra una entidad con sus observaciones y todas sus relaciones."""
+    with get_memory_connection() as conn:
+        cursor = conn.cursor()
+        id = _entity_id(cursor, namespace, name)
+        if id is None:
+            return False
+        cursor.execute("DELETE FROM entities WHERE id = ?", (id,))
+        cursor.execute(
+            "DELETE FROM relations WHERE namespace = ? AND (source = ? OR target = ?)",
+            (namespace, name, name),
+        )
+        _reindex(cursor, namespace, {id})
+        conn.commit()
+        return True
+
+
+def delete_observations(namespace: str, name: str, observations: list[str]) -> int:
+    with get_memory_connection() as conn:
+        cursor = conn.cursor()
+        id = _entity_id(cursor, namespace, name)
+        if id is None:
+            return 0
+        cursor.executemany(
+            "DELETE FROM observations WHERE entity_id = ? AND content = ?",
+            [(id, content) for content in observations],
+        )
+        deleted = cursor.rowcount
+        _reindex(cursor, namespace, {id})
+        conn.commit()
+        return deleted
+
+
+def delete_relation(namespace: str, source: str, target: str, type: str) -> bool:
+    with get_memory_connection() as conn:
+        cursor = conn.execute(
+            "DELETE FROM relations WHERE namespace = ? AND source = ? AND target = ? AND type = ?",
+            (namespace, source, target, type),
+        )
+        conn.commit()
+        return cursor.rowcount > 0
+
+
+def _read_graph(cursor, namespace: str, ids: list[int] | None) -> dict:
+    """Las entidades indicadas (todas si `ids` es None) y las relaciones entre ellas."""
+    if ids is None:
+        rows = cursor.execute(
+            "SELECT id, name, entity_type FROM entities WHERE namespace = ? ORDER BY id",
+            (namespace,),
+        ).fetchall()
+    else:
+        rows = cursor.execute(
+            f"SELECT id, name, entity_type FROM entities WHERE id IN ({','.join('?' * len(ids))})",
+            ids,
+        ).fetchall()
+        # Se respeta el orden de `ids`, que en una búsqueda es el de relevancia
+        order = {id: i for i, id in enumerate(ids)}
+        rows.sort(key=lambda row: order[row[0]])
+    observations: dict[int, list[str]] = {id: [] for id, _, _ in rows}
+    if rows:
+        for entity_id, content in cursor.execute(
+            f"SELECT entity_id, content FROM observations WHERE entity_id IN ({','.join('?' * len(rows))}) ORDER BY id",
+            list(observations),
+        ):
+            observations[entity_id].append(content)
+    names = [name for _, name, _ in rows]
+    relations = []
+    if names:
+        placeholders = ",".join("?" * len(names))
+        relations = [
+            {"source": source, "target": target, "type": type}
+            for source, target, type in cursor.execute(
+                f"""
+                SELECT source, target, type FROM relations
+                WHERE namespace = ? AND source IN ({placeholders}) AND target IN ({placeholders})
+            """,
+                (namespace, *names, *names),
+            )
+        ]
+    return {
+        "entities": [
+            {"name": name, "entityType": entity_type, "observations": observations[id]}
+            for id, name, entity_type in rows
+        ],
+        "relations": relations,
+    }
+
+
+def read_graph(namespace: str) -> dict:
+    with get_memory_connection() as conn:
+        return _read_graph(conn.cursor(), namespace, None)
+
+
+def read_entities(namespace: str, names: list[str]) -> dict:
+    """Las entidades con esos nombres exactos y las relaciones entre ellas."""
+    with get_memory_connection() as conn:
+        cursor = conn.cursor()
+        ids = [id for name in names if (id := _entity_id(cursor, namespace, name)) is not None]
+        return _read_graph(cursor, namespace, ids)
+
+
+def _match_expression(query: str) -> str | None:
+    """Convierte texto libre en una consulta FTS5 segura: cualquier término, como prefijo."""
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return None
+    return " OR ".join(f'"{term}"*' for term in terms)
+
+
+def search_entities(namespace: str, query: str, limit: int = SEARCH_LIMIT) -> dict:
+    """
+    Busca entidades por nombre, tipo u observaciones con el índice de texto completo, de la
+    más a la menos relevante, y devuelve también las relaciones entre las encontradas.
+    """
+    expression = _match_expression(query)
+    if expression is None:
+        return {"entities": [], "relations": []}
+    with get_memory_connection() as conn:
+        cursor = conn.cursor()
+        ids = [
+            id
+            for (id,) in cursor.execute(
+                """
+                SELECT rowid FROM entity_search
+                WHERE entity_search MATCH ? AND namespace = ?
+                ORDER BY bm25(entity_search, 0, 10.0, 2.0, 1.0)
+                LIMIT ?
+            """,
+                (expression, namespace, limit),
+            )
+        ]
+        return _read_graph(cursor, namespace, ids)
+
+
+def import_libsql_memory(namespace: str, path: str) -> int:
+    """
+    Importa el grafo de una base de datos de mcp-memory-libsql de versiones anteriores si el
+    espacio de nombres todavía está vacío; devuelve el número de entidades importadas.
+    """
+    if not os.path.exists(path):
+        return 0
+    with get_memory_connection() as conn:
+        if conn.execute("SELECT 1 FROM entities WHERE namespace = ? LIMIT 1", (namespace,)).fetchone():
+            return 0
+    try:
+        with sqlite3.connect(path) as old:
+            entities = old.execute("SELECT name, entity_type FROM entities").fetchall()
+            observations: dict[str, list[str]] = {}
+            for name, content in old.execute("SELECT entity_name, content FROM observations ORDER BY id"):
+                observations.setdefault(name, []).append(content)
+            relations = old.execute("SELECT source, target, relation_type FROM relations").fetchall()
+    except sqlite3.Error as e:
+        print(f"No se pudo importar la memoria de {path}: {e}")
+        return 0
+    write_entities(
+        namespace, [(name, type, observations.get(name, [])) for name, type in entities]
+    )
+    write_relations(namespace, relations)
+    return len(entities)
@@ -1,9 +1,22 @@
+import threading
+import time
+
 import gradio as gr
 import pandas as pd
 import plotly.express as px
 
-from autonomous_traders.core.accounts import Account
-from autonomous_traders.data.database import read_log
+from autonomous_traders.core.accounts import Account, Transaction
+from autonomous_traders.core.analytics import leaderboard
+from autonomous_traders.core.market import get_price_epoch
+from autonomous_traders.core.timeseries import portfolio_series
+from autonomous_traders.data.database import (
+    read_account_summaries,
+    read_account_summary,
+    read_account_version,
+    read_last_portfolio_value,
+    read_logs,
+    read_transactions_since,
+)
 from autonomous_traders.ui.trading_floor import lastnames, names, short_model_names
 from autonomous_traders.utils.util import Color, css, js
 
@@ -16,13 +29,53 @@ mapper = {
     "account": Color.RED,
 }
 
+RECENT_TRANSACTIONS = 50
+
+# Cada cuántos segundos el refresco compartido lee los registros y el resto del panel
+LOG_INTERVAL = 0.5
+REFRESH_INTERVAL = 120
+LOG_LINES = 13
+
+# Puntos como máximo en el gráfico de valor de la cartera
+CHART_POINTS = 300
+
+HOLDINGS_COLUMNS = ["Symbol", "Quantity", "Avg Cost", "Unrealized P&L"]
+
+# Componentes de cada trader que se refrescan cada REFRESH_INTERVAL segundos
+VIEW_COMPONENTS = ("value", "chart", "holdings", "transactions")
+
+LEADERBOARD_COLUMNS = {
+    "name": "Trader",
+    "portfolio_value": "Value",
+    "pnl": "P&L",
+    "positions": "Positions",
+    "last_trade": "Last Trade",
+    "total_return": "Return",
+    "volatility": "Volatility",
+    "sharpe": "Sharpe",
+    "sortino": "Sortino",
+    "max_drawdown": "Max Drawdown",
+    "turnover": "Turnover",
+    "var": "VaR 95%",
+}
+
 
 class TraderViewModel:
     def __init__(self, name: str, lastname: str, model_name: str):
         self.name = name
         self.lastname = lastname
         self.model_name = model_name
-        self.account = Account.get(name)
+        # Las cuentas que el trading floor todavía no ha dado de alta se crean al abrir la UI
+        self.account = Account.open(name)
+        # Lo último que se ha calculado y de qué dependía, para recalcular solo lo que cambia
+        self._view: dict[str, object] = {}
+        self._price_epoch = None
+        self._holdings_version = None
+        self._transactions_version = None
+        self._last_point = None
+        self._last_transaction_id = 0
+        self._transaction_count = 0
+        self._transactions_df = pd.DataFrame(columns=list(Transaction.model_fields))
 
     def reload(self):
         self.account = Account.get(self.name)
@@ -35,7 +88,8 @@ class TraderViewModel:
 
     def get_portfolio_value_df(self) -> pd.DataFrame:
         df = pd.DataFrame(
-            self.account.portfolio_value_time_series, columns=["datetime", "value"]
+            portfolio_series(self.name, max_points=CHART_POINTS),
+            columns=["datetime", "value"],
         )
         df["datetime"] = pd.to_datetime(df["datetime"])
         return df
@@ -60,81 +114,225 @@ class TraderViewModel:
         """Convierte las tenencias a un DataFrame para mostrar"""
         holdings = self.account.get_holdings()
         if not holdings:
-            return pd.DataFrame(columns=["Symbol", "Quantity"])
+            return pd.DataFrame(columns=HOLDINGS_COLUMNS)
 
+        average_cost = self.account.aggregates.average_cost
+        unrealized = self.account.calculate_unrealized_profit_loss()
         df = pd.DataFrame(
             [
-                {"Symbol": symbol, "Quantity": quantity}
+                {
+                    "Symbol": symbol,
+                    "Quantity": quantity,
+                    "Avg Cost": round(average_cost.get(symbol, 0.0), 2),
+                    "Unrealized P&L": round(unrealized[symbol], 2),
+                }
                 for symbol, quantity in holdings.items()
             ]
         )
         return df
 
     def get_transactions_df(self) -> pd.DataFrame:
-        """Convierte las transacciones a un DataFrame para mostrar"""
-        transactions = self.account.list_transactions()
-        if not transactions:
-            return pd.DataFrame(
-                columns=["Timestamp", "Symbol", "Quantity", "Price", "Rationale"]
+        """
+        Devuelve las transacciones recientes para mostrar. Solo se leen las posteriores a la
+        última ya mostrada y se añaden al DataFrame en caché; si la cuenta se ha reseteado
+        se vuelve a construir.
+        """
+        total, rows = read_transactions_since(
+            self.name, self._last_transaction_id, RECENT_TRANSACTIONS
+        )
+        if total != self._transaction_count + len(rows):
+            total, rows = read_transactions_since(self.name, 0, RECENT_TRANSACTIONS)
+            self._transactions_df = self._transactions_df.iloc[0:0]
+        self._transaction_count = total
+        if rows:
+            self._last_transaction_id = rows[0][0]
+            new = pd.DataFrame(
+                [row[1:] for row in rows], columns=list(Transaction.model_fields)
             )
-
-        return pd.DataFrame(transactions)
+            frames = [frame for frame in (new, self._transactions_df) if not frame.empty]
+            self._transactions_df = pd.concat(frames, ignore_index=True).head(
+                RECENT_TRANSACTIONS
+            )
+        return self._transactions_df
 
     def get_portfolio_value(self) -> str:
-        """Calcula el valor total del portafolio basado en los precios actuales"""
-        portfolio_value = self.account.calculate_portfolio_value() or 0.0
-        pnl = self.account.calculate_profit_loss(portfolio_value) or 0.0
+        """Muestra el valor total del portafolio y la ganancia/pérdida de la tabla resumen"""
+        summary = read_account_summary(self.name)
+        if summary is not None:
+            portfolio_value, pnl = summary["portfolio_value"], summary["pnl"]
+        else:
+            # Cuentas que todavía no han operado ni pasado por el refresco de precios
+            portfolio_value, pnl = self.account.valuation()
         color = "green" if pnl >= 0 else "red"
         emoji = "⬆" if pnl >= 0 else "⬇"
         return f"<div style='text-align: center;background-color:{color};'><span style='font-size:32px'>${portfolio_value:,.0f}</span><span style='font-size:24px'>&nbsp;&nbsp;&nbsp;{emoji}&nbsp;${pnl:,.0f}</span></div>"
 
-    def get_logs(self, previous=None) -> str:
-        logs = read_log(self.name, last_n=13)
+    def get_logs(self, logs: list[tuple[str, str, str]]) -> str:
         response = ""
         for log in logs:
             timestamp, type, message = log
             color = mapper.get(type, Color.WHITE).value
             response += f"<span style='color:{color}'>{timestamp} : [{type}] {message}</span><br/>"
-        response = f"<div style='height:250px; overflow-y:auto;'>{response}</div>"
-        if response != previous:
-            return response
-        return gr.update()  # type: ignore
+        return f"<div style='height:250px; overflow-y:auto;'>{response}</div>"
+
+    @property
+    def view(self) -> dict[str, object]:
+        """El último valor calculado de cada componente"""
+        return self._view
+
+    def get_view(self) -> dict[str, object]:
+        """
+        Recalcula solo los componentes cuyas dependencias han cambiado desde la última llamada
+        y devuelve únicamente los que tienen un valor distinto:
+        - la cuenta solo se vuelve a leer si ha cambiado su versión;
+        - el valor, leído del resumen en cada refresco;
+        - las tenencias, si cambia la cuenta o el instante de los precios;
+        - las transacciones, si hay transacciones nuevas;
+        - el gráfico, si hay puntos nuevos en la serie de valor.
+        """
+        version = read_account_version(self.name)
+        if version != self.account.version:
+            self.reload()
+        epoch = get_price_epoch()
+        values: dict[str, object] = {}
+        if epoch != self._price_epoch or self.account.version != self._holdings_version:
+            self._price_epoch, self._holdings_version = epoch, self.account.version
+            values["holdings"] = self.get_holdings_df()
+        values["value"] = self.get_portfolio_value()
+        if self.account.version != self._transactions_version:
+            self._transactions_version = self.account.version
+            values["transactions"] = self.get_transactions_df()
+        last_point = read_last_portfolio_value(self.name)
+        if last_point != self._last_point or "chart" not in self._view:
+            self._last_point = last_point
+            values["chart"] = self.get_portfolio_value_chart()
+
+        changes = {}
+        for key, value in values.items():
+            previous = self._view.get(key)
+            if isinstance(value, pd.DataFrame):
+                unchanged = isinstance(previous, pd.DataFrame) and previous.equals(value)
+            else:
+                # El gráfico solo se recalcula cuando hay puntos nuevos
+                unchanged = key != "chart" and previous == value
+            if not unchanged:
+                self._view[key] = changes[key] = value
+        return changes
+
+
+class Dashboard:
+    """
+    Refresco único del panel, compartido por todos los navegadores conectados.
+
+    Un hilo en segundo plano lee los registros de todos los traders cada LOG_INTERVAL segundos
+    y el resto del panel cada REFRESH_INTERVAL, y guarda el resultado en memoria con un número
+    de versión. Los temporizadores de cada navegador solo consultan esta memoria y reciben
+    únicamente lo que ha cambiado desde la versión que ya tienen, así que la carga sobre la
+    base de datos depende del número de traders y no del número de espectadores.
+    """
+
+    def __init__(self, traders: list[TraderViewModel]):
+        self.traders = traders
+        # (trader, componente) -> (versión, valor)
+        self.components: dict[tuple[str, str], tuple[int, object]] = {}
+        self.leaderboard: tuple[int, pd.DataFrame] = (0, pd.DataFrame())
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        """Carga el panel una primera vez y lanza el hilo de refresco, solo una vez por proceso."""
+        if self._thread is not None:
+            return
+        self.poll_logs()
+        self.refresh()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        next_refresh = time.monotonic() + REFRESH_INTERVAL
+        while True:
+            time.sleep(LOG_INTERVAL)
+            try:
+                self.poll_logs()
+                if time.monotonic() >= next_refresh:
+                    next_refresh = time.monotonic() + REFRESH_INTERVAL
+                    self.refresh()
+            except Exception as e:
+                print(f"Error refreshing dashboard: {e}")
+
+    def _publish(self, name: str, key: str, value):
+        version, _ = self.components.get((name, key), (0, None))
+        self.components[(name, key)] = (version + 1, value)
+
+    def poll_logs(self):
+        logs = read_logs([trader.name for trader in self.traders], last_n=LOG_LINES)
+        for trader in self.traders:
+            html = trader.get_logs(logs[trader.name])
+            _, previous = self.components.get((trader.name, "logs"), (0, None))
+            if html != previous:
+                self._publish(trader.name, "logs", html)
+
+    def refresh(self):
+        for trader in self.traders:
+            changes = trader.get_view()
+            for key in VIEW_COMPONENTS:
+                if key in changes or (trader.name, key) not in self.components:
+                    self._publish(trader.name, key, trader.view[key])
+        self.leaderboard = (self.leaderboard[0] + 1, get_leaderboard_df())
+
+    def changes(self, name: str, seen: dict[str, int]) -> tuple[dict[str, int], dict[str, object]]:
+        """
+        Devuelve las versiones actuales de los componentes del trader y el valor de los que
+        el cliente todavía no tiene.
+
+        Args:
+            name: El trader
+            seen: Las versiones de cada componente que ya tiene el cliente
+        """
+        current, values = {}, {}
+        for key in ("logs", *VIEW_COMPONENTS):
+            version, value = self.components[(name, key)]
+            current[key] = version
+            if seen.get(key) != version:
+                values[key] = value
+        return current, values
 
 
 class TraderView:
-    def __init__(self, trader: TraderViewModel):
+    def __init__(self, trader: TraderViewModel, dashboard: Dashboard):
         self.trader = trader
+        self.dashboard = dashboard
         self.portfolio_value = None
         self.chart = None
         self.holdings_table = None
         self.transactions_table = None
 
     def make_ui(self):
+        _, values = self.dashboard.changes(self.trader.name, {})
         with gr.Column():
             gr.HTML(self.trader.get_title())
             with gr.Row():
-                self.portfolio_value = gr.HTML(self.trader.get_portfolio_value)
+                self.portfolio_value = gr.HTML(values["value"])
             with gr.Row():
                 self.chart = gr.Plot(
-                    self.trader.get_portfolio_value_chart,
+                    values["chart"],
                     container=True,
                     show_label=False,
                 )
             with gr.Row(variant="panel"):
-                self.log = gr.HTML(self.trader.get_logs)
+                self.log = gr.HTML(values["logs"])
             with gr.Row():
                 self.holdings_table = gr.Dataframe(
-                    value=self.trader.get_holdings_df,
+                    value=values["holdings"],
                     label="Holdings",
-                    headers=["Symbol", "Quantity"],
+                    headers=HOLDINGS_COLUMNS,
                     row_count=(5, "dynamic"),
-                    col_count=2,
+                    col_count=len(HOLDINGS_COLUMNS),
                     max_height=300,
                     elem_classes=["dataframe-fix-small"],
                 )
             with gr.Row():
                 self.transactions_table = gr.Dataframe(
-                    value=self.trader.get_transactions_df,
+                    value=values["transactions"],
                     label="Recent Transactions",
                     headers=["Timestamp", "Symbol", "Quantity", "Price", "Rationale"],
                     row_count=(5, "dynamic"),
@@ -143,11 +341,15 @@ class TraderView:
                     elem_classes=["dataframe-fix"],
                 )
 
-        timer = gr.Timer(value=120)
+        # Versiones que ya tiene este navegador; cada sesión tiene su propia copia
+        seen = gr.State({})
+        timer = gr.Timer(value=LOG_INTERVAL)
         timer.tick(
             fn=self.refresh,
-            inputs=[],
+            inputs=[seen],
             outputs=[
+                seen,
+                self.log,
                 self.portfolio_value,
                 self.chart,
                 self.holdings_table,
@@ -156,25 +358,27 @@ class TraderView:
             show_progress="hidden",
             queue=False,
         )
-        log_timer = gr.Timer(value=0.5)
-        log_timer.tick(
-            fn=self.trader.get_logs,
-            inputs=[self.log],
-            outputs=[self.log],
-            show_progress="hidden",
-            queue=False,
-        )
 
-    def refresh(self):
-        self.trader.reload()
+    def refresh(self, seen: dict[str, int]):
+        """Lee de la memoria del refresco compartido y solo envía los componentes que han cambiado"""
+        current, values = self.dashboard.changes(self.trader.name, seen)
         return (
-            self.trader.get_portfolio_value(),
-            self.trader.get_portfolio_value_chart(),
-            self.trader.get_holdings_df(),
-            self.trader.get_transactions_df(),
+            current,
+            *(values.get(key, gr.update()) for key in ("logs", *VIEW_COMPONENTS)),
         )
 
 
+def get_leaderboard_df() -> pd.DataFrame:
+    """Clasificación de los traders por ratio de Sharpe con el resto de métricas de riesgo"""
+    summaries = {row["name"]: row for row in read_account_summaries()}
+    rows = [
+        {**summaries.get(row["name"].lower(), {}), **row}
+        for row in leaderboard(names, sort_by="sharpe")
+    ]
+    df = pd.DataFrame(rows, columns=list(LEADERBOARD_COLUMNS))
+    return df.rename(columns=LEADERBOARD_COLUMNS)
+
+
 # Main UI construction
 def create_ui():
     """Crea la interfaz principal de Gradio para la simulación de trading"""
@@ -185,7 +389,9 @@ def create_ui():
             names, lastnames, short_model_names
         )
     ]
-    trader_views = [TraderView(trader) for trader in traders]
+    dashboard = Dashboard(traders)
+    dashboard.start()
+    trader_views = [TraderView(trader, dashboard) for trader in traders]
 
     with gr.Blocks(
         title="Traders",
@@ -197,6 +403,28 @@ def create_ui():
         with gr.Row():
             for trader_view in trader_views:
                 trader_view.make_ui()
+        with gr.Row():
+            leaderboard_table = gr.Dataframe(
+                value=dashboard.leaderboard[1],
+                label="Leaderboard",
+                headers=list(LEADERBOARD_COLUMNS.values()),
+                col_count=len(LEADERBOARD_COLUMNS),
+                elem_classes=["dataframe-fix-small"],
+            )
+        leaderboard_seen = gr.State(0)
+        leaderboard_timer = gr.Timer(value=REFRESH_INTERVAL)
+
+        def refresh_leaderboard(seen: int):
+            version, df = dashboard.leaderboard
+            return version, df if version != seen else gr.update()
+
+        leaderboard_timer.tick(
+            fn=refresh_leaderboard,
+            inputs=[leaderboard_seen],
+            outputs=[leaderboard_seen, leaderboard_table],
+            show_progress="hidden",
+            queue=False,
+        )
 
     return ui
 
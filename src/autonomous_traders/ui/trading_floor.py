@@ -5,7 +5,12 @@ from typing import List
 from agents import add_trace_processor
 from dotenv import load_dotenv
 
+from autonomous_traders.core.accounts import Account
+from autonomous_traders.core.maintenance import run_maintenance
 from autonomous_traders.core.market import is_market_open
+from autonomous_traders.core.orderbook import evaluate_orders, recover_orders
+from autonomous_traders.core.recorder import record_portfolio_values
+from autonomous_traders.data.async_database import run_write
 from autonomous_traders.utils.tracers import LogTracer
 from autonomous_traders.core.traders import Trader
 
@@ -48,11 +53,20 @@ def create_traders() -> List[Trader]:
 async def run_every_n_minutes():
     add_trace_processor(LogTracer())
     traders = create_traders()
+    # Las cuentas se dan de alta antes de que el tracer escriba en sus registros
+    for name in names:
+        await run_write(Account.open, name)
+    # Órdenes que una ejecución anterior dejó reservadas al interrumpirse
+    await run_write(recover_orders)
     while True:
         if RUN_EVEN_WHEN_MARKET_IS_CLOSED or is_market_open():
+            await run_write(evaluate_orders)
             await asyncio.gather(*[trader.run() for trader in traders])
+            await run_write(record_portfolio_values, names)
         else:
             print("El mercado está cerrado, no lo vamos a ejecutar.")
+        # Retención de registros y compactación, como mucho una vez por intervalo
+        await run_write(run_maintenance)
         await asyncio.sleep(RUN_EVERY_N_MINUTES * 60)
 
 
@@ -5,13 +5,23 @@ from agents import FunctionTool
 from mcp import StdioServerParameters
 from mcp.client.stdio import stdio_client
 
-params = StdioServerParameters(
-    command="uv", args=["run", "-m", "autonomous_traders.api.accounts_server"], env=None
-)
+from autonomous_traders.data.database import data_dir
+
+
+def server_params() -> StdioServerParameters:
+    """
+    Los parámetros del servidor de cuentas, creados en cada llamada con la carpeta de datos
+    actual (p. ej., la de una reproducción): el cliente MCP no pasa el entorno completo.
+    """
+    return StdioServerParameters(
+        command="uv",
+        args=["run", "-m", "autonomous_traders.api.accounts_server"],
+        env={"TRADERS_DATA_DIR": data_dir()},
+    )
 
 
 async def list_accounts_tools():
-    async with stdio_client(params) as streams:
+    async with stdio_client(server_params()) as streams:
         async with mcp.ClientSession(*streams) as session:
             await session.initialize()
             tools_result = await session.list_tools()
@@ -19,7 +29,7 @@ async def list_accounts_tools():
 
 
 async def call_accounts_tool(tool_name, tool_args):
-    async with stdio_client(params) as streams:
+    async with stdio_client(server_params()) as streams:
         async with mcp.ClientSession(*streams) as session:
             await session.initialize()
             result = await session.call_tool(tool_name, tool_args)
@@ -27,7 +37,7 @@ async def call_accounts_tool(tool_name, tool_args):
 
 
 async def read_accounts_resource(name):
-    async with stdio_client(params) as streams:
+    async with stdio_client(server_params()) as streams:
         async with mcp.ClientSession(*streams) as session:
             await session.initialize()
             result = await session.read_resource(f"accounts://accounts_server/{name}")  # type: ignore
@@ -35,7 +45,7 @@ async def read_accounts_resource(name):
 
 
 async def read_strategy_resource(name):
-    async with stdio_client(params) as streams:
+    async with stdio_client(server_params()) as streams:
         async with mcp.ClientSession(*streams) as session:
             await session.initialize()
             result = await session.read_resource(f"accounts://strategy/{name}")  # type: ignore
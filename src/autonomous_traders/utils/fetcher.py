@@ -0,0 +1,181 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv(override=True)
+
+# Caché en disco compartida por todos los procesos de los investigadores
+FETCH_CACHE_DIR = os.getenv("FETCH_CACHE_DIR", "fetch_cache")
+# Durante este tiempo una página cacheada se sirve sin preguntar al servidor; después se
+# revalida con If-None-Match / If-Modified-Since
+FETCH_TTL_SECONDS = float(os.getenv("FETCH_TTL_SECONDS", "900"))
+TIMEOUT_SECONDS = 20.0
+MEMORY_ENTRIES = 256
+USER_AGENT = "Mozilla/5.0 (compatible; AutonomousTraders/0.1)"
+
+# Etiquetas cuyo contenido no forma parte del texto legible de la página
+SKIP_TAGS = ["script", "style", "noscript", "template", "svg", "nav", "footer", "header", "aside", "form"]
+
+
+def extract_text(html: str) -> str:
+    """Extrae el texto legible de una página HTML: título y bloques de contenido, sin navegación."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "lxml")
+    for tag in soup(SKIP_TAGS):
+        tag.decompose()
+    root = soup.find("article") or soup.find("main") or soup.body or soup
+    lines = [line.strip() for line in root.get_text("\n").splitlines()]
+    text = "\n".join(line for line in lines if line)
+    title = soup.title.get_text(strip=True) if soup.title else ""
+    return f"# {title}\n\n{text}" if title else text
+
+
+class PageCache:
+    """
+    Caché HTTP de páginas web con el texto legible ya extraído.
+
+    Las entradas se guardan en disco (un fichero JSON por URL) y las más recientes también en
+    memoria. Dentro del TTL se sirven sin red; pasado el TTL se revalidan con ETag y
+    Last-Modified, y un 304 solo renueva la entrada. Las peticiones simultáneas a la misma URL
+    comparten una única descarga, y todas usan el mismo cliente HTTP con conexiones reutilizadas.
+    """
+
+    def __init__(
+        self,
+        directory: str = FETCH_CACHE_DIR,
+        ttl: float = FETCH_TTL_SECONDS,
+        timeout: float = TIMEOUT_SECONDS,
+        memory_entries: int = MEMORY_ENTRIES,
+    ):
+        self.directory = directory
+        self.ttl = ttl
+        self.timeout = timeout
+        self.memory_entries = memory_entries
+        self._memory: OrderedDict[str, dict] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                headers={"User-Agent": USER_AGENT},
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+        return self._client
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def _load(self, url: str) -> dict | None:
+        if url in self._memory:
+            self._memory.move_to_end(url)
+            return self._memory[url]
+        try:
+            with open(self._path(url)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._remember(url, entry)
+        return entry
+
+    def _store(self, url: str, entry: dict) -> None:
+        self._remember(url, entry)
+        os.makedirs(self.directory, exist_ok=True)
+        # Se escribe aparte y se renombra para que otro proceso nunca lea un fichero a medias
+        path = self._path(url)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(entry, f)
+        os.replace(temporary, path)
+
+    def _remember(self, url: str, entry: dict) -> None:
+        self._memory[url] = entry
+        self._memory.move_to_end(url)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, url: str) -> dict:
+        """
+        Devuelve la entrada de la URL: url, status, content_type, body (el contenido original),
+        text (el texto legible) y fetched_at.
+        """
+        entry = self._load(url)
+        if entry and time.time() - entry["fetched_at"] < self.ttl:
+            return entry
+        # Quien llega mientras otro descarga la misma URL espera a esa misma descarga
+        if url in self._in_flight:
+            return await asyncio.shield(self._in_flight[url])
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[url] = future
+        try:
+            entry = await self._fetch(url, entry)
+            future.set_result(entry)
+            return entry
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Se marca como recuperada para no avisar de excepciones que nadie más espera
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[url]
+
+    async def _fetch(self, url: str, cached: dict | None) -> dict:
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        try:
+            response = await self.client.get(url, headers=headers)
+        except httpx.HTTPError:
+            # Sin red es mejor una copia caducada que nada
+            if cached:
+                return cached
+            raise
+        if response.status_code == 304 and cached:
+            entry = {**cached, "fetched_at": time.time()}
+            self._store(url, entry)
+            return entry
+        if response.is_error and cached:
+            return cached
+
+        content_type = response.headers.get("content-type", "")
+        body = response.text
+        # El texto se extrae una sola vez al descargar y se guarda con la página; se hace en
+        # un hilo para no detener las demás peticiones mientras se analiza el HTML
+        if "html" in content_type or not content_type:
+            text = await asyncio.to_thread(extract_text, body)
+        else:
+            text = body
+        entry = {
+            "url": url,
+            "status": response.status_code,
+            "content_type": content_type,
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "body": body,
+            "text": text,
+            "fetched_at": time.time(),
+        }
+        if not response.is_error:
+            self._store(url, entry)
+        return entry
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
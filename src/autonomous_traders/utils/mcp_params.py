@@ -1,12 +1,16 @@
 import os
 
 from dotenv import load_dotenv
+from autonomous_traders.api.gateway_server import prefixed
 from autonomous_traders.core.market import is_paid_polygon, is_realtime_polygon
+from autonomous_traders.data.database import data_dir
 
 load_dotenv(override=True)
 
 brave_env = {"BRAVE_API_KEY": os.getenv("BRAVE_API_KEY")}
 polygon_api_key = os.getenv("POLYGON_API_KEY")
+# Alojar todos los servidores locales en un único proceso en lugar de uno por servidor
+use_mcp_gateway = os.getenv("MCP_GATEWAY", "false").strip().lower() == "true"
 
 # El servidor MCP para que el Trader lea datos de mercado
 
@@ -24,29 +28,64 @@ else:
     market_mcp = {"command": "uv", "args": ["run", "-m", "autonomous_traders.api.market_server"]}
 
 
+# Los servidores locales que aloja la pasarela, cada uno con sus herramientas en su espacio de
+# nombres (accounts_, push_, analysis_, market_); el mercado de Polygon sigue siendo externo
+gateway_namespaces = ["accounts", "push", "analysis"]
+if not (is_paid_polygon or is_realtime_polygon):
+    gateway_namespaces.append("market")
+
+
+def tool_name(namespace: str, tool: str) -> str:
+    """El nombre con el que el trader ve una herramienta de un servidor local."""
+    if use_mcp_gateway and namespace in gateway_namespaces:
+        return prefixed(namespace, tool)
+    return tool
+
+
 # El conjunto completo de servidores MCP para el trader: Cuentas, Notificaciones Push y Mercado
 
-trader_mcp_server_params = [
-    {"command": "uv", "args": ["run", "-m", "autonomous_traders.api.accounts_server"]},
-    {"command": "uv", "args": ["run", "-m", "autonomous_traders.api.push_server"]},
-    {"command": "uv", "args": ["run", "-m", "autonomous_traders.api.financial_analysis_server"]},
-    market_mcp,
-]
+if use_mcp_gateway:
+    # Un solo proceso con las herramientas de todos los servidores locales
+    trader_mcp_server_params = [
+        {
+            "command": "uv",
+            "args": ["run", "-m", "autonomous_traders.api.gateway_server", *gateway_namespaces],
+        }
+    ]
+    if is_paid_polygon or is_realtime_polygon:
+        trader_mcp_server_params.append(market_mcp)
+else:
+    trader_mcp_server_params = [
+        {"command": "uv", "args": ["run", "-m", "autonomous_traders.api.accounts_server"]},
+        {"command": "uv", "args": ["run", "-m", "autonomous_traders.api.push_server"]},
+        {"command": "uv", "args": ["run", "-m", "autonomous_traders.api.financial_analysis_server"]},
+        market_mcp,
+    ]
+
+# Los servidores locales trabajan en la misma carpeta de datos que quien los lanza (p. ej., una
+# reproducción histórica); el cliente MCP no les pasa el entorno completo
+if data_dir():
+    for params in trader_mcp_server_params:
+        if params["command"] == "uv":
+            params["env"] = {"TRADERS_DATA_DIR": data_dir()}
 
 # El conjunto completo de servidores MCP para el investigador: Fetch, Brave Search y Memoria
 
 
 def researcher_mcp_server_params(name: str):
     return [
-        {"command": "uvx", "args": ["mcp-server-fetch"]},
+        # Servidor de fetch propio con caché en disco compartida entre traders
+        {"command": "uv", "args": ["run", "-m", "autonomous_traders.api.fetch_server"]},
         {
             "command": "npx",
             "args": ["-y", "@modelcontextprotocol/server-brave-search"],
             "env": brave_env,
         },
+        # Grafo de conocimiento propio en SQLite, con el espacio de nombres de cada trader; la
+        # primera vez importa lo que guardaba mcp-memory-libsql en memory/<name>.db
         {
-            "command": "npx",
-            "args": ["-y", "mcp-memory-libsql"],
-            "env": {"LIBSQL_URL": f"file:./memory/{name}.db"},
+            "command": "uv",
+            "args": ["run", "-m", "autonomous_traders.api.memory_server", name],
+            "env": {"TRADERS_DATA_DIR": data_dir()},
         },
     ]
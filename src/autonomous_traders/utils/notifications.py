@@ -0,0 +1,158 @@
+import asyncio
+import atexit
+import os
+import threading
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv(override=True)
+
+pushover_user = os.getenv("PUSHOVER_USER")
+pushover_token = os.getenv("PUSHOVER_TOKEN")
+# Se puede apuntar a un servidor local (scripts/push_stub.py) para probar sin enviar nada
+pushover_url = os.getenv("PUSHOVER_URL", "https://api.pushover.net/1/messages.json")
+
+# Los mensajes a un mismo destinatario dentro de esta ventana se envían juntos en un resumen
+COALESCE_SECONDS = float(os.getenv("PUSH_COALESCE_SECONDS", "5"))
+TIMEOUT_SECONDS = 10.0
+MAX_ATTEMPTS = 4
+BACKOFF_SECONDS = 0.5
+# Pushover no admite mensajes de más de 1024 caracteres
+MAX_MESSAGE_LENGTH = 1024
+
+
+class NotificationQueue:
+    """
+    Cola asíncrona de notificaciones push salientes.
+
+    Los mensajes de cada destinatario se acumulan durante `window` segundos y se envían en un
+    único resumen, con un cliente HTTP compartido, tiempo de espera y reintentos con espera
+    exponencial ante errores de red, 429 y 5xx. Quien encola nunca espera a la red.
+    """
+
+    def __init__(
+        self,
+        url: str = pushover_url,
+        token: str | None = pushover_token,
+        window: float = COALESCE_SECONDS,
+        timeout: float = TIMEOUT_SECONDS,
+        max_attempts: int = MAX_ATTEMPTS,
+        backoff: float = BACKOFF_SECONDS,
+    ):
+        self.url = url
+        self.token = token
+        self.window = window
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._pending: dict[str, list[str]] = {}
+        self._flushes: dict[str, asyncio.Task] = {}
+        self._waiting: set[str] = set()
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+            )
+        return self._client
+
+    async def enqueue(self, message: str, recipient: str | None = None) -> None:
+        recipient = recipient or pushover_user or ""
+        self._pending.setdefault(recipient, []).append(message)
+        if recipient not in self._flushes:
+            self._flushes[recipient] = asyncio.create_task(self._flush_later(recipient))
+
+    async def _flush_later(self, recipient: str) -> None:
+        self._waiting.add(recipient)
+        try:
+            await asyncio.sleep(self.window)
+        except asyncio.CancelledError:
+            pass  # drain(): se envía sin esperar al final de la ventana
+        self._waiting.discard(recipient)
+        messages = self._pending.pop(recipient, [])
+        try:
+            if messages:
+                await self.send(recipient, self.digest(messages))
+        finally:
+            del self._flushes[recipient]
+            # Lo que ha llegado durante el envío abre una nueva ventana
+            if recipient in self._pending:
+                self._flushes[recipient] = asyncio.create_task(
+                    self._flush_later(recipient)
+                )
+
+    @staticmethod
+    def digest(messages: list[str]) -> str:
+        if len(messages) == 1:
+            return messages[0][:MAX_MESSAGE_LENGTH]
+        text = f"{len(messages)} avisos:\n" + "\n".join(f"- {message}" for message in messages)
+        return text[:MAX_MESSAGE_LENGTH]
+
+    async def send(self, recipient: str, message: str) -> bool:
+        """Envía un mensaje con reintentos; devuelve False si se agotan los intentos."""
+        payload = {"user": recipient, "token": self.token, "message": message}
+        for attempt in range(self.max_attempts):
+            try:
+                response = await self.client.post(self.url, data=payload)
+                if response.status_code < 500 and response.status_code != 429:
+                    if response.is_error:
+                        print(f"Push rejected ({response.status_code}): {response.text}")
+                    return not response.is_error
+            except httpx.HTTPError as e:
+                print(f"Push attempt {attempt + 1} failed: {e}")
+            if attempt < self.max_attempts - 1:
+                await asyncio.sleep(self.backoff * 2**attempt)
+        print(f"Push dropped after {self.max_attempts} attempts: {message}")
+        return False
+
+    async def drain(self) -> None:
+        """Envía ya todo lo pendiente sin esperar al final de las ventanas."""
+        while self._flushes:
+            for recipient in list(self._waiting):
+                self._flushes[recipient].cancel()
+            await asyncio.gather(*list(self._flushes.values()), return_exceptions=True)
+
+    async def aclose(self) -> None:
+        await self.drain()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# La cola vive en un bucle de eventos propio en un hilo en segundo plano, de modo que se
+# puede usar igual desde código síncrono y desde los manejadores asíncronos de MCP
+_loop: asyncio.AbstractEventLoop | None = None
+_queue: NotificationQueue | None = None
+_lock = threading.Lock()
+
+
+def get_queue() -> tuple[asyncio.AbstractEventLoop, NotificationQueue]:
+    global _loop, _queue
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, daemon=True).start()
+            _queue = NotificationQueue()
+            atexit.register(flush)
+    return _loop, _queue  # type: ignore
+
+
+def push(message: str, recipient: str | None = None) -> None:
+    """Encola una notificación push y vuelve de inmediato."""
+    print(f"Push: {message}")
+    loop, queue = get_queue()
+    asyncio.run_coroutine_threadsafe(queue.enqueue(message, recipient), loop)
+
+
+def flush(timeout: float = TIMEOUT_SECONDS * MAX_ATTEMPTS) -> None:
+    """Envía lo pendiente y espera a que termine, p. ej. antes de salir del proceso."""
+    if _loop is None or _queue is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(_queue.drain(), _loop).result(timeout)
+    except Exception as e:
+        print(f"Error flushing push notifications: {e}")
@@ -1,13 +1,13 @@
-from datetime import datetime
-
+from autonomous_traders.core import clock
 from autonomous_traders.core.market import is_paid_polygon, is_realtime_polygon
+from autonomous_traders.utils.mcp_params import tool_name
 
 if is_realtime_polygon:
     note = "Tienes acceso a herramientas de datos de mercado en tiempo real; utiliza tu herramienta get_last_trade para obtener el precio de la última transacción. También puedes usar herramientas para información de acciones, tendencias, indicadores técnicos y fundamentales."
 elif is_paid_polygon:
     note = "Tienes acceso a herramientas de datos de mercado pero sin acceso a las herramientas de transacciones o cotizaciones; utiliza tu herramienta get_snapshot_ticker para obtener el precio más reciente de la acción con un retraso de 15 minutos. También puedes usar herramientas para información de acciones, tendencias, indicadores técnicos y fundamentales."
 else:
-    note = "Tienes acceso a datos de mercado de fin de día; utiliza tu herramienta get_share_price para obtener el precio de la acción al cierre anterior."
+    note = f"Tienes acceso a datos de mercado de fin de día; utiliza tu herramienta `{tool_name('market', 'lookup_share_price')}` para obtener el precio de la acción al cierre anterior, y tu herramienta `{tool_name('market', 'screen_market')}` para filtrar y ordenar todo el mercado (mayores ganadores o perdedores, momentum, picos de volumen) en una sola llamada."
 
 
 def researcher_instructions():
@@ -25,7 +25,7 @@ def researcher_instructions():
         Aprovecha tu grafo de conocimiento para construir tu experiencia con el tiempo.
 
         Si no hay una solicitud específica, simplemente responde con oportunidades de inversión basadas en la búsqueda de las últimas noticias.
-        La fecha y hora actual es {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        La fecha y hora actual es {clock.timestamp()}
         """
 
 
@@ -42,10 +42,12 @@ def trader_instructions(name: str):
         Gestionas activamente tu portafolio de acuerdo a tu estrategia.
         Tienes acceso a herramientas, incluyendo un investigador, para buscar en línea noticias y oportunidades según tu solicitud.
         También tienes un conjunto avanzado de herramientas de análisis financiero para tomar decisiones más informadas. {note} Estas incluyen:
-        - **Análisis Fundamental:** Usa `get_fundamental_data` para obtener métricas clave de una empresa (como P/E ratio, capitalización de mercado, etc.). Ideal para estrategias de inversión en valor.
-        - **Análisis Técnico:** Usa `get_technical_indicators` para calcular indicadores como 'SMA_50' (Media Móvil Simple de 50 días), 'RSI_14' (Índice de Fuerza Relativa), o 'MACD'. Perfecto para identificar tendencias y momentum.
-        - **Análisis de Sentimiento:** Usa `get_news_sentiment` para medir el sentimiento del mercado ('Positivo', 'Negativo', 'Neutral') basado en las últimas noticias.
-        Y tienes herramientas para comprar y vender acciones usando el nombre de tu cuenta {name}.
+        - **Análisis Fundamental:** Usa `{tool_name('analysis', 'get_fundamental_data')}` para obtener métricas clave de una empresa (como P/E ratio, capitalización de mercado, etc.). Ideal para estrategias de inversión en valor.
+        - **Análisis Técnico:** Usa `{tool_name('analysis', 'get_technical_indicators')}` para calcular indicadores como 'SMA_50' (Media Móvil Simple de 50 días), 'RSI_14' (Índice de Fuerza Relativa), o 'MACD'. Perfecto para identificar tendencias y momentum.
+        - **Análisis de Sentimiento:** Usa `{tool_name('analysis', 'get_news_sentiment')}` para medir el sentimiento del mercado ('Positivo', 'Negativo', 'Neutral') basado en las últimas noticias.
+        Y tienes herramientas para comprar y vender acciones usando el nombre de tu cuenta {name}; cuando tengas que hacer varias operaciones (por ejemplo, al rebalancear) usa `{tool_name('accounts', 'execute_orders')}` para ejecutarlas todas en un solo lote.
+        Si quieres operar a un nivel de precio concreto, deja una orden pendiente con `{tool_name('accounts', 'place_order')}` (limit, stop o stop_limit) en lugar de consultar el precio repetidamente.
+        Consulta `{tool_name('accounts', 'get_risk_metrics')}` para conocer la volatilidad, el drawdown y el VaR de tu cartera antes de asumir más riesgo.
         Puedes usar tus herramientas de entidades como una memoria persistente para almacenar y recuperar información; compartes
         esta memoria con otros traders y puedes beneficiarte del conocimiento del grupo.
         Utiliza estas herramientas para investigar, tomar decisiones y ejecutar operaciones.
@@ -68,7 +70,7 @@ def trade_message(name, strategy, account):
         Aquí está tu cuenta actual:
         {account}
         La fecha y hora actual es:
-        {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        {clock.timestamp()}
         Ahora, realiza el análisis, toma tu decisión y ejecuta las operaciones. El nombre de tu cuenta es {name}.
         Después de ejecutar tus operaciones, envía una notificación push con un breve resumen de las operaciones y el estado de tu portafolio, luego
         responde con una breve valoración de 2-3 frases sobre tu portafolio y sus perspectivas.
@@ -88,7 +90,7 @@ def rebalance_message(name, strategy, account):
             Aquí está tu cuenta actual:
             {account}
             La fecha y hora actual es:
-            {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+            {clock.timestamp()}
             Ahora, realiza el análisis, toma tu decisión y ejecuta las operaciones. El nombre de tu cuenta es {name}.
             Después de ejecutar tus operaciones, envía una notificación push con un breve resumen de las operaciones y el estado de tu portafolio, luego
             responde con una breve valoración de 2-3 frases sobre tu portafolio y sus perspectivas."""
@@ -1,4 +1,5 @@
 from agents import TracingProcessor, Trace, Span
+from autonomous_traders.data.async_database import submit_write
 from autonomous_traders.data.database import write_log
 import secrets
 import string
@@ -18,6 +19,11 @@ def make_trace_id(tag: str) -> str:
 
 
 class LogTracer(TracingProcessor):
+    """
+    Guarda el inicio y el final de cada traza y span en los registros del trader. Las llamadas
+    llegan desde el bucle de eventos de los agentes, así que las escrituras se encolan en el
+    hilo escritor en lugar de esperar a SQLite.
+    """
 
     def get_name(self, trace_or_span: Trace | Span) -> str | None:
         trace_id = trace_or_span.trace_id
@@ -30,12 +36,12 @@ class LogTracer(TracingProcessor):
     def on_trace_start(self, trace) -> None:
         name = self.get_name(trace)
         if name:
-            write_log(name, "trace", f"Started: {trace.name}")
+            submit_write(write_log, name, "trace", f"Started: {trace.name}")
 
     def on_trace_end(self, trace) -> None:
         name = self.get_name(trace)
         if name:
-            write_log(name, "trace", f"Ended: {trace.name}")
+            submit_write(write_log, name, "trace", f"Ended: {trace.name}")
 
     def on_span_start(self, span) -> None:
         name = self.get_name(span)
@@ -51,7 +57,7 @@ class LogTracer(TracingProcessor):
                     message += f" {span.span_data.server}"
             if span.error:
                 message += f" {span.error}"
-            write_log(name, type, message)
+            submit_write(write_log, name, type, message)
 
     def on_span_end(self, span) -> None:
         name = self.get_name(span)
@@ -68,7 +74,7 @@ class LogTracer(TracingProcessor):
                     message += f" {span.span_data.server}"
             if span.error:
                 message += f" {span.error}"
-            write_log(name, type, message)
+            submit_write(write_log, name, type, message)
 
     def force_flush(self) -> None:
         pass
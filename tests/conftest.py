@@ -0,0 +1,16 @@
+import pytest
+
+from autonomous_traders.core import clock
+from autonomous_traders.data import database
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Una carpeta de trabajo vacía, con sus propias bases de datos, para cada prueba."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("TRADERS_DATA_DIR", "")
+    # Las rutas son relativas a la carpeta de trabajo, que cambia en cada prueba
+    monkeypatch.setattr(database, "_initialized", set())
+    yield tmp_path
+    database.use_data_dir("")
+    clock.refresh()
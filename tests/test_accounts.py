@@ -0,0 +1,261 @@
+import json
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from autonomous_traders.core import accounts
+from autonomous_traders.core.accounts import Account, ConcurrentModificationError
+from autonomous_traders.data import database
+from autonomous_traders.data.database import (
+    UnknownAccountError,
+    apply_trades,
+    create_account,
+    read_account,
+    shard_exists,
+    update_strategy,
+)
+
+
+@pytest.fixture
+def prices(data_dir, monkeypatch):
+    prices = {"AAPL": 100.0, "MSFT": 200.0}
+    monkeypatch.setattr(accounts, "get_share_prices", lambda symbols: {s: prices[s] for s in symbols})
+    Account.open("amy")
+    return prices
+
+
+def test_trade_retries_after_a_concurrent_write(prices):
+    account = Account.get("amy")
+    # Otro proceso cambia la cuenta después de que esta instancia la haya leído
+    other = Account.get("amy")
+    other.buy_shares("MSFT", 5, "otro proceso")
+    assert account.version < other.version
+
+    account.buy_shares("AAPL", 10, "prueba")
+
+    state = read_account("amy")
+    assert state["holdings"] == {"AAPL": 10, "MSFT": 5}
+    assert account.holdings == state["holdings"]
+    assert account.balance == pytest.approx(state["balance"])
+    assert account.version == state["version"]
+    assert [t.symbol for t in account.transactions] == ["MSFT", "AAPL"]
+
+
+def test_update_gives_up_after_max_retries(prices, monkeypatch):
+    account = Account.get("amy")
+    attempts = []
+
+    def conflicting(account):
+        attempts.append(account.version)
+        # Cada intento pierde la carrera frente a otra escritura
+        update_strategy("amy", f"otra {len(attempts)}", "2024-01-01 00:00:00")
+        account._written(update_strategy("amy", "mía", "2024-01-01 00:00:00", account.version))
+
+    with pytest.raises(ConcurrentModificationError):
+        account.update(conflicting)
+    assert len(attempts) == accounts.MAX_RETRIES
+    assert read_account("amy")["strategy"] == f"otra {accounts.MAX_RETRIES}"
+
+
+def test_change_strategy_keeps_the_version_in_step(prices):
+    account = Account.get("amy")
+    Account.get("amy").change_strategy("de otro proceso")
+    account.change_strategy("nueva")
+    state = read_account("amy")
+    assert state["strategy"] == account.strategy == "nueva"
+    assert state["version"] == account.version
+
+
+def test_cache_checks_the_version_on_one_connection_per_thread(prices, monkeypatch):
+    cache = accounts.AccountCache()
+    account = cache.get("amy")
+    opened = []
+    connect = database.get_db_connection
+    monkeypatch.setattr(
+        database, "get_db_connection", lambda *args, **kwargs: opened.append(args) or connect(*args, **kwargs)
+    )
+    for _ in range(5):
+        assert cache.get("amy") is account
+    assert len(opened) <= 1
+
+    # Una escritura de otro proceso invalida la copia en caché
+    Account.get("amy").change_strategy("otra")
+    assert cache.get("amy").strategy == "otra"
+
+
+def test_cache_keeps_separate_copies_per_thread(prices):
+    from concurrent.futures import ThreadPoolExecutor
+
+    cache = accounts.AccountCache()
+    mine = cache.get("amy")
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        theirs = pool.submit(cache.get, "amy").result()
+        assert theirs is not mine
+        # Una operación en este hilo no toca la copia del otro, que se relee por su versión
+        mine.buy_shares("AAPL", 1, "prueba")
+        assert theirs.holdings == {}
+        refreshed = pool.submit(cache.get, "amy").result()
+        assert refreshed is not theirs and refreshed.holdings == {"AAPL": 1}
+
+        cache.invalidate()
+        assert cache.get("amy") is not mine
+        assert pool.submit(cache.get, "amy").result() is not refreshed
+
+
+def test_invalid_order_leaves_the_batch_unapplied(prices):
+    account = Account.get("amy")
+    account.buy_shares("MSFT", 5, "prueba")
+    before = read_account("amy")
+
+    orders = [
+        accounts.Order(symbol="AAPL", quantity=10, side="buy", rationale="válida"),
+        accounts.Order(symbol="MSFT", quantity=50, side="sell", rationale="sin acciones"),
+    ]
+    with pytest.raises(ValueError):
+        account.execute_orders(orders)
+
+    after = read_account("amy")
+    assert after["balance"] == before["balance"] and after["holdings"] == {"MSFT": 5}
+    assert after["version"] == before["version"]
+    assert account.balance == before["balance"] and account.holdings == {"MSFT": 5}
+    assert len(Account.get("amy").transactions) == 1
+
+
+def test_retry_after_a_conflict_validates_again(prices):
+    Account.get("amy").buy_shares("MSFT", 5, "prueba")
+    account = Account.get("amy")
+    # Otro proceso vende las acciones después de que esta instancia las haya leído
+    Account.get("amy").sell_shares("MSFT", 5, "otro proceso")
+
+    with pytest.raises(ValueError, match="No pueden venderse"):
+        account.sell_shares("MSFT", 5, "prueba")
+
+    state = read_account("amy")
+    assert state["holdings"] == {} and account.holdings == {}
+    assert account.version == state["version"]
+    assert [t.quantity for t in Account.get("amy").transactions] == [5, -5]
+
+
+def test_unrealized_profit_loss_fills_in_missing_prices(prices):
+    account = Account.get("amy")
+    account.execute_orders(
+        [
+            accounts.Order(symbol="AAPL", quantity=1, side="buy", rationale="prueba"),
+            accounts.Order(symbol="MSFT", quantity=1, side="buy", rationale="prueba"),
+        ]
+    )
+    cost = account.aggregates.average_cost
+    # Solo se da el precio de AAPL; el de MSFT se consulta al proveedor
+    unrealized = account.calculate_unrealized_profit_loss({"AAPL": 110.0})
+    assert unrealized["AAPL"] == pytest.approx(110.0 - cost["AAPL"])
+    assert unrealized["MSFT"] == pytest.approx(prices["MSFT"] - cost["MSFT"])
+
+
+def test_valuation_cache_depends_on_the_given_prices(prices):
+    account = Account.get("amy")
+    account.buy_shares("AAPL", 10, "prueba")
+    value, _ = account.valuation()
+    assert account.valuation({"AAPL": 150.0})[0] == pytest.approx(value + 10 * 50.0)
+    assert account.valuation({"AAPL": 90.0})[0] == pytest.approx(value - 10 * 10.0)
+    assert account.valuation()[0] == pytest.approx(value)
+
+
+def minute(i: int) -> str:
+    return (datetime(2024, 1, 2, 9, 30) + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def assert_same_state(account: Account, state: dict):
+    assert account.balance == pytest.approx(state["balance"])
+    assert account.strategy == state["strategy"]
+    assert account.holdings == state["holdings"]
+    assert account.version == state["version"]
+    aggregates = state["aggregates"]
+    assert account.aggregates.net_invested == pytest.approx(aggregates["net_invested"])
+    assert account.aggregates.realized_pnl == pytest.approx(aggregates["realized_pnl"])
+    assert account.aggregates.average_cost == pytest.approx(aggregates["average_cost"])
+
+
+@pytest.fixture
+def ledger(data_dir):
+    """Una cuenta con 250 eventos, uno por minuto, y por tanto con dos instantáneas."""
+    create_account("amy", 10_000.0, minute(0))
+    for i in range(1, 250):
+        if i % 50 == 0:
+            update_strategy("amy", f"estrategia {i}", minute(i))
+        else:
+            symbol = "AAPL" if i % 2 else "MSFT"
+            quantity = -2 if i % 3 == 0 else 3
+            apply_trades("amy", [(symbol, quantity, 10.0 + i % 7, minute(i), "prueba")])
+    with sqlite3.connect(database.shard_path("amy")) as conn:
+        snapshots = conn.execute(
+            "SELECT e.timestamp FROM account_snapshots s "
+            "JOIN account_events e ON e.id = s.event_id ORDER BY s.event_id"
+        ).fetchall()
+        events = [
+            (type, json.loads(payload), version, timestamp)
+            for type, payload, version, timestamp in conn.execute(
+                "SELECT type, payload, version, timestamp FROM account_events ORDER BY id"
+            )
+        ]
+    assert len(snapshots) == 2
+    return [timestamp for timestamp, in snapshots], events
+
+
+def replay(events, until: str = "9999-12-31") -> Account:
+    """Reproduce todos los eventos desde el principio, sin instantáneas."""
+    return Account.from_ledger(
+        "amy",
+        None,
+        [(type, payload, version) for type, payload, version, timestamp in events if timestamp <= until],
+    )
+
+
+def test_snapshot_and_later_events_match_the_account_row(ledger):
+    _, events = ledger
+    state = read_account("amy")
+    assert_same_state(Account.get("amy"), state)
+    assert_same_state(replay(events), state)
+
+
+def test_as_of_across_a_snapshot_boundary(ledger):
+    snapshots, events = ledger
+    boundary = snapshots[0]
+    for until in (minute(98), minute(99), boundary, minute(101), minute(150)):
+        expected = replay(events, until)
+        account = Account.as_of("amy", until)
+        assert account.version == expected.version
+        assert account.balance == pytest.approx(expected.balance)
+        assert account.holdings == expected.holdings
+        assert account.strategy == expected.strategy
+        assert account.aggregates.realized_pnl == pytest.approx(expected.aggregates.realized_pnl)
+
+
+def test_get_does_not_create_accounts(data_dir):
+    with pytest.raises(UnknownAccountError):
+        Account.get("nobody")
+    assert not shard_exists("nobody")
+    assert Account.open("nobody").balance == accounts.INITIAL_BALANCE
+    assert Account.get("nobody").version == read_account("nobody")["version"]
+
+
+def test_get_only_reads_and_open_migrates_legacy_accounts(prices):
+    Account.get("amy").buy_shares("AAPL", 10, "prueba")
+    # Una cuenta guardada antes de los agregados: instantánea y fila sin ellos
+    state = {**read_account("amy"), "aggregates": None}
+    with sqlite3.connect(database.shard_path("amy")) as conn:
+        [event_id] = conn.execute("SELECT MAX(id) FROM account_events").fetchone()
+        conn.execute("UPDATE accounts SET net_invested = NULL, realized_pnl = NULL")
+        conn.execute(
+            "INSERT INTO account_snapshots (name, event_id, state) VALUES (?, ?, ?)",
+            ("amy", event_id, json.dumps(state)),
+        )
+    cost = 10 * prices["AAPL"] * (1 + accounts.SPREAD)
+
+    legacy = Account.get("amy")
+    assert legacy.aggregates.net_invested == pytest.approx(cost)
+    assert read_account("amy")["aggregates"] is None
+    assert read_account("amy")["version"] == state["version"]
+
+    Account.open("amy")
+    assert read_account("amy")["aggregates"]["net_invested"] == pytest.approx(cost)
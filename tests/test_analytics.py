@@ -0,0 +1,26 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from autonomous_traders.core import analytics, clock
+from autonomous_traders.data.database import create_account, write_portfolio_value
+
+
+def test_volatility_is_annualized_over_calendar_days():
+    values = np.array([[100.0, 101.0, 99.0, 102.0]])
+    metrics = analytics.compute_risk_metrics(values, np.array([0.0]))
+    returns = values[0, 1:] / values[0, :-1] - 1
+    assert metrics["volatility"][0] == pytest.approx(np.std(returns, ddof=1) * np.sqrt(365))
+
+
+def test_report_includes_the_whole_first_day(data_dir):
+    clock.set_simulated_time(datetime(2024, 3, 1, 12, 0))
+    create_account("amy", 10_000.0, "2024-02-01 00:00:00")
+    for day, value in (("02-27", 10_000.0), ("02-28", 10_100.0), ("02-29", 10_050.0), ("03-01", 10_200.0)):
+        # El primer punto es anterior a la hora del reloj, pero del primer día del periodo
+        write_portfolio_value("amy", f"2024-{day} 10:00:00", value)
+
+    [row] = analytics.risk_report(["amy"], days=3)
+    assert row["days"] == 4
+    assert row["total_return"] == pytest.approx(0.02)
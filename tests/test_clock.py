@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from autonomous_traders.core import clock
+from autonomous_traders.data import database
+
+
+def test_replay_clock_does_not_reach_the_live_state(data_dir):
+    database.use_data_dir("replay")
+    clock.set_simulated_time(datetime(2024, 1, 2, 10, 0))
+    assert clock.simulated_now() is not None
+    assert (data_dir / "replay" / database.DB).exists()
+
+    database.use_data_dir("")
+    assert clock.refresh() is None
+
+
+def test_clock_is_read_once_per_interval(data_dir, monkeypatch):
+    clock.set_simulated_time(datetime(2024, 1, 2, 10, 0))
+    reads = []
+    monkeypatch.setattr(clock, "read_clock", lambda: reads.append(1) or database.read_clock())
+    monkeypatch.setattr(clock, "REFRESH_SECONDS", 60.0)
+    for _ in range(10):
+        clock.simulated_now()
+    assert reads == []
+    monkeypatch.setattr(clock, "REFRESH_SECONDS", 0.0)
+    clock.simulated_now()
+    assert reads == [1]
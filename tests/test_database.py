@@ -0,0 +1,94 @@
+import sqlite3
+import threading
+
+import pytest
+
+from autonomous_traders.data import database
+from autonomous_traders.data.database import (
+    UnknownAccountError,
+    compact_database,
+    create_account,
+    enable_incremental_vacuum,
+    read_account,
+    read_account_ledger,
+    read_log,
+    read_resting_orders,
+    read_transactions_since,
+    shard_names,
+    write_log,
+)
+
+
+def test_reads_of_unknown_accounts_do_not_create_shards(data_dir):
+    assert read_account("nobody") is None
+    assert read_account_ledger("nobody") == (None, [])
+    assert list(read_log("nobody")) == []
+    assert read_resting_orders("nobody") == []
+    # Se desempaqueta como (total, filas), igual que con una cuenta existente
+    total, rows = read_transactions_since("nobody", 0, 10)
+    assert (total, rows) == (0, [])
+    assert shard_names() == []
+    assert not (data_dir / "accounts").exists()
+
+
+def test_writes_to_unknown_accounts_fail(data_dir):
+    with pytest.raises(UnknownAccountError):
+        write_log("nobody", "trace", "hola")
+    assert shard_names() == []
+
+
+def test_new_shard_creates_accounts_with_every_column(data_dir):
+    create_account("amy", 10_000.0, "2024-01-02 09:30:00")
+    with sqlite3.connect(database.shard_path("amy")) as conn:
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(accounts)")]
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+    assert columns == ["name", "account", "balance", "strategy", "net_invested", "realized_pnl", "version"]
+    assert version == database.SCHEMA_VERSION
+    assert shard_names() == ["amy"]
+
+
+def test_concurrent_first_opens_initialize_once(data_dir, monkeypatch):
+    errors = []
+    barrier = threading.Barrier(8)
+
+    def open_shard():
+        try:
+            barrier.wait()
+            create_account("amy", 10_000.0, "2024-01-02 09:30:00")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=open_shard) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    # Cada proceso tiene su propio conjunto; uno nuevo encuentra el esquema ya preparado
+    monkeypatch.setattr(database, "_initialized", set())
+    assert read_account("amy")["balance"] == 10_000.0
+    assert len(read_account_ledger("amy")[1]) == 1
+
+
+def auto_vacuum(path) -> int:
+    with sqlite3.connect(path) as conn:
+        return conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+
+
+def test_new_databases_start_with_incremental_vacuum(data_dir):
+    create_account("amy", 10_000.0, "2024-01-02 09:30:00")
+    compact_database()
+    assert auto_vacuum(database.shard_path("amy")) == 2
+    assert auto_vacuum(database.DB) == 2
+
+
+def test_scheduled_compaction_does_not_convert_old_databases(data_dir):
+    # Una base de datos compartida de versiones anteriores, sin auto_vacuum
+    with sqlite3.connect(database.DB) as conn:
+        conn.execute("CREATE TABLE market (date TEXT PRIMARY KEY, data TEXT)")
+    compact_database()
+    assert auto_vacuum(database.DB) == 0
+
+    assert enable_incremental_vacuum() is True
+    assert auto_vacuum(database.DB) == 2
+    assert enable_incremental_vacuum() is False
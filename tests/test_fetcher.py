@@ -0,0 +1,94 @@
+import asyncio
+
+import httpx
+
+from autonomous_traders.utils.fetcher import PageCache
+
+URL = "https://example.test/noticias"
+ETAG = '"v1"'
+LAST_MODIFIED = "Tue, 02 Jan 2024 09:30:00 GMT"
+
+
+def page_cache(tmp_path, handler, **kwargs) -> PageCache:
+    cache = PageCache(directory=str(tmp_path / "fetch_cache"), **kwargs)
+    cache._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return cache
+
+
+def test_expired_page_is_revalidated_and_a_304_reuses_the_body(tmp_path):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("if-none-match") == ETAG:
+            return httpx.Response(304)
+        return httpx.Response(
+            200,
+            text="Subidas en el mercado",
+            headers={"content-type": "text/plain", "etag": ETAG, "last-modified": LAST_MODIFIED},
+        )
+
+    async def scenario():
+        # Con TTL cero cada consulta vuelve a preguntar al servidor
+        cache = page_cache(tmp_path, handler, ttl=0)
+        first = await cache.get(URL)
+        second = await cache.get(URL)
+        await cache.aclose()
+        # Otro proceso solo tiene la copia en disco y la revalida igual
+        other = page_cache(tmp_path, handler, ttl=0)
+        third = await other.get(URL)
+        await other.aclose()
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+    assert len(requests) == 3
+    assert "if-none-match" not in requests[0].headers
+    assert requests[1].headers["if-none-match"] == ETAG
+    assert requests[1].headers["if-modified-since"] == LAST_MODIFIED
+    assert second["body"] == third["body"] == first["body"] == "Subidas en el mercado"
+    assert second["status"] == 200
+    assert second["fetched_at"] >= first["fetched_at"]
+
+
+def test_page_within_the_ttl_is_served_without_the_network(tmp_path):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, text="hola", headers={"content-type": "text/plain"})
+
+    async def scenario():
+        cache = page_cache(tmp_path, handler, ttl=60)
+        pages = [await cache.get(URL) for _ in range(3)]
+        await cache.aclose()
+        return pages
+
+    assert [page["text"] for page in asyncio.run(scenario())] == ["hola"] * 3
+    assert len(requests) == 1
+
+
+def test_concurrent_requests_for_a_url_share_one_download(tmp_path):
+    requests = []
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            # La descarga no termina hasta que todos están esperando
+            await release.wait()
+            return httpx.Response(200, text="una vez", headers={"content-type": "text/plain"})
+
+        cache = page_cache(tmp_path, handler)
+        pending = [asyncio.create_task(cache.get(URL)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        release.set()
+        pages = await asyncio.gather(*pending)
+        await cache.aclose()
+        return pages, cache
+
+    pages, cache = asyncio.run(scenario())
+    assert len(requests) == 1
+    assert all(page is pages[0] for page in pages)
+    assert pages[0]["text"] == "una vez"
+    assert cache._in_flight == {}
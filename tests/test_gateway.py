@@ -0,0 +1,38 @@
+import asyncio
+import importlib
+import re
+
+import pytest
+
+from autonomous_traders.api import gateway_server
+from autonomous_traders.utils import mcp_params, templates
+
+
+@pytest.fixture
+def gateway_templates(monkeypatch):
+    """Las plantillas tal como las ve un trader con MCP_GATEWAY=true."""
+    monkeypatch.setattr(mcp_params, "use_mcp_gateway", True)
+    yield importlib.reload(templates)
+    monkeypatch.undo()
+    importlib.reload(templates)
+
+
+def gateway_tools() -> set[str]:
+    if not gateway_server.mcp._tool_manager.list_tools():
+        for namespace in mcp_params.gateway_namespaces:
+            gateway_server.mount(namespace)
+    return {tool.name for tool in asyncio.run(gateway_server.mcp.list_tools())}
+
+
+def test_instructions_name_the_tools_the_gateway_exposes(gateway_templates):
+    tools = gateway_tools()
+    instructions = gateway_templates.trader_instructions("amy")
+    named = set(re.findall(r"`(\w+)`", instructions))
+    assert {"accounts_execute_orders", "analysis_get_news_sentiment", "market_screen_market"} <= named
+    assert named <= tools
+
+
+def test_instructions_without_the_gateway_use_plain_names():
+    instructions = templates.trader_instructions("amy")
+    assert "`execute_orders`" in instructions
+    assert "accounts_" not in instructions
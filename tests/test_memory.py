@@ -0,0 +1,102 @@
+import sqlite3
+
+import pytest
+
+from autonomous_traders.data import memory
+
+
+@pytest.fixture
+def graph(data_dir, monkeypatch):
+    monkeypatch.setattr(memory, "MEMORY_DB", str(data_dir / "memory" / "knowledge.db"))
+    monkeypatch.setattr(memory, "_initialized", set())
+    memory.write_entities(
+        "amy",
+        [
+            ("Apple Inc.", "empresa", ["Fabrica el iPhone", "Resultados récord en el trimestre"]),
+            ("Microsoft", "empresa", ["Compite con Apple en portátiles"]),
+            ("Reuters", "sitio web", ["https://www.reuters.com/markets"]),
+        ],
+    )
+    memory.write_relations(
+        "amy",
+        [("Microsoft", "Apple Inc.", "compite con"), ("Reuters", "Apple Inc.", "informa sobre")],
+    )
+    return data_dir
+
+
+def names(result: dict) -> list[str]:
+    return [entity["name"] for entity in result["entities"]]
+
+
+def test_search_ranks_by_relevance_within_the_namespace(graph):
+    memory.write_entities("bob", [("Apple Inc.", "empresa", ["De otro trader"])])
+
+    # El nombre pesa más que las observaciones, en las que Microsoft también menciona a Apple
+    found = memory.search_entities("amy", "apple")
+    assert names(found) == ["Apple Inc.", "Microsoft"]
+    assert {"source": "Microsoft", "target": "Apple Inc.", "type": "compite con"} in found["relations"]
+    # Sin acentos, por prefijo y con símbolos que no son sintaxis de FTS5
+    assert names(memory.search_entities("amy", "record trimes")) == ["Apple Inc."]
+    assert names(memory.search_entities("amy", 'reuters.com "markets'))[0] == "Reuters"
+    assert memory.search_entities("amy", "?!") == {"entities": [], "relations": []}
+    assert names(memory.search_entities("bob", "otro")) == ["Apple Inc."]
+
+
+def test_search_sees_new_and_deleted_observations(graph):
+    memory.write_observations("amy", "Microsoft", ["Invierte en inteligencia artificial"])
+    assert names(memory.search_entities("amy", "inteligencia")) == ["Microsoft"]
+    assert memory.delete_observations("amy", "Microsoft", ["Invierte en inteligencia artificial"]) == 1
+    assert memory.search_entities("amy", "inteligencia")["entities"] == []
+
+
+def test_delete_entity_removes_its_observations_relations_and_index(graph):
+    assert memory.delete_entity("amy", "Apple Inc.")
+    assert not memory.delete_entity("amy", "Apple Inc.")
+
+    remaining = memory.read_graph("amy")
+    assert names(remaining) == ["Microsoft", "Reuters"]
+    assert remaining["relations"] == []
+    assert names(memory.search_entities("amy", "iphone")) == []
+    with sqlite3.connect(memory.MEMORY_DB) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM observations").fetchone()[0] == 2
+
+
+def test_delete_relation(graph):
+    assert memory.delete_relation("amy", "Reuters", "Apple Inc.", "informa sobre")
+    assert not memory.delete_relation("amy", "Reuters", "Apple Inc.", "informa sobre")
+    relations = memory.read_entities("amy", ["Apple Inc.", "Microsoft", "Reuters"])["relations"]
+    assert relations == [{"source": "Microsoft", "target": "Apple Inc.", "type": "compite con"}]
+
+
+def test_import_from_a_libsql_memory(data_dir, monkeypatch):
+    monkeypatch.setattr(memory, "MEMORY_DB", str(data_dir / "memory" / "knowledge.db"))
+    monkeypatch.setattr(memory, "_initialized", set())
+    old_path = data_dir / "memory" / "amy.db"
+    old_path.parent.mkdir()
+    # El esquema que usaba mcp-memory-libsql
+    with sqlite3.connect(old_path) as old:
+        old.executescript(
+            """
+            CREATE TABLE entities (name TEXT PRIMARY KEY, entity_type TEXT NOT NULL, embedding BLOB);
+            CREATE TABLE observations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, entity_name TEXT NOT NULL, content TEXT NOT NULL
+            );
+            CREATE TABLE relations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, source TEXT NOT NULL, target TEXT NOT NULL,
+                relation_type TEXT NOT NULL
+            );
+            INSERT INTO entities (name, entity_type) VALUES ('NVIDIA', 'empresa'), ('AMD', 'empresa');
+            INSERT INTO observations (entity_name, content) VALUES
+                ('NVIDIA', 'Lidera en GPUs'), ('NVIDIA', 'Centros de datos'), ('AMD', 'Rival de NVIDIA');
+            INSERT INTO relations (source, target, relation_type) VALUES ('AMD', 'NVIDIA', 'compite con');
+            """
+        )
+
+    assert memory.import_libsql_memory("amy", str(old_path)) == 2
+    imported = memory.read_entities("amy", ["NVIDIA", "AMD"])
+    assert imported["entities"][0]["observations"] == ["Lidera en GPUs", "Centros de datos"]
+    assert imported["relations"] == [{"source": "AMD", "target": "NVIDIA", "type": "compite con"}]
+    assert names(memory.search_entities("amy", "gpus")) == ["NVIDIA"]
+    # Solo se importa mientras el espacio de nombres está vacío
+    assert memory.import_libsql_memory("amy", str(old_path)) == 0
+    assert memory.import_libsql_memory("bob", str(data_dir / "memory" / "bob.db")) == 0
@@ -0,0 +1,102 @@
+import asyncio
+from urllib.parse import parse_qs
+
+import httpx
+
+from autonomous_traders.utils import notifications
+from autonomous_traders.utils.notifications import NotificationQueue
+
+
+class FakePushover:
+    """Servidor de notificaciones falso que responde con los códigos indicados, en orden; el último se repite."""
+
+    def __init__(self, *statuses: int | Exception):
+        self.statuses = list(statuses)
+        self.sent: list[dict[str, str]] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.sent.append({k: v[0] for k, v in parse_qs(request.content.decode()).items()})
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        if isinstance(status, Exception):
+            raise status
+        return httpx.Response(status)
+
+
+def queue_for(server: FakePushover, **kwargs) -> NotificationQueue:
+    queue = NotificationQueue(url="https://push.test/messages", token="t", **kwargs)
+    queue._client = httpx.AsyncClient(transport=httpx.MockTransport(server))
+    return queue
+
+
+def test_messages_within_the_window_are_sent_together():
+    server = FakePushover(200)
+
+    async def scenario():
+        queue = queue_for(server, window=0.05)
+        for i in range(3):
+            await queue.enqueue(f"operación {i}", "ana")
+        await queue.enqueue("solo", "bob")
+        await asyncio.sleep(0.2)
+        await queue.aclose()
+
+    asyncio.run(scenario())
+    by_user = {message["user"]: message["message"] for message in server.sent}
+    assert len(server.sent) == 2
+    assert by_user["ana"] == "3 avisos:\n- operación 0\n- operación 1\n- operación 2"
+    assert by_user["bob"] == "solo"
+
+
+def test_send_retries_with_exponential_backoff(monkeypatch):
+    delays = []
+    sleep = asyncio.sleep
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+        await sleep(0)
+
+    monkeypatch.setattr(notifications.asyncio, "sleep", fake_sleep)
+    server = FakePushover(503, 429, httpx.ConnectError("sin red"), 200)
+
+    async def scenario():
+        queue = queue_for(server, backoff=0.5)
+        sent = await queue.send("ana", "hola")
+        await queue.aclose()
+        return sent
+
+    assert asyncio.run(scenario()) is True
+    assert len(server.sent) == 4
+    assert delays == [0.5, 1.0, 2.0]
+
+
+def test_client_errors_are_not_retried():
+    server = FakePushover(400)
+
+    async def scenario():
+        queue = queue_for(server, backoff=0)
+        sent = await queue.send("ana", "hola")
+        await queue.aclose()
+        return sent
+
+    assert asyncio.run(scenario()) is False
+    assert len(server.sent) == 1
+
+
+def test_shutdown_sends_pending_messages_and_drops_failures():
+    delivered = FakePushover(200)
+    failing = FakePushover(500)
+
+    async def scenario(server):
+        # Una ventana larga: al cerrar no se espera a que termine
+        queue = queue_for(server, window=60, backoff=0, max_attempts=3)
+        await queue.enqueue("último aviso", "ana")
+        await asyncio.wait_for(queue.aclose(), timeout=5)
+        return queue
+
+    queue = asyncio.run(scenario(delivered))
+    assert [message["message"] for message in delivered.sent] == ["último aviso"]
+    assert not queue._flushes and not queue._pending
+
+    queue = asyncio.run(scenario(failing))
+    # Se agotan los intentos y el mensaje se descarta sin bloquear el cierre
+    assert len(failing.sent) == 3
+    assert not queue._flushes and not queue._pending
@@ -0,0 +1,64 @@
+import pytest
+
+from autonomous_traders.core import accounts, orderbook
+from autonomous_traders.core.accounts import Account
+from autonomous_traders.core.orderbook import RestingOrder, evaluate_orders, place_order, recover_orders
+from autonomous_traders.data.database import claim_resting_orders, read_resting_orders
+
+
+@pytest.fixture
+def account(data_dir, monkeypatch):
+    monkeypatch.setattr(orderbook, "_notify", lambda name, message: None)
+    # Si la ejecución volviera a consultar el precio, obtendría otro distinto del evaluado
+    monkeypatch.setattr(accounts, "get_share_prices", lambda symbols: {s: 999.0 for s in symbols})
+    return Account.open("amy")
+
+
+def limit_buy(limit_price: float, quantity: int = 10) -> RestingOrder:
+    return RestingOrder(
+        symbol="AAPL", quantity=quantity, side="buy", type="limit", limit_price=limit_price, rationale="prueba"
+    )
+
+
+def status(id: int) -> str:
+    return next(order["status"] for order in read_resting_orders("amy", None) if order["id"] == id)
+
+
+def test_limit_is_checked_against_the_price_with_spread(account):
+    tight = place_order("amy", limit_buy(100.1))
+    loose = place_order("amy", limit_buy(100.3))
+
+    results = evaluate_orders({"AAPL": 100.0})
+
+    assert [(result["id"], result["status"]) for result in results] == [(loose, "filled")]
+    assert status(tight) == "open"
+    [transaction] = Account.get("amy").transactions
+    assert transaction.price == pytest.approx(100.0 * (1 + accounts.SPREAD))
+    assert transaction.price <= 100.3
+
+
+def test_unexpected_errors_release_the_claimed_orders(account, monkeypatch):
+    id = place_order("amy", limit_buy(200.0))
+
+    def fail(self, orders, prices=None):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(Account, "execute_orders", fail)
+    assert evaluate_orders({"AAPL": 100.0}) == []
+    assert status(id) == "open"
+
+
+def test_recover_reopens_orders_left_filling(account):
+    pending = place_order("amy", limit_buy(200.0, quantity=5))
+    filled = place_order("amy", limit_buy(300.0))
+    claim_resting_orders("amy", [pending, filled], "2024-01-02 10:00:00")
+    # El proceso se interrumpió después de ejecutar una de ellas pero antes de marcarla
+    account.execute_orders(
+        [accounts.Order(symbol="AAPL", quantity=10, side="buy", rationale="prueba")], {"AAPL": 100.0}
+    )
+
+    recovered = {result["id"]: result["status"] for result in recover_orders()}
+
+    assert recovered == {pending: "open", filled: "filled"}
+    assert status(pending) == "open"
+    assert status(filled) == "filled"
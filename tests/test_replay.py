@@ -0,0 +1,32 @@
+import asyncio
+import os
+import sys
+
+from autonomous_traders.core.accounts import Account
+from autonomous_traders.data.database import use_data_dir
+from autonomous_traders.utils import accounts_client
+
+SRC = os.path.join(os.path.dirname(__file__), "..", "src")
+
+
+def test_accounts_server_runs_in_the_replay_data_dir(data_dir, monkeypatch):
+    Account.open("amy").change_strategy("real")
+    use_data_dir("replay")
+    Account.open("amy").change_strategy("reproducción")
+
+    server_params = accounts_client.server_params
+
+    def local_server_params():
+        # El mismo servidor sin uv, conservando el entorno que le pasa el cliente
+        params = server_params()
+        return params.model_copy(
+            update={
+                "command": sys.executable,
+                "args": ["-m", "autonomous_traders.api.accounts_server"],
+                "env": {**params.env, "PYTHONPATH": os.path.abspath(SRC)},  # type: ignore
+            }
+        )
+
+    monkeypatch.setattr(accounts_client, "server_params", local_server_params)
+    assert server_params().env == {"TRADERS_DATA_DIR": "replay"}
+    assert asyncio.run(accounts_client.read_strategy_resource("amy")) == "reproducción"
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from autonomous_traders.core.screener import screen
+from autonomous_traders.data.database import write_market_bars
+
+DATES = ["2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"]
+
+
+@pytest.fixture
+def bars(data_dir):
+    rng = np.random.default_rng(7)
+    symbols = ["AAA", "BBB", "CCC", "DDD", "EEE"]
+    days = {}
+    for i, date in enumerate(DATES):
+        # DDD no cotiza el primer día
+        day = {
+            symbol: [100.0, 110.0, 90.0, float(rng.uniform(50, 150)), float(rng.uniform(1e5, 1e6))]
+            for symbol in symbols
+            if not (symbol == "DDD" and i == 0)
+        }
+        write_market_bars(date, day)
+        days[date] = day
+    return days
+
+
+def naive(days: dict, momentum_days: int) -> dict[str, dict]:
+    dates = sorted(days)[-(momentum_days + 1):]
+    last, previous = days[dates[-1]], days[dates[-2]]
+    results = {}
+    for symbol, bar in last.items():
+        close, volume = bar[3], bar[4]
+        volumes = [days[date][symbol][4] for date in dates[:-1] if symbol in days[date]]
+        results[symbol] = {
+            "price": round(close, 2),
+            "change_pct": round((close / previous[symbol][3] - 1) * 100, 2) if symbol in previous else None,
+            "momentum_pct": round((close / days[dates[0]][symbol][3] - 1) * 100, 2) if symbol in days[dates[0]] else None,
+            "volume_spike": round(volume / (sum(volumes) / len(volumes)), 2),
+        }
+    return results
+
+
+def test_screen_matches_a_naive_loop(bars):
+    result = screen(sort_by="change", momentum_days=3)
+    expected = naive(bars, 3)
+    assert result["date"] == DATES[-1]
+    assert result["days"] == len(DATES)
+    assert [row["symbol"] for row in result["results"]] == sorted(
+        expected, key=lambda symbol: -expected[symbol]["change_pct"]
+    )
+    for row in result["results"]:
+        for key, value in expected[row["symbol"]].items():
+            assert row[key] == value
+
+
+def test_rewritten_day_is_not_served_from_the_cache(bars):
+    screen()
+    day = dict(bars[DATES[-1]])
+    day["AAA"] = [100.0, 110.0, 90.0, 1000.0, 1e6]
+    write_market_bars(DATES[-1], day)
+    [top] = screen(sort_by="price", limit=1)["results"]
+    assert top["symbol"] == "AAA"
+    assert top["price"] == 1000.0
@@ -0,0 +1,46 @@
+import threading
+
+from autonomous_traders.core.sentiment import SentimentScorer
+
+
+def test_doubled_consonant_forms_are_matched():
+    scorer = SentimentScorer()
+    # "profit" suma y "dropped" resta: el titular queda neutral, como antes de compilar el léxico
+    assert scorer.score("Profits dropped") == 0
+    assert scorer.score("Shares dropped") == -1
+    assert scorer.score("Estimates upped again") == 1
+
+
+def test_irregular_and_e_dropping_forms_are_matched():
+    scorer = SentimentScorer()
+    assert scorer.score("Shares fell sharply") == -1
+    assert scorer.score("Revenue shrank") == -1
+    assert scorer.score("Stock rising") == 1
+    assert scorer.score("Stock not rising") == -1
+
+
+def test_word_boundaries_still_apply():
+    scorer = SentimentScorer()
+    assert scorer.score("Support level holds") == 0
+    assert scorer.score("Asterisk in the filing") == 0
+
+
+def test_cache_is_safe_across_threads():
+    scorer = SentimentScorer(cache_size=8)
+    headlines = [f"Shares rise {i}" for i in range(64)]
+    errors = []
+
+    def work():
+        try:
+            for _ in range(20):
+                assert scorer.score_many(headlines) == [1.0] * len(headlines)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(scorer._cache) <= 8
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from autonomous_traders.core import clock, market
+from autonomous_traders.core.synthetic import SyntheticMarket
+
+SYMBOLS = ["AAPL", "MSFT", "NVDA", "XOM"]
+MOMENT = datetime(2024, 3, 15, 14, 30)
+
+
+def test_prices_are_deterministic_for_a_seed():
+    first = SyntheticMarket(seed=7).prices(SYMBOLS, MOMENT)
+    # Otra instancia con la misma semilla, sin cachés compartidas, da los mismos precios
+    again = SyntheticMarket(seed=7).prices(SYMBOLS, MOMENT)
+    other = SyntheticMarket(seed=8).prices(SYMBOLS, MOMENT)
+
+    assert np.array_equal(first, again)
+    assert not np.array_equal(first, other)
+    assert (first > 0).all()
+    # El precio de un símbolo no depende de con qué otros símbolos se pida
+    assert SyntheticMarket(seed=7).price("NVDA", MOMENT) == first[2]
+
+
+def test_price_epoch_changes_each_minute(data_dir, monkeypatch):
+    moment = [MOMENT]
+    monkeypatch.setattr(market, "price_provider_name", "synthetic")
+    monkeypatch.setattr(clock, "now", lambda: moment[0])
+
+    epoch = market.get_price_epoch()
+    prices = market.get_share_prices(SYMBOLS)
+    moment[0] = MOMENT + timedelta(seconds=30)
+    assert market.get_price_epoch() == epoch
+
+    moment[0] = MOMENT + timedelta(minutes=1)
+    assert market.get_price_epoch() != epoch
+    assert market.get_price_epoch().startswith("synthetic:")
+    # Los precios van redondeados a céntimos: en un minuto pueden no moverse, en un día sí
+    moment[0] = MOMENT + timedelta(days=1)
+    assert market.get_share_prices(SYMBOLS) != prices
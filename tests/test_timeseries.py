@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+
+from autonomous_traders.core.timeseries import choose_resolution, portfolio_series
+from autonomous_traders.data.database import create_account, write_portfolio_value
+
+
+def write_intraday(name: str):
+    create_account(name, 10_000.0, "2024-01-02 09:30:00")
+    for minute, value in ((0, 10_000.0), (5, 10_050.0), (10, 10_020.0)):
+        write_portfolio_value(name, f"2024-01-02 10:{minute:02d}:00", value)
+
+
+def test_intraday_points_use_the_finest_tier(data_dir):
+    write_intraday("amy")
+    assert choose_resolution("amy") == "raw"
+    assert choose_resolution("amy", "2024-01-02 10:00:00") == "raw"
+    assert portfolio_series("amy") == [
+        ("2024-01-02 10:00:00", 10_000.0),
+        ("2024-01-02 10:05:00", 10_050.0),
+        ("2024-01-02 10:10:00", 10_020.0),
+    ]
+
+
+def test_start_before_the_finer_tiers_goes_coarser(data_dir):
+    write_intraday("amy")
+    assert choose_resolution("amy", "2024-01-02 09:00:00") == "day"
+
+
+def test_account_without_points_has_no_resolution(data_dir):
+    create_account("amy", 10_000.0, "2024-01-02 09:30:00")
+    assert choose_resolution("amy") is None
+
+
+def test_series_without_start_covers_the_whole_history(data_dir):
+    create_account("amy", 10_000.0, "2024-01-02 00:00:00")
+    # Diez días de puntos cada hora: los más antiguos ya solo quedan en los agregados
+    first = datetime(2024, 1, 2)
+    points = [
+        ((first + timedelta(hours=hour)).strftime("%Y-%m-%d %H:%M:%S"), 10_000.0 + (hour % 24) * 10)
+        for hour in range(10 * 24)
+    ]
+    for timestamp, value in points:
+        write_portfolio_value("amy", timestamp, value)
+
+    assert choose_resolution("amy") == "hour"
+    assert portfolio_series("amy", max_points=len(points)) == points
+
+    downsampled = portfolio_series("amy", max_points=50)
+    assert len(downsampled) == 50
+    assert downsampled[0] == points[0] and downsampled[-1] == points[-1]